@@ -0,0 +1,108 @@
+"""Write cost of linking :Author and :Venue nodes during ingestion.
+
+Inserts synthetic papers in batches of 10k through the same UNWIND
+``MERGE_PAPERS_QUERY`` the backend uses, once with authors and venues and
+once with both stripped, so the difference is the cost of the
+``AUTHORED``/``PUBLISHED_IN`` linking. Authors are drawn from a shared
+pool, so later batches mostly MERGE onto existing authors the way real
+ingestion does; the per-batch times show whether that cost stays flat as
+the graph grows:
+
+    python benchmarks/author_linking.py --batches 10
+
+The database is wiped before and after the run, so point it at a scratch
+instance.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from paperwalk.common.type import paper_row
+from paperwalk.database import Neo4jConnection, PaperDatabaseManager
+from paperwalk.database.database import MERGE_PAPERS_QUERY
+
+BATCH = 10_000
+
+
+def _papers(rng, start, authors, venues):
+    for i in range(start, start + BATCH):
+        byline = rng.sample(range(authors), rng.randint(1, 8))
+        yield {
+            "paperId": f"bench-{i}",
+            "title": f"Synthetic paper {i}",
+            "authors": [{"authorId": f"a{a}", "name": f"Author {a}"} for a in byline],
+            "citationCount": rng.randint(0, 5000),
+            "year": rng.randint(1990, 2024),
+            "venue": f"Venue {rng.randrange(venues)}",
+        }
+
+
+def _write(tx, rows):
+    tx.run(MERGE_PAPERS_QUERY, rows=rows).consume()
+
+
+def clear(conn, batch=50_000):
+    conn.run_autocommit(
+        "MATCH (n) WHERE n:Paper OR n:Author OR n:Venue "
+        f"CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {batch} ROWS"
+    )
+
+
+def run(conn, rng, batches, authors, venues, link):
+    seconds = []
+    for batch in range(batches):
+        rows = [paper_row(p) for p in _papers(rng, batch * BATCH, authors, venues)]
+        if not link:
+            rows = [row._replace(venue=None, authors=()) for row in rows]
+        start = time.perf_counter()
+        conn.execute_write(_write, rows)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--authors", type=int, default=50_000)
+    parser.add_argument("--venues", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = Neo4jConnection(
+        uri=os.getenv("NEO4J_URI"),
+        user=os.getenv("NEO4J_USER"),
+        pwd=os.getenv("NEO4J_PWD"),
+    )
+    PaperDatabaseManager(conn).ensure_schema()
+
+    results = {}
+    for link in (False, True):
+        clear(conn)
+        rng = random.Random(args.seed)
+        seconds = run(conn, rng, args.batches, args.authors, args.venues, link)
+        results[link] = seconds
+        print(
+            json.dumps(
+                {
+                    "linking": link,
+                    "seconds_per_10k": [round(s, 3) for s in seconds],
+                    "median": round(statistics.median(seconds), 3),
+                }
+            )
+        )
+    overhead = statistics.median(results[True]) - statistics.median(results[False])
+    print(json.dumps({"linking_overhead_seconds_per_10k": round(overhead, 3)}))
+
+    clear(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
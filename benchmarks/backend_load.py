@@ -0,0 +1,99 @@
+"""Load benchmark for the FastAPI backend.
+
+Sends a mix of ``/search`` and ``/papers/expand/{paper_id}`` requests to a
+running backend and reports p50/p99 latency per route. To compare the
+blocking and non-blocking servers, start ``scripts/backend.py`` from each
+revision in turn and run the same command against it, e.g.
+
+    python benchmarks/backend_load.py --base-url http://localhost:5007 \\
+        --requests 400 --concurrency 32 --expand-ratio 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+DEFAULT_PAPER_IDS = [
+    "649def34f8be52c8b66281af98ae884c09aef38b",
+    "204e3073870fae3d05bcbc2f6a8e263d9b72e776",
+    "df2b0e26d0599ce3e70df8a9da02e51594e0e992",
+]
+DEFAULT_QUERIES = ["transformer", "graph neural network", "random walk", "pagerank"]
+
+
+def percentile(values, q):
+    """Return the ``q``-th percentile of ``values`` (nearest rank)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+async def worker(client, jobs, latencies, errors):
+    while True:
+        try:
+            route, path = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors[route] = errors.get(route, 0) + 1
+        except httpx.HTTPError:
+            errors[route] = errors.get(route, 0) + 1
+        latencies.setdefault(route, []).append(time.perf_counter() - start)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    jobs = asyncio.Queue()
+    for _ in range(args.requests):
+        if rng.random() < args.expand_ratio:
+            jobs.put_nowait(("expand", f"/papers/expand/{rng.choice(args.paper_ids)}"))
+        else:
+            jobs.put_nowait(("search", f"/search?query={rng.choice(args.queries)}"))
+
+    latencies, errors = {}, {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, jobs, latencies, errors) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    report = {"elapsed_s": round(elapsed, 3), "routes": {}}
+    for route, values in sorted(latencies.items()):
+        report["routes"][route] = {
+            "count": len(values),
+            "errors": errors.get(route, 0),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:5007")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--expand-ratio", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paper-ids", nargs="+", default=DEFAULT_PAPER_IDS)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Throughput of the Semantic Scholar Datasets importer.
+
+Generates synthetic papers and citations shards, then imports them into
+neo4j-admin CSVs (no database needed) and reports edges per minute:
+
+    python benchmarks/dataset_import.py --papers 1000000 --shards 16
+
+Pass ``--neo4j`` to load into the database from ``.env`` instead, through
+batched UNWIND transactions. That wipes the database, so point it at a
+scratch instance.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+from paperwalk.database import Neo4jConnection, PaperDatabaseManager
+from paperwalk.dataset import (
+    CsvSink,
+    DatasetImporter,
+    Neo4jSink,
+    write_synthetic_shards,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=200_000)
+    parser.add_argument("--citations-per-paper", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--neo4j", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        shards = write_synthetic_shards(
+            os.path.join(path, "shards"),
+            papers=args.papers,
+            citations_per_paper=args.citations_per_paper,
+            shards=args.shards,
+        )
+        generate_seconds = time.perf_counter() - start
+
+        if args.neo4j:
+            load_dotenv()
+            conn = Neo4jConnection(
+                uri=os.getenv("NEO4J_URI"),
+                user=os.getenv("NEO4J_USER"),
+                pwd=os.getenv("NEO4J_PWD"),
+            )
+            paper_db = PaperDatabaseManager(conn)
+            paper_db.clean_database()
+            paper_db.ensure_schema()
+            conn.close()
+            sink = Neo4jSink(
+                os.getenv("NEO4J_URI"),
+                os.getenv("NEO4J_USER"),
+                os.getenv("NEO4J_PWD"),
+                batch_size=args.batch_size,
+            )
+        else:
+            sink = CsvSink(os.path.join(path, "csv"))
+
+        report = DatasetImporter(sink, processes=args.processes).run(shards)
+        report["generate_seconds"] = round(generate_seconds, 3)
+        report["sink"] = "neo4j" if args.neo4j else "csv"
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
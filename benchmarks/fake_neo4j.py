@@ -0,0 +1,322 @@
+"""In-memory stand-in for ``Neo4jConnection`` on the benchmarked paths.
+
+``InMemoryNeo4j`` runs the repository's real transaction functions
+(``_write_papers``, ``_write_relation_chunk``, ``_read_neighborhood``,
+``export_csr``'s readers, ...) against a fake transaction. ``tx.run`` is
+answered by a Python handler picked by the name of the transaction
+function, so the Cypher itself is not executed but every row the code
+builds, sends and post-processes is. ``round_trip`` seconds are slept per
+transaction to model the network and commit cost that batching amortizes.
+``AsyncInMemoryNeo4j`` serves the same graph to ``AsyncPaperReader``.
+"""
+
+import asyncio
+
+import re
+import threading
+import time
+
+from paperwalk.common.type import (
+    AUTHORS_FIELD,
+    DETAIL_PROPERTIES,
+    PAPER_PROPERTIES,
+    VENUE_FIELD,
+    VIEW_PROPERTIES,
+)
+
+
+class _Result:
+    def __init__(self, records):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def consume(self):
+        return None
+
+
+class _Transaction:
+    def __init__(self, graph, work):
+        self._graph = graph
+        self._work = work
+
+    def run(self, query, parameters=None, **kwargs):
+        handler = getattr(self._graph, f"_on{self._work}", None)
+        if handler is None:
+            raise NotImplementedError(f"No in-memory handler for {self._work}")
+        params = {**(parameters or {}), **kwargs}
+        return _Result(handler(query, **params) or [])
+
+
+class _AsyncResult(_Result):
+    async def single(self):
+        return super().single()
+
+    async def consume(self):
+        return None
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        for record in self._records:
+            yield record
+
+
+class _AsyncTransaction(_Transaction):
+    async def run(self, query, parameters=None, **kwargs):
+        return _AsyncResult(list(super().run(query, parameters, **kwargs)))
+
+
+class InMemoryNeo4j:
+    """Paper graph held in dicts, behind the Neo4jConnection interface."""
+
+    def __init__(self, round_trip=0.0):
+        self.round_trip = round_trip
+        self.papers = {}
+        self.cites = {}
+        self.cited_by = {}
+        self.authors = {}
+        self.authored = set()
+        self.schema_version = 0
+        self.transactions = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        pass
+
+    def pool_stats(self):
+        return {"transactions": self.transactions}
+
+    def _execute(self, work, args):
+        if self.round_trip:
+            time.sleep(self.round_trip)
+        with self._lock:
+            self.transactions += 1
+            return work(_Transaction(self, work.__name__), *args)
+
+    def execute_read(self, work, *args, db=None, fetch_size=None):
+        return self._execute(work, args)
+
+    def execute_write(self, work, *args, db=None):
+        return self._execute(work, args)
+
+    def execute_query(self, query, parameters=None, db=None, read=False):
+        return []
+
+    def run_autocommit(self, query, parameters=None, db=None):
+        # only used for clearing here
+        if "DETACH DELETE" in query:
+            self.__init__(self.round_trip)
+
+    async def _execute_async(self, work, args):
+        if self.round_trip:
+            await asyncio.sleep(self.round_trip)
+        with self._lock:
+            self.transactions += 1
+        # handlers never await, so the graph is not touched concurrently
+        return await work(_AsyncTransaction(self, work.__name__), *args)
+
+    # writes
+
+    def _merge_paper(self, row):
+        paper_id = row[0]
+        if paper_id not in self.papers:
+            self.papers[paper_id] = dict(zip(PAPER_PROPERTIES, row))
+        for author_id, name in row[AUTHORS_FIELD]:
+            self.authors.setdefault(author_id, name)
+            self.authored.add((author_id, paper_id))
+        if row[VENUE_FIELD]:
+            self.papers[paper_id].setdefault("venue", row[VENUE_FIELD])
+        self.rows += 1
+
+    def _add_edge(self, source, target):
+        self.cites.setdefault(source, set()).add(target)
+        self.cited_by.setdefault(target, set()).add(source)
+
+    def _on_write_papers(self, query, rows):
+        for row in rows:
+            self._merge_paper(row)
+
+    def _on_write_hydrated(self, query, rows):
+        for paper_id, abstract in rows:
+            paper = self.papers.get(paper_id)
+            if paper is not None:
+                paper["hydrated"] = True
+                paper["abstract"] = abstract
+
+    def _on_merge_anchor(self, query, paperId):
+        self.papers.setdefault(paperId, {"paperId": paperId})
+
+    def _on_write_relation_chunk(self, query, paperId, papers):
+        citing = "(p2)-[:CITES]->(p1)" in query
+        for row in papers:
+            self._merge_paper(row)
+            if citing:
+                self._add_edge(row[0], paperId)
+            else:
+                self._add_edge(paperId, row[0])
+
+    def _on_write_expansion(self, query, paperId, citations, references, expandedAt):
+        paper = self.papers.setdefault(paperId, {"paperId": paperId})
+        paper["expandedAt"] = expandedAt
+        paper["citationsFetched"] = paper.get("citationsFetched", 0) + citations
+        paper["referencesFetched"] = paper.get("referencesFetched", 0) + references
+
+    def _on_write_chunk(self, query, rows):
+        for row in rows:
+            paper = self.papers.get(row["paperId"])
+            if paper is not None:
+                paper.update(row["scores"])
+
+    def _on_run_statement(self, query):
+        pass
+
+    def _on_record_version(self, query, version, appliedAt):
+        self.schema_version = version
+
+    def _on_current_version(self, query):
+        return [{"version": self.schema_version}] if self.schema_version else []
+
+    # reads
+
+    def _view(self, paper_id):
+        paper = self.papers[paper_id]
+        return {name: paper.get(name) for name in VIEW_PROPERTIES}
+
+    def _on_read_expansion(self, query, paperId):
+        paper = self.papers.get(paperId)
+        if paper is None:
+            return []
+        names = ("expandedAt", "citationsFetched", "referencesFetched")
+        return [{name: paper.get(name) for name in names}]
+
+    def _on_read_neighbor_ids(self, query, paperId):
+        if paperId not in self.papers:
+            return []
+        return [
+            {
+                "citing": list(self.cited_by.get(paperId, ())),
+                "cited": list(self.cites.get(paperId, ())),
+            }
+        ]
+
+    def _on_read_neighborhood(self, query, paperId, limit):
+        if paperId not in self.papers:
+            return []
+        return [
+            {
+                "paper": self._view(paperId),
+                "citations": [
+                    self._view(c) for c in list(self.cited_by.get(paperId, ()))[:limit]
+                ],
+                "references": [
+                    self._view(r) for r in list(self.cites.get(paperId, ()))[:limit]
+                ],
+            }
+        ]
+
+    def _on_read_details(self, query, paperId):
+        paper = self.papers.get(paperId)
+        if paper is None:
+            return []
+        return [{"paper": {name: paper.get(name) for name in DETAIL_PROPERTIES}}]
+
+    def _on_read_known_ids(self, query, paperIds):
+        return [{"paperId": pid} for pid in paperIds if pid in self.papers]
+
+    def _on_read_papers(self, query, paperIds):
+        return [{"paper": self._view(pid)} for pid in paperIds if pid in self.papers]
+
+    def _on_read_top_papers(self, query, minCitations, limit, exclude):
+        rank_by = re.search(r"ORDER BY p\.(\w+) DESC", query).group(1)
+        excluded = set(exclude)
+        ranked = [
+            paper
+            for paper_id, paper in self.papers.items()
+            if paper.get(rank_by) is not None
+            and (paper.get("citationCount") or 0) >= minCitations
+            and paper_id not in excluded
+        ]
+        ranked.sort(key=lambda paper: paper[rank_by], reverse=True)
+        return [{"paper": self._view(paper["paperId"])} for paper in ranked[:limit]]
+
+    def _on_read_ego_papers(self, query, focus, minCitations, limit):
+        if focus not in self.papers:
+            return []
+        rank_by = re.search(r"coalesce\(n\.(\w+)", query).group(1)
+        depth = int(re.search(r"CITES\*1\.\.(\d)", query).group(1))
+        seen, frontier = {focus}, {focus}
+        for _ in range(depth):
+            frontier = {
+                other
+                for paper_id in frontier
+                for other in self.cites.get(paper_id, set())
+                | self.cited_by.get(paper_id, set())
+            } - seen
+            seen |= frontier
+        neighbors = [
+            self.papers[paper_id]
+            for paper_id in seen - {focus}
+            if (self.papers[paper_id].get("citationCount") or 0) >= minCitations
+        ]
+        neighbors.sort(
+            key=lambda paper: (
+                paper.get(rank_by) if paper.get(rank_by) is not None else -1.0,
+                paper.get("citationCount") or 0,
+            ),
+            reverse=True,
+        )
+        return [
+            {
+                "focus": self._view(focus),
+                "papers": [self._view(p["paperId"]) for p in neighbors[:limit]],
+            }
+        ]
+
+    def _on_read_edges_among(self, query, paperIds):
+        chosen = set(paperIds)
+        return [
+            {"s": source, "t": target}
+            for source in paperIds
+            for target in self.cites.get(source, ())
+            if target in chosen
+        ]
+
+    def _on_read_nodes(self, query):
+        columns = re.findall(r"p\.(\w+) AS", query)[1:]
+        return [
+            {"paperId": paper_id, **{name: paper.get(name) for name in columns}}
+            for paper_id, paper in self.papers.items()
+        ]
+
+    def _on_read_edges(self, query):
+        return [
+            {"s": source, "t": target}
+            for source, targets in self.cites.items()
+            for target in targets
+        ]
+
+
+class AsyncInMemoryNeo4j:
+    """An InMemoryNeo4j's graph behind the AsyncNeo4jConnection interface."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def pool_stats(self):
+        return self.graph.pool_stats()
+
+    async def close(self):
+        pass
+
+    async def execute_read(self, work, *args, db=None, fetch_size=None):
+        return await self.graph._execute_async(work, args)
+
+    async def execute_write(self, work, *args, db=None):
+        return await self.graph._execute_async(work, args)
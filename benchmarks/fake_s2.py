@@ -0,0 +1,296 @@
+"""Local stand-in for the Semantic Scholar Graph API.
+
+Serves a synthetic, seeded citation graph over HTTP with the endpoints the
+clients use (``/paper/{id}``, ``/paper/{id}/citations``,
+``/paper/{id}/references``, ``/paper/batch`` and ``/paper/search``). Every
+response can be delayed, a share of them answered with 429, and page sizes
+capped, to mimic the live API:
+
+    python benchmarks/fake_s2.py --papers 10000 --latency 0.05 --port 8765
+
+Point a client at it with
+``AsyncSemanticScholarAPI(base_url="http://127.0.0.1:8765/graph/v1")``.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PREFIX = "/graph/v1"
+TOPICS = ["graph", "transformer", "retrieval", "ranking", "citation", "walk"]
+WORDS = TOPICS + [
+    "we", "propose", "a", "method", "for", "the", "of", "model", "results",
+    "show", "that", "our", "approach", "improves", "on", "large", "datasets",
+    "and", "learning", "networks", "with", "efficient", "evaluation", "in",
+]
+
+
+class SyntheticGraph:
+    """Seeded citation graph with API-shaped papers.
+
+    Paper ``i`` cites up to ``2 * mean_references`` earlier papers, and
+    with probability ``hub_share`` also one of the first ``hubs`` papers
+    (paper 0 most often), so the hubs collect thousands of citations and
+    exercise long pagination.
+    """
+
+    def __init__(
+        self, papers=10_000, mean_references=10, hubs=5, hub_share=0.6, seed=0
+    ):
+        rng = random.Random(seed)
+        self.ids = [
+            hashlib.sha1(f"{seed}:{i}".encode()).hexdigest() for i in range(papers)
+        ]
+        self.index = {paper_id: i for i, paper_id in enumerate(self.ids)}
+        self.references = [[] for _ in range(papers)]
+        self.citations = [[] for _ in range(papers)]
+        for i in range(1, papers):
+            cited = set(
+                rng.randrange(i) for _ in range(rng.randint(0, 2 * mean_references))
+            )
+            if rng.random() < hub_share:
+                cited.add(min(int(rng.expovariate(1.0)), hubs - 1, i - 1))
+            for j in sorted(cited):
+                self.references[i].append(j)
+                self.citations[j].append(i)
+        self._papers = [self._make_paper(i, rng) for i in range(papers)]
+
+    def _make_paper(self, i, rng):
+        authors = [
+            {"authorId": str(a), "name": f"Author {a}"}
+            for a in rng.sample(range(len(self.ids) // 3 + 10), rng.randint(1, 5))
+        ]
+        return {
+            "paperId": self.ids[i],
+            "title": f"Synthetic paper {i} on {TOPICS[i % len(TOPICS)]}",
+            "authors": authors,
+            "abstract": self._abstract(i) if i % 3 else None,
+            "year": 1990 + i * 34 // max(len(self.ids), 1),
+            "citationCount": len(self.citations[i]),
+            "referenceCount": len(self.references[i]),
+            "externalIds": {"CorpusId": i},
+            "venue": f"Venue {i % 40}",
+        }
+
+    @staticmethod
+    def _abstract(i):
+        # about as long as a real abstract; seeded per paper so adding
+        # abstracts leaves the rest of the graph unchanged
+        rng = random.Random(i)
+        return " ".join(rng.choice(WORDS) for _ in range(160)).capitalize() + "."
+
+    def paper(self, paper_id):
+        i = self.index.get(paper_id)
+        return None if i is None else self._papers[i]
+
+    def related(self, paper_id, relation):
+        """Citing (``citations``) or cited (``references``) papers of a paper."""
+        i = self.index.get(paper_id)
+        if i is None:
+            return None
+        indices = self.citations[i] if relation == "citations" else self.references[i]
+        return [self._papers[j] for j in indices]
+
+    def search(self, query):
+        words = query.lower().split()
+        return [
+            paper
+            for paper in self._papers
+            if all(word in paper["title"].lower() for word in words)
+        ]
+
+
+class FakeSemanticScholar:
+    """Threaded HTTP server answering from a SyntheticGraph.
+
+    ``latency`` seconds (plus up to ``jitter``) are slept per request.
+    ``throttle_rate`` of the requests get a 429 with ``Retry-After:
+    retry_after``, and no page holds more than ``max_page_size`` rows.
+    ``stats`` counts the requests served per endpoint, the 429s and the
+    response bytes. Papers are cut down to the requested ``fields``.
+    """
+
+    def __init__(
+        self,
+        graph,
+        latency=0.0,
+        jitter=0.0,
+        throttle_rate=0.0,
+        retry_after=0,
+        max_page_size=1000,
+        seed=0,
+        port=0,
+    ):
+        self.graph = graph
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_page_size = max_page_size
+        self.stats = {"requests": 0, "throttled": 0, "bytes": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{PREFIX}"
+
+    def start(self):
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _admit(self, endpoint):
+        """Count a request; returns False when it should be throttled."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[endpoint] = self.stats.get(endpoint, 0) + 1
+            delay = self.latency + self._rng.random() * self.jitter
+            throttled = self._rng.random() < self.throttle_rate
+            if throttled:
+                self.stats["throttled"] += 1
+        if delay:
+            time.sleep(delay)
+        return not throttled
+
+    def respond(self, method, path, query, body):
+        """Return ``(status, headers, payload)`` for one request."""
+        if not path.startswith(PREFIX + "/paper/"):
+            return 404, {}, {"error": "Not found"}
+        parts = path[len(PREFIX) + 1 :].split("/")
+        if method == "POST" and parts == ["paper", "batch"]:
+            endpoint = "batch"
+        elif parts[1] == "search":
+            endpoint = "search"
+        elif len(parts) == 3 and parts[2] in ("citations", "references"):
+            endpoint = parts[2]
+        elif len(parts) == 2:
+            endpoint = "paper"
+        else:
+            return 404, {}, {"error": "Not found"}
+        if not self._admit(endpoint):
+            headers = {"Retry-After": str(self.retry_after)}
+            return 429, headers, {"message": "Too Many Requests"}
+
+        offset = int(query.get("offset", ["0"])[0])
+        limit = min(int(query.get("limit", ["100"])[0]), self.max_page_size)
+        fields = query.get("fields")
+        fields = set(fields[0].split(",")) | {"paperId"} if fields else None
+
+        def project(paper):
+            if paper is None or fields is None:
+                return paper
+            return {name: value for name, value in paper.items() if name in fields}
+
+        if endpoint == "batch":
+            papers = [self.graph.paper(pid) for pid in body.get("ids", [])]
+            return 200, {}, [project(paper) for paper in papers]
+        if endpoint == "search":
+            hits = self.graph.search(query.get("query", [""])[0])
+            page = [project(paper) for paper in hits[offset : offset + limit]]
+            return 200, {}, {"total": len(hits), "offset": offset, "data": page}
+        if endpoint == "paper":
+            paper = self.graph.paper(parts[1])
+            if paper is None:
+                return 404, {}, {"error": "Paper not found"}
+            return 200, {}, project(paper)
+        related = self.graph.related(parts[1], endpoint)
+        if related is None:
+            return 404, {}, {"error": "Paper not found"}
+        key = "citingPaper" if endpoint == "citations" else "citedPaper"
+        page = related[offset : offset + limit]
+        payload = {"offset": offset, "data": [{key: project(paper)} for paper in page]}
+        if offset + limit < len(related):
+            payload["next"] = offset + limit
+        return 200, {}, payload
+
+
+def _handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _serve(self, method):
+            parts = urlsplit(self.path)
+            body = {}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                body = json.loads(self.rfile.read(length))
+            status, headers, payload = server.respond(
+                method, parts.path, parse_qs(parts.query), body
+            )
+            data = json.dumps(payload).encode()
+            with server._lock:
+                server.stats["bytes"] += len(data)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._serve("GET")
+
+        def do_POST(self):
+            self._serve("POST")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    graph = SyntheticGraph(args.papers, seed=args.seed)
+    server = FakeSemanticScholar(
+        graph,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        max_page_size=args.max_page_size,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(f"Serving {args.papers} papers at {server.base_url}; hub: {graph.ids[0]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
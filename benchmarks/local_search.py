@@ -0,0 +1,89 @@
+"""Indexing throughput and query latency of the local search index.
+
+Builds a LocalSearchIndex in a temporary directory from synthetic papers
+whose words follow a Zipf distribution, then times top-k queries in every
+mode:
+
+    python benchmarks/local_search.py --papers 100000 --queries 500
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from paperwalk.search import MODES, LocalSearchIndex
+
+
+def percentile(values, q):
+    """Return the ``q``-th percentile of ``values`` (nearest rank)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def synthetic_papers(count, vocab, weights, words, rng):
+    """Yield batches of 1000 papers with Zipf-distributed words."""
+    for start in range(0, count, 1000):
+        stop = min(start + 1000, count)
+        draws = vocab[rng.choice(len(vocab), size=(stop - start, words), p=weights)]
+        yield [
+            {
+                "paperId": f"bench-{start + i}",
+                "title": " ".join(row[:10]),
+                "abstract": " ".join(row[10:]),
+                "year": 2000 + (start + i) % 25,
+                "citationCount": (start + i) % 1000,
+            }
+            for i, row in enumerate(draws)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--vocabulary", type=int, default=30_000)
+    parser.add_argument("--words", type=int, default=160)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vocab = np.array([f"w{i}" for i in range(args.vocabulary)])
+    weights = 1.0 / np.arange(1, args.vocabulary + 1)
+    weights /= weights.sum()
+    report = {"papers": args.papers, "modes": {}}
+    with tempfile.TemporaryDirectory() as path:
+        index = LocalSearchIndex(path, dim=args.dim)
+        start = time.perf_counter()
+        for batch in synthetic_papers(args.papers, vocab, weights, args.words, rng):
+            index.add(batch)
+        elapsed = time.perf_counter() - start
+        report["index_papers_per_sec"] = round(args.papers / elapsed, 1)
+
+        queries = [
+            " ".join(vocab[rng.choice(args.vocabulary, size=3, p=weights)])
+            for _ in range(args.queries)
+        ]
+        for mode in MODES:
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, args.k, mode)
+                latencies.append(time.perf_counter() - start)
+            report["modes"][mode] = {
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            }
+        index.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""MERGE latency benchmark for growing graphs.
+
+Grows the ``:Paper`` label to each target size with synthetic nodes and
+times a batch of ``MERGE`` lookups (half existing, half new paperIds) at
+every size. Run it once with ``--no-schema`` on an empty database and once
+without to see the label scan turn into an index seek:
+
+    python benchmarks/merge_latency.py --sizes 10000 100000 1000000
+    python benchmarks/merge_latency.py --sizes 10000 100000 1000000 --no-schema
+
+The database is wiped before and after the run, so point it at a scratch
+instance.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+from paperwalk.database import Neo4jConnection, PaperDatabaseManager
+
+BENCH_ID_PREFIX = "bench-"
+
+
+def _grow(tx, start, stop):
+    tx.run(
+        """
+        UNWIND range($start, $stop - 1) AS i
+        CREATE (:Paper {paperId: $prefix + toString(i), citationCount: i % 1000})
+        """,
+        start=start,
+        stop=stop,
+        prefix=BENCH_ID_PREFIX,
+    ).consume()
+
+
+def _merge_one(tx, paper_id):
+    tx.run("MERGE (p:Paper {paperId: $paperId})", paperId=paper_id).consume()
+
+
+def clear(conn, batch=50_000):
+    conn.run_autocommit(
+        "MATCH (p:Paper) CALL { WITH p DETACH DELETE p } "
+        f"IN TRANSACTIONS OF {batch} ROWS"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--no-schema", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = Neo4jConnection(
+        uri=os.getenv("NEO4J_URI"),
+        user=os.getenv("NEO4J_USER"),
+        pwd=os.getenv("NEO4J_PWD"),
+    )
+    paper_db = PaperDatabaseManager(conn)
+    clear(conn)
+    if not args.no_schema:
+        paper_db.ensure_schema()
+
+    results = []
+    size = 0
+    for target in sorted(args.sizes):
+        while size < target:
+            stop = min(target, size + args.batch)
+            conn.execute_write(_grow, size, stop)
+            size = stop
+        latencies = []
+        for i in range(args.samples):
+            # alternate between an existing node and a brand new one
+            if i % 2 == 0:
+                paper_id = f"{BENCH_ID_PREFIX}{(i * 7919) % size}"
+            else:
+                paper_id = f"{BENCH_ID_PREFIX}new-{target}-{i}"
+            start = time.perf_counter()
+            conn.execute_write(_merge_one, paper_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        results.append(
+            {
+                "nodes": target,
+                "schema": not args.no_schema,
+                "p50_ms": round(statistics.median(latencies), 2),
+                "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+            }
+        )
+        print(json.dumps(results[-1]))
+
+    clear(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
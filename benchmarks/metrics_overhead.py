@@ -0,0 +1,55 @@
+"""Per-call cost of the metrics layer, enabled and disabled.
+
+Times counter increments, histogram observations and timed blocks against
+a live registry and against one built with metrics off
+(``PAPERWALK_METRICS=0``), in nanoseconds per call:
+
+    python benchmarks/metrics_overhead.py
+"""
+
+import argparse
+import json
+import time
+
+from paperwalk.common.metrics import Registry
+
+
+def _per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    baseline = _per_call(lambda: None, args.calls)
+    for enabled in (True, False):
+        registry = Registry(enabled=enabled)
+        counter = registry.counter("bench_total", "Bench counter.", labels=("k",))
+        histogram = registry.histogram("bench_seconds", "Bench timer.", labels=("k",))
+
+        def timed():
+            with histogram.time("a"):
+                pass
+
+        results = {
+            "inc": _per_call(lambda: counter.inc("a"), args.calls),
+            "observe": _per_call(lambda: histogram.observe(0.02, "a"), args.calls),
+            "time": _per_call(timed, args.calls),
+        }
+        print(
+            json.dumps(
+                {
+                    "enabled": enabled,
+                    **{f"{k}_ns": round(v - baseline, 1) for k, v in results.items()},
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
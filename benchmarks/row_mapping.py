@@ -0,0 +1,119 @@
+"""Rows per second of the API-JSON to Neo4j row mapping.
+
+Times ``paper_rows`` on synthetic citation pages against the per-row dict
+building the inserters used before, and the Datasets ``paper_row``:
+
+    python benchmarks/row_mapping.py --rows 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from paperwalk.common.type import paper_rows
+from paperwalk.dataset.records import paper_row as dataset_paper_row
+
+
+def synthetic_page(size, rng):
+    data = []
+    for i in range(size):
+        authors = [
+            {"authorId": str(rng.randrange(10**6)), "name": f"Author {j}"}
+            for j in range(rng.randint(0, 6))
+        ]
+        data.append(
+            {
+                "citingPaper": {
+                    "paperId": f"{i:040x}",
+                    "title": f"Paper {i}",
+                    "authors": authors,
+                    "abstract": "An abstract." if rng.random() < 0.5 else None,
+                    "citationCount": rng.randint(0, 5000),
+                    "referenceCount": rng.randint(0, 80),
+                    "externalIds": {"ArXiv": "2101.00001"} if rng.random() < 0.3 else {},
+                    "year": rng.randint(1990, 2024),
+                }
+            }
+        )
+    return {"offset": 0, "data": data}
+
+
+def dict_rows(page, key):
+    # the mapping the inserters used to repeat inline, one dict per row
+    rows = []
+    for relation_paper in page.get("data") or []:
+        paper_info = relation_paper.get(key) or {}
+        if not paper_info.get("paperId"):
+            continue
+        authors = paper_info.get("authors") or []
+        rows.append(
+            {
+                "paperId": paper_info["paperId"],
+                "title": paper_info.get("title"),
+                "firstAuthor": authors[0].get("name") if authors else None,
+                "firstAuthorId": authors[0].get("authorId") if authors else None,
+                "lastAuthor": authors[-1].get("name") if authors else None,
+                "lastAuthorId": authors[-1].get("authorId") if authors else None,
+                "abstract": paper_info.get("abstract"),
+                "citationCount": int(paper_info.get("citationCount") or 0),
+                "referenceCount": int(paper_info.get("referenceCount") or 0),
+                "ArXiv": (paper_info.get("externalIds") or {}).get("ArXiv"),
+                "year": paper_info.get("year"),
+            }
+        )
+    return rows
+
+
+def rate(func, pages, rows):
+    start = time.perf_counter()
+    for page in pages:
+        func(page)
+    return round(rows / (time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    page = synthetic_page(args.page_size, rng)
+    pages = [page] * max(1, args.rows // args.page_size)
+    rows = len(pages) * args.page_size
+    records = [
+        {
+            "corpusid": i,
+            "title": entry["citingPaper"]["title"],
+            "authors": entry["citingPaper"]["authors"],
+            "citationcount": entry["citingPaper"]["citationCount"],
+            "referencecount": entry["citingPaper"]["referenceCount"],
+            "externalids": entry["citingPaper"]["externalIds"],
+            "year": entry["citingPaper"]["year"],
+        }
+        for i, entry in enumerate(page["data"])
+    ]
+
+    report = {
+        "rows": rows,
+        "rows_per_sec": {
+            "dict_rows": rate(lambda p: dict_rows(p, "citingPaper"), pages, rows),
+            "paper_rows": rate(lambda p: paper_rows(p, "citingPaper"), pages, rows),
+            "dataset_paper_row": rate(
+                lambda _: [dataset_paper_row(r) for r in records], pages, rows
+            ),
+        },
+        "json_bytes_per_row": {
+            "dict_rows": len(json.dumps(dict_rows(page, "citingPaper")))
+            // args.page_size,
+            "paper_rows": len(json.dumps(paper_rows(page, "citingPaper")))
+            // args.page_size,
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
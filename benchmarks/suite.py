@@ -0,0 +1,496 @@
+"""Offline benchmark suite: throughput of the hot paths, tracked over time.
+
+Runs every scenario against the fake Semantic Scholar server
+(``fake_s2.py``) and the in-memory Neo4j stand-in (``fake_neo4j.py``), so
+neither the live API nor a database is needed and runs are reproducible.
+
+- ``fetch_all``: paginating a hub paper's citations with ``fetch_all``
+- ``fetch_all_throttled``: the same with a share of 429 responses
+- ``expand_paper``: concurrent ``/papers/expand/{id}`` calls on the backend
+- ``expand_herd``: many simultaneous expansions of the same few papers
+- ``jobs``: interactive expansion jobs queued alongside bulk crawl jobs
+- ``field_profiles``: expansions with detail vs edge fields, then opening
+  papers so their abstracts are fetched into the abstract store
+- ``insert_bulk_<n>``: ``insert_papers_bulk`` in batches of ``n`` papers
+- ``ranking``: the in-process ``rank_graph`` export/compute/write cycle
+- ``graph_view``: uncached ``graph_view`` top-k and ego-network views
+
+Each run is appended to ``--history`` (JSON lines, with the git commit).
+A scenario whose throughput falls more than ``--threshold`` below the
+median of the previous ``--window`` runs is reported as a regression:
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --quick --only fetch_all ranking
+    python benchmarks/suite.py --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# the fake server has no quota; the real limits would dominate every timing
+os.environ.setdefault("SEMANTIC_SCHOLAR_RATE_LIMIT_UNKEYED", "10000,10000")
+
+import httpx  # noqa: E402
+
+from fake_neo4j import AsyncInMemoryNeo4j, InMemoryNeo4j  # noqa: E402
+from fake_s2 import FakeSemanticScholar, SyntheticGraph  # noqa: E402
+from paperwalk.api import AsyncSemanticScholarAPI  # noqa: E402
+from paperwalk.database import (  # noqa: E402
+    AbstractStore,
+    AsyncPaperReader,
+    PaperDatabaseManager,
+)
+from paperwalk.graph import graph_view, rank_graph  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, "results", "history.jsonl")
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    rank = int(round(q / 100 * len(ordered))) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+async def _fetch_all(server, paper_id):
+    async with AsyncSemanticScholarAPI(base_url=server.base_url) as api:
+        pages = rows = 0
+        start = time.perf_counter()
+        async for page in api.fetch_citations(paper_id, fetch_all=True):
+            pages += 1
+            rows += len(page["data"])
+        return pages, rows, time.perf_counter() - start
+
+
+def scenario_fetch_all(graph, args, throttle_rate=0.0):
+    hub = graph.ids[0]
+    with FakeSemanticScholar(
+        graph,
+        latency=args.latency,
+        jitter=args.latency / 2,
+        throttle_rate=throttle_rate,
+        seed=args.seed,
+    ) as server:
+        pages, rows, seconds = asyncio.run(_fetch_all(server, hub))
+        stats = dict(server.stats)
+    expected = len(graph.citations[0])
+    return {
+        "rows_per_sec": round(rows / seconds, 1),
+        "pages": pages,
+        "rows": rows,
+        "complete": rows == expected,
+        "seconds": round(seconds, 3),
+        "requests": stats["requests"],
+        "throttled": stats["throttled"],
+    }
+
+
+async def _expand_all(backend, paper_ids, concurrency):
+    transport = httpx.ASGITransport(app=backend.app)
+    latencies = []
+    queue = list(paper_ids)
+
+    async def worker(client):
+        while queue:
+            paper_id = queue.pop()
+            start = time.perf_counter()
+            response = await client.get(f"/papers/expand/{paper_id}")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return latencies, time.perf_counter() - start
+
+
+def _backend(graph, args, abstracts=None):
+    """Import the backend wired to an empty in-memory graph."""
+    scratch = tempfile.mkdtemp(prefix="paperwalk-bench-")
+    os.environ["PAPERWALK_SEARCH_INDEX_PATH"] = os.path.join(scratch, "search")
+    os.environ["PAPERWALK_CACHE_PATH"] = os.path.join(scratch, "cache.sqlite")
+    os.environ["PAPERWALK_JOBS_PATH"] = os.path.join(scratch, "jobs.sqlite")
+    # the backend builds its drivers at import; they are never connected here
+    os.environ.setdefault("NEO4J_URI", "bolt://127.0.0.1:7687")
+    sys.path.insert(0, os.path.join(HERE, "..", "scripts"))
+    import backend  # pylint: disable=import-outside-toplevel
+
+    # each scenario runs its own event loop; loop-bound state starts over
+    backend._route_semaphores.clear()
+    backend._snapshot_lock = None
+
+    conn = InMemoryNeo4j(round_trip=args.round_trip)
+    backend.conn = conn
+    backend.paper_db = PaperDatabaseManager(
+        conn, search_index=backend.search_index, abstracts=abstracts
+    )
+    backend.paper_reader = AsyncPaperReader(AsyncInMemoryNeo4j(conn), abstracts)
+    return backend, conn
+
+
+def scenario_expand_paper(graph, args):
+    backend, conn = _backend(graph, args)
+    with FakeSemanticScholar(
+        graph, latency=args.latency, jitter=args.latency / 2, seed=args.seed
+    ) as server:
+        backend.semantic_scholar_api = AsyncSemanticScholarAPI(
+            base_url=server.base_url
+        )
+        paper_ids = graph.ids[: args.expansions]
+        latencies, seconds = asyncio.run(
+            _expand_all(backend, paper_ids, args.concurrency)
+        )
+    return {
+        "expansions_per_sec": round(len(latencies) / seconds, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "papers_stored": len(conn.papers),
+        "transactions": conn.transactions,
+    }
+
+
+def scenario_insert_bulk(graph, args, batch_size):
+    conn = InMemoryNeo4j(round_trip=args.round_trip)
+    paper_db = PaperDatabaseManager(conn)
+    papers = [graph.paper(paper_id) for paper_id in graph.ids]
+    start = time.perf_counter()
+    for offset in range(0, len(papers), batch_size):
+        paper_db.insert_papers_bulk(papers[offset : offset + batch_size])
+    seconds = time.perf_counter() - start
+    return {
+        "rows_per_sec": round(len(papers) / seconds, 1),
+        "rows": len(papers),
+        "transactions": conn.transactions,
+        "seconds": round(seconds, 3),
+    }
+
+
+def scenario_expand_herd(graph, args, papers=5, copies=20):
+    """``copies`` simultaneous expansions of each of ``papers`` papers."""
+    backend, conn = _backend(graph, args)
+    collapsed = backend.expand_flight.collapsed
+    with FakeSemanticScholar(
+        graph, latency=args.latency, jitter=args.latency / 2, seed=args.seed
+    ) as server:
+        backend.semantic_scholar_api = AsyncSemanticScholarAPI(
+            base_url=server.base_url
+        )
+        paper_ids = graph.ids[-papers:] * copies
+        latencies, seconds = asyncio.run(
+            _expand_all(backend, paper_ids, len(paper_ids))
+        )
+        upstream = server.stats["requests"]
+    return {
+        "expansions_per_sec": round(len(latencies) / seconds, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "upstream_requests": upstream,
+        "collapsed": backend.expand_flight.collapsed - collapsed,
+        "transactions": conn.transactions,
+    }
+
+
+def scenario_jobs(graph, args, crawls=2):
+    """Interactive expansion jobs submitted while ``crawls`` crawls run."""
+    backend, conn = _backend(graph, args)
+    runner = backend.job_runner
+
+    async def run():
+        await runner.start()
+        try:
+            bulk = [
+                await runner.submit(
+                    "crawl",
+                    params={
+                        "seeds": [seed],
+                        "max_depth": 2,
+                        "max_nodes": 500,
+                        "fetch_all": False,
+                    },
+                    priority="bulk",
+                )
+                for seed in graph.ids[:crawls]
+            ]
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            jobs = [
+                await runner.submit("expand", paper_id, {"fetch_all": False})
+                for paper_id in graph.ids[-args.expansions :]
+            ]
+            for job in jobs:
+                async for _ in runner.watch(job["id"]):
+                    pass
+            seconds = time.perf_counter() - start
+            finished = [await runner.get(job["id"]) for job in jobs]
+            crawled = [(await runner.get(job["id"]))["progress"] for job in bulk]
+            for job in bulk:
+                await runner.cancel(job["id"])
+        finally:
+            await runner.stop()
+        return finished, crawled, seconds
+
+    with FakeSemanticScholar(
+        graph, latency=args.latency, jitter=args.latency / 2, seed=args.seed
+    ) as server:
+        backend.semantic_scholar_api = AsyncSemanticScholarAPI(
+            base_url=server.base_url
+        )
+        finished, crawled, seconds = asyncio.run(run())
+    latencies = [job["finished_at"] - job["created_at"] for job in finished]
+    return {
+        "jobs_per_sec": round(len(finished) / seconds, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "failed": sum(job["status"] != "succeeded" for job in finished),
+        "crawl_pages": sum(progress.get("pages", 0) for progress in crawled),
+    }
+
+
+async def _open_papers(backend, paper_ids):
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        responses = await asyncio.gather(
+            *(client.get(f"/papers/{paper_id}/details") for paper_id in paper_ids)
+        )
+    for response in responses:
+        response.raise_for_status()
+    return [response.json()["paper"] for response in responses]
+
+
+def scenario_field_profiles(graph, args, opened=20):
+    """Expansions fetching detail or edge fields, then ``opened`` papers viewed.
+
+    With the edge profile abstracts stay off the nodes and are fetched in
+    one batch into an AbstractStore when the papers are opened.
+    """
+    results = {}
+    for profile in ("detail", "edge"):
+        abstracts = None
+        if profile == "edge":
+            scratch = tempfile.mkdtemp(prefix="paperwalk-bench-")
+            abstracts = AbstractStore(os.path.join(scratch, "abstracts.sqlite"))
+        backend, conn = _backend(graph, args, abstracts)
+        with FakeSemanticScholar(
+            graph, latency=args.latency, jitter=args.latency / 2, seed=args.seed
+        ) as server:
+            api = AsyncSemanticScholarAPI(base_url=server.base_url)
+            api.profiles["edge"] = api.profiles[profile]
+            backend.semantic_scholar_api = api
+            backend.paper_batcher.api = api
+            paper_ids = graph.ids[: args.expansions]
+
+            async def run():
+                expanded = await _expand_all(backend, paper_ids, args.concurrency)
+                sizes = (
+                    server.stats["bytes"],
+                    sum(len(json.dumps(paper)) for paper in conn.papers.values()),
+                )
+                leaves = [pid for pid in conn.papers if pid not in paper_ids]
+                return expanded, sizes, await _open_papers(backend, leaves[:opened])
+
+            (latencies, seconds), (expand_bytes, node_bytes), papers = asyncio.run(
+                run()
+            )
+        results[f"{profile}_expansions_per_sec"] = round(len(latencies) / seconds, 1)
+        results[f"{profile}_upstream_kb"] = round(expand_bytes / 1024, 1)
+        results[f"{profile}_node_kb"] = round(node_bytes / 1024, 1)
+        results[f"{profile}_open_kb"] = round(
+            (server.stats["bytes"] - expand_bytes) / 1024, 1
+        )
+        results[f"{profile}_abstracts_shown"] = sum(
+            bool(paper.get("abstract")) for paper in papers
+        )
+    results["expansions_per_sec"] = results["edge_expansions_per_sec"]
+    return results
+
+
+def _loaded(graph, args):
+    conn = InMemoryNeo4j(round_trip=args.round_trip)
+    PaperDatabaseManager(conn).insert_papers_bulk(
+        [graph.paper(paper_id) for paper_id in graph.ids]
+    )
+    for source, targets in enumerate(graph.references):
+        for target in targets:
+            conn._add_edge(graph.ids[source], graph.ids[target])
+    return conn
+
+
+def scenario_ranking(graph, args):
+    conn = _loaded(graph, args)
+    start = time.perf_counter()
+    timings = rank_graph(conn)
+    seconds = time.perf_counter() - start
+    return {
+        "nodes_per_sec": round(len(graph.ids) / seconds, 1),
+        "edges": sum(len(targets) for targets in graph.references),
+        **{phase: round(value, 3) for phase, value in timings.items()},
+    }
+
+
+def scenario_graph_view(graph, args):
+    conn = _loaded(graph, args)
+    rank_graph(conn)
+    requests = [{"limit": 200}, {"limit": 1000}, {"limit": 200, "min_citations": 20}]
+    requests += [{"limit": 200, "focus": paper_id} for paper_id in graph.ids[:20]]
+    latencies, payload, sampled = [], 0, 0
+    start = time.perf_counter()
+    for kwargs in requests:
+        view_start = time.perf_counter()
+        view = graph_view(conn, **kwargs)
+        latencies.append(time.perf_counter() - view_start)
+        payload += len(json.dumps(view))
+        sampled += view["sampled"]
+    seconds = time.perf_counter() - start
+    return {
+        "views_per_sec": round(len(requests) / seconds, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "mean_payload_kb": round(payload / len(requests) / 1024, 1),
+        "sampled": sampled,
+    }
+
+
+# scenario -> (function, throughput metric; higher is better)
+SCENARIOS = {
+    "fetch_all": (scenario_fetch_all, "rows_per_sec"),
+    "fetch_all_throttled": (
+        lambda graph, args: scenario_fetch_all(graph, args, throttle_rate=0.02),
+        "rows_per_sec",
+    ),
+    "expand_paper": (scenario_expand_paper, "expansions_per_sec"),
+    "expand_herd": (scenario_expand_herd, "expansions_per_sec"),
+    "jobs": (scenario_jobs, "jobs_per_sec"),
+    "field_profiles": (scenario_field_profiles, "expansions_per_sec"),
+    "insert_bulk_100": (
+        lambda graph, args: scenario_insert_bulk(graph, args, 100),
+        "rows_per_sec",
+    ),
+    "insert_bulk_1000": (
+        lambda graph, args: scenario_insert_bulk(graph, args, 1000),
+        "rows_per_sec",
+    ),
+    "insert_bulk_10000": (
+        lambda graph, args: scenario_insert_bulk(graph, args, 10_000),
+        "rows_per_sec",
+    ),
+    "ranking": (scenario_ranking, "nodes_per_sec"),
+    "graph_view": (scenario_graph_view, "views_per_sec"),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=HERE,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(history, results, window, threshold):
+    """Compare each scenario's throughput with its recent median.
+
+    ``history`` should only hold runs made with the same configuration.
+    """
+    report = {}
+    for name, result in results.items():
+        metric = SCENARIOS[name][1]
+        previous = [
+            run["results"][name][metric]
+            for run in history[-window:]
+            if name in run.get("results", {})
+        ]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        change = (result[metric] - baseline) / baseline if baseline else 0.0
+        report[name] = {
+            "metric": metric,
+            "baseline": baseline,
+            "current": result[metric],
+            "change": round(change, 3),
+            "regression": change < -threshold,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS))
+    parser.add_argument("--quick", action="store_true", help="small graph, few calls")
+    parser.add_argument("--papers", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--round-trip", type=float, default=0.002)
+    parser.add_argument("--expansions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--no-record", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    if args.quick:
+        args.papers = min(args.papers, 3000)
+        args.expansions = min(args.expansions, 40)
+
+    graph = SyntheticGraph(args.papers, seed=args.seed)
+    results = {}
+    for name in args.only or SCENARIOS:
+        func, metric = SCENARIOS[name]
+        results[name] = func(graph, args)
+        print(json.dumps({"scenario": name, **results[name]}))
+
+    config = {
+        key: getattr(args, key)
+        for key in ("papers", "latency", "round_trip", "expansions", "seed")
+    }
+    history = [
+        run for run in load_history(args.history) if run["config"] == config
+    ]
+    regressions = find_regressions(history, results, args.window, args.threshold)
+    for name, entry in regressions.items():
+        if entry["regression"]:
+            print(f"REGRESSION {name}: {json.dumps(entry)}")
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        run = {
+            "timestamp": time.time(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "config": config,
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+
+    if args.fail_on_regression and any(
+        entry["regression"] for entry in regressions.values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
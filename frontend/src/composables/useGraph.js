@@ -1,5 +1,6 @@
 import { ref } from 'vue';
-import NeoVis from 'neovis.js/dist/neovis.js';
+import axios from 'axios';
+import { DataSet, Network } from 'vis-network/standalone';
 import { useNodeStyles } from './useNodeStyles';
 
 // eslint-disable-next-line no-unused-vars
@@ -8,123 +9,129 @@ const { randomSize, getColor, getOpacity, getTitles } = useNodeStyles();
 export const selectedPaper = ref(null);
 export const selectedEdge = ref(null);
 
+// the rendered graph, shared so expansions can be merged into it
+const nodes = new DataSet();
+const edges = new DataSet();
+let network = null;
+
+// papers drawn by the initial view; the backend prunes beyond this
+const VIEW_LIMIT = 200;
+
+const titleProperties = [
+    "title",
+    "year",
+    "citationCount",
+    "firstAuthor",
+    "pagerank",
+    "articlerank",
+];
+
+const toTitle = (paper) => titleProperties
+    .filter((name) => paper[name] !== undefined)
+    .map((name) => `${name}: ${paper[name]}`)
+    .join('\n');
+
+const toVisNode = (paper) => {
+    const node = { properties: paper };
+    return {
+        id: paper.paperId,
+        label: getTitles(node),
+        title: toTitle(paper),
+        opacity: getOpacity(node),
+        mass: 2.0,
+        raw: node,
+    };
+};
+
+const toVisEdge = ([source, target]) => {
+    const from = nodes.get(source);
+    const to = nodes.get(target);
+    // use log scale to make the thickness of the edge more visually distinguishable
+    const product = (from.raw.properties.citationCount || 1) * (to.raw.properties.citationCount || 1);
+    return {
+        id: `${source}->${target}`,
+        from: source,
+        to: target,
+        width: Math.max(1, Math.log(product)),
+        arrows: { to: { enabled: true } },
+        smooth: true,
+    };
+};
+
+// the view carries only what is drawn; details (and the abstract, fetched
+// upstream the first time) come from the backend when a paper is opened
+async function loadDetails(paper) {
+    try {
+        const { data } = await axios.get(`papers/${paper.paperId}/details`);
+        if (selectedPaper.value && selectedPaper.value.paperId === paper.paperId) {
+            selectedPaper.value = { ...paper, ...data.paper };
+        }
+    } catch (e) {
+        console.error(e);
+    }
+}
+
 export function useGraph(selectedPaper, selectedEdge) {
-    
-    function initializeGraph(minCitationCount = 0) {
-        let initialCypher;
-        // if (minCitationCount === 0) { // No filter
-        //     initialCypher = 'MATCH (p1:Paper)-[r:CITES]->(p2:Paper) RETURN p1,r,p2 LIMIT 100';
-        // } else { // Specific range
-        //     initialCypher = `MATCH (p1:Paper)-[r:CITES]->(p2:Paper) WHERE p1.citationCount >= ${minCitationCount} OR p2.citationCount >= ${minCitationCount} RETURN p1,r,p2 LIMIT 100`;
-        // }
-        initialCypher = `
-                    MATCH (p1:Paper) 
-                    WHERE p1.citationCount >= ${minCitationCount} 
-                    RETURN p1 AS paper1, NULL AS relationship, NULL AS paper2 
-                    LIMIT 100
-    
-                    UNION
-    
-                    // Query to return edges between papers where either paper meets the citation count condition
-                    MATCH (p1:Paper)-[r:CITES]->(p2:Paper) 
-                    WHERE p1.citationCount >= ${minCitationCount} AND p2.citationCount >= ${minCitationCount} 
-                    RETURN p1 AS paper1, r AS relationship, p2 AS paper2 
-                    LIMIT 100
-                    `;
-        const config = {
-            containerId: "neoVisGraph",
-            neo4j: {
-                serverUrl: process.env.VUE_APP_NEO4J_URL,
-                serverUser: process.env.VUE_APP_NEO4J_USER,
-                serverPassword: process.env.VUE_APP_NEO4J_PASSWORD,
-            },
-            labels: {
-                "Paper": {
-                    [NeoVis.NEOVIS_ADVANCED_CONFIG]: {
-                        function: {
-                            // value: (node) => this.randomSize(node),
-                            title: (node) => NeoVis.objectToTitleString(node, [
-                                "title",
-                                "year",
-                                "citationCount",
-                                // "paperId",
-                                "firstAuthor",
-                                "pagerank",
-                                "articlerank",
-                                // "lastAuthor",
-                            ]),
-    
-                            label: getTitles,
-                            // value: this.randomSize,
-                            opacity: getOpacity,
-                            // color: this.getColor,
-                        },
-                        static: {
-                            mass: 2.0
-                        }
-                    },
-                },
-            },
-            relationships: {
-                "CITES": {
-                    // "thickness": "weight",
-                    // "label": "weight",
-                    // "thickness": "weight",
-                    // "caption": true
-                    [NeoVis.NEOVIS_ADVANCED_CONFIG]: {
-                        function: {
-                            // "label": (rel) => rel.type,
-                            width: (rel) => {
-                                try {
-                                    const nodeFrom = rel.start;
-                                    const nodeTo = rel.end;
-                                    const nodeFromCitationCount = viz.nodes.get(nodeFrom).raw.properties.citationCount;
-                                    const nodeToCitationCount = viz.nodes.get(nodeTo).raw.properties.citationCount;
-                                    // return Math.max(1, nodeFromCitationCount * nodeToCitationCount * 0.02);
-                                    // Use log scale to make the thickness of the edge more visually distinguishable
-                                    return Math.max(1, Math.log(nodeFromCitationCount * nodeToCitationCount));
-                                } catch (e) {
-                                    console.error(e);
-                                    return 1;
-                                }
-                            }
-                        },
-                        static: {
-                            arrows: {
-                                to: {
-                                    enabled: true,
-                                },
-                            },
-                            smooth: true,
-                        }
-                    },
-                },
-    
-            },
-            initialCypher: initialCypher,
-    
-        };
-    
-        const viz = new NeoVis(config);
-        viz.render();
-    
-        viz.registerOnEvent('clickNode', (e) => {
-            // e: { nodeId: number; node: Node }
-            try {
-                selectedPaper.value = e.node.raw.properties;
-                console.log(selectedPaper.value);
-            }
-            catch (e) {
-                console.error(e);
+
+    function ensureNetwork() {
+        if (network) {
+            return;
+        }
+        const container = document.getElementById("neoVisGraph");
+        network = new Network(container, { nodes, edges }, {});
+        network.on("click", (e) => {
+            if (e.nodes.length) {
+                selectedPaper.value = nodes.get(e.nodes[0]).raw.properties;
+                loadDetails(selectedPaper.value);
+            } else if (e.edges.length) {
+                selectedEdge.value = edges.get(e.edges[0]);
             }
         });
-        // Assuming network is your Vis.js network instance
-        viz.registerOnEvent("clickEdge", (e) => {
-            selectedEdge.value = e.edge;
-            // console.log(this.selectedEdge);
-            // console.log(viz.nodes.get(e.edge.from));
-        });
     }
 
-    return { initializeGraph };
+    // Draw the backend's pruned view of the graph: the best-ranked papers
+    // with at least minCitationCount citations and the edges among them.
+    async function initializeGraph(minCitationCount = 0) {
+        ensureNetwork();
+        try {
+            const response = await axios.get('graph/view', {
+                params: { min_citations: minCitationCount, limit: VIEW_LIMIT },
+            });
+            const view = response.data.subgraph;
+            nodes.clear();
+            edges.clear();
+            // view edges are positions in view.nodes
+            addSubgraph({
+                nodes: view.nodes,
+                edges: view.edges.map(([source, target]) => [
+                    view.nodes[source].paperId,
+                    view.nodes[target].paperId,
+                ]),
+            });
+        } catch (e) {
+            console.error(e);
+        }
+    }
+
+    // Merge a { nodes, edges } subgraph returned by the backend into the
+    // rendered graph.
+    function addSubgraph(subgraph) {
+        if (!subgraph) {
+            return;
+        }
+        ensureNetwork();
+        nodes.update(
+            subgraph.nodes
+                .filter((paper) => nodes.get(paper.paperId) === null)
+                .map(toVisNode)
+        );
+        edges.update(
+            subgraph.edges
+                .filter(([source, target]) => edges.get(`${source}->${target}`) === null)
+                .filter(([source, target]) => nodes.get(source) && nodes.get(target))
+                .map(toVisEdge)
+        );
+    }
+
+    return { initializeGraph, addSubgraph };
 }
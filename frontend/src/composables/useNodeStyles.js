@@ -29,8 +29,8 @@ export function useNodeStyles() {
 
     const getTitles = (node) => {
         //    return node.properties.title === undefined ? "" : node.properties.title.split(" ")[0]
-    let title = node.properties.firstAuthor === undefined ? "" : node.properties.firstAuthor.split(" ").slice(-1)[0]
-    if (node.properties.year === undefined) {
+    let title = node.properties.firstAuthor == null ? "" : node.properties.firstAuthor.split(" ").slice(-1)[0]
+    if (node.properties.year == null) {
         return title
     }
     title += " (" + node.properties.year + ")"
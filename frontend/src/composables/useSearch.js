@@ -2,8 +2,22 @@ import { ref } from 'vue';
 import axios from 'axios';
 import { useGraph, selectedPaper, selectedEdge } from './useGraph';
 
-// eslint-disable-next-line no-unused-vars
-const { initializeGraph } = useGraph(selectedPaper, selectedEdge);
+const { addSubgraph } = useGraph(selectedPaper, selectedEdge);
+
+// search hits carry the author list, the graph view wants the first author;
+// like the backend's nodes, a paper without one has no firstAuthor key
+const toViewNode = (paper) => {
+    const node = {
+        paperId: paper.paperId,
+        title: paper.title,
+        year: paper.year,
+        citationCount: paper.citationCount,
+    };
+    if (paper.authors && paper.authors.length && paper.authors[0].name != null) {
+        node.firstAuthor = paper.authors[0].name;
+    }
+    return node;
+};
 
 export function useSearchApi() {
     const data = ref(null);
@@ -16,7 +30,9 @@ export function useSearchApi() {
         try {
             const response = await axios.get('search', { params: { query } });
             data.value = response.data;
-            initializeGraph();
+            // hits are written to Neo4j in the background, so draw them
+            // from the response instead of re-reading the graph
+            addSubgraph({ nodes: response.data.data.map(toViewNode), edges: [] });
         } catch (err) {
             error.value = err;
             console.error(err);
@@ -1,32 +1,221 @@
+import asyncio
+import base64
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
 from dotenv import load_dotenv
-from typing import Union
+from typing import List, Optional, Union
 
-from paperwalk.api import SemanticScholarAPI
+# before the paperwalk imports: settings such as PAPERWALK_METRICS are read
+# when those modules are imported
+load_dotenv()
+
+from paperwalk.api import AsyncSemanticScholarAPI, PaperBatcher
+from paperwalk.api.async_semantic_scholar import SEARCH_MAX_RESULTS
+from paperwalk.api.cache import DEFAULT_TTLS, ResponseCache
+from paperwalk.common.metrics import REGISTRY, stats_collector
+from paperwalk.common.profiler import profile_from_env
+from paperwalk.common.singleflight import AsyncSingleFlight
 from paperwalk.common.type import Paper, Relation
-from paperwalk.database import Neo4jConnection, PaperDatabaseManager
+from paperwalk.crawl import Crawler
+from paperwalk.database import (
+    AbstractStore,
+    AsyncNeo4jConnection,
+    AsyncPaperReader,
+    Neo4jConnection,
+    PaperDatabaseManager,
+)
+from paperwalk.graph import (
+    BIAS_PROPERTIES,
+    BIASES,
+    RANK_PROPERTIES,
+    ViewCache,
+    WalkEngine,
+    export_csr,
+    graph_view,
+)
+from paperwalk.jobs import PRIORITIES, JobRunner, JobStore
+from paperwalk.search import MODES, LocalSearchIndex
 from graphdatascience import GraphDataScience
-from fastapi import FastAPI
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-load_dotenv()
-
+# writes and heavy reads go through the synchronous driver on db_executor;
+# light reads are awaited on the event loop through the async driver. Each
+# driver has its own pool of PAPERWALK_NEO4J_POOL_SIZE connections, and
+# connectivity is checked at startup
+neo4j_pool = {
+    "max_pool_size": int(os.getenv("PAPERWALK_NEO4J_POOL_SIZE", "100")),
+    "acquisition_timeout": float(os.getenv("PAPERWALK_NEO4J_ACQUIRE_TIMEOUT", "60")),
+}
 conn = Neo4jConnection(
     uri=os.getenv("NEO4J_URI"),
     user=os.getenv("NEO4J_USER"),
     pwd=os.getenv("NEO4J_PWD"),
+    verify=False,
+    **neo4j_pool,
+)
+async_conn = AsyncNeo4jConnection(
+    uri=os.getenv("NEO4J_URI"),
+    user=os.getenv("NEO4J_USER"),
+    pwd=os.getenv("NEO4J_PWD"),
+    **neo4j_pool,
+)
+
+# ranking needs the Graph Data Science plugin, so it is opt-in
+gds = None
+if os.getenv("PAPERWALK_USE_GDS"):
+    gds = GraphDataScience(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PWD")),
+        database="neo4j",
+    )
+
+# full-text index over the stored papers, updated as papers are written
+search_index = LocalSearchIndex(
+    os.getenv("PAPERWALK_SEARCH_INDEX_PATH", ".paperwalk/search")
+)
+
+# abstracts are kept compressed outside the graph and only fetched once a
+# paper is opened; expansion pages ask Semantic Scholar for edge fields only
+abstract_store = AbstractStore(
+    os.getenv("PAPERWALK_ABSTRACTS_PATH", ".paperwalk/abstracts.sqlite")
+)
+
+paper_db = PaperDatabaseManager(conn, gds, search_index, abstract_store)
+paper_reader = AsyncPaperReader(async_conn, abstract_store)
+
+# expansions younger than this (seconds) are served from the local graph
+EXPAND_TTL = float(os.getenv("PAPERWALK_EXPAND_TTL", str(24 * 3600)))
+
+# cached citation pages must expire well before an expansion does, or a
+# re-expansion would be answered from the cache with the same citations
+response_cache = ResponseCache(
+    os.getenv("PAPERWALK_CACHE_PATH", ".paperwalk/cache.sqlite"),
+    ttls={"citations": min(DEFAULT_TTLS["citations"], EXPAND_TTL / 4)},
+)
+
+semantic_scholar_api = AsyncSemanticScholarAPI(
+    api_key=os.getenv("SEMANTIC_SCHOLAR_API_KEY"),
+    cache=response_cache,
+)
+# counters kept by the cache and the rate limiter are read at scrape time
+REGISTRY.add_collector(
+    stats_collector("paperwalk_cache", "Response cache", response_cache.stats)
+)
+REGISTRY.add_collector(
+    stats_collector("paperwalk_abstracts", "Abstract store", abstract_store.stats)
+)
+REGISTRY.add_collector(
+    stats_collector(
+        "paperwalk_rate_limit",
+        "Semantic Scholar rate limiter",
+        semantic_scholar_api.rate_limiter.stats,
+    )
+)
+for driver, pooled in (("sync", conn), ("async", async_conn)):
+    REGISTRY.add_collector(
+        stats_collector(
+            "paperwalk_neo4j_pool",
+            "Neo4j sessions",
+            pooled.pool_stats,
+            labels={"driver": driver},
+        )
+    )
+
+# single-paper lookups arriving close together share one /paper/batch call
+paper_batcher = PaperBatcher(semantic_scholar_api)
+
+# concurrent requests for the same paper lookup or expansion share one run
+paper_flight = AsyncSingleFlight("paper")
+expand_flight = AsyncSingleFlight("expand")
+
+# Neo4j writes go through the synchronous driver, so they run on a bounded
+# thread pool instead of on the event loop
+db_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PAPERWALK_DB_WORKERS", "8")),
+    thread_name_prefix="neo4j",
+)
+
+# maximum number of in-flight requests per route; extra requests wait
+route_limits = {
+    "papers": int(os.getenv("PAPERWALK_LIMIT_PAPERS", "32")),
+    "search": int(os.getenv("PAPERWALK_LIMIT_SEARCH", "16")),
+    "expand": int(os.getenv("PAPERWALK_LIMIT_EXPAND", "4")),
+    "recommend": int(os.getenv("PAPERWALK_LIMIT_RECOMMEND", "8")),
+    "view": int(os.getenv("PAPERWALK_LIMIT_VIEW", "8")),
+    "clear": 1,
+    "rank": 1,
+}
+_route_semaphores = {}
+
+# recommendations walk an in-memory snapshot of the graph; after writes it is
+# rebuilt at most once per PAPERWALK_SNAPSHOT_MIN_AGE seconds
+SNAPSHOT_MIN_AGE = float(os.getenv("PAPERWALK_SNAPSHOT_MIN_AGE", "60"))
+_snapshot = {"graph": None, "version": None, "built": 0.0, "engines": {}}
+_snapshot_lock = None
+
+# /graph/view payloads per filter set; any write through paper_db bumps its
+# version and so invalidates them, and PAPERWALK_VIEW_CACHE_TTL bounds how
+# stale writes from other processes can leave them
+view_cache = ViewCache(
+    maxsize=int(os.getenv("PAPERWALK_VIEW_CACHE_SIZE", "64")),
+    ttl=float(os.getenv("PAPERWALK_VIEW_CACHE_TTL", "300")),
+)
+REGISTRY.add_collector(
+    stats_collector("paperwalk_view_cache", "Graph view cache", view_cache.stats)
 )
 
-# gds = GraphDataScience(
-#         os.getenv("NEO4J_URI"),
-#         auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PWD")),
-#         database="neo4j",
-#     )
+# expansions and crawls submitted to /jobs run on PAPERWALK_JOB_WORKERS
+# workers, at most PAPERWALK_JOB_BULK_WORKERS of them on bulk jobs; the
+# queue survives restarts and finished jobs are kept for
+# PAPERWALK_JOB_RETENTION seconds
+job_store = JobStore(os.getenv("PAPERWALK_JOBS_PATH", ".paperwalk/jobs.sqlite"))
+JOB_RETENTION = float(os.getenv("PAPERWALK_JOB_RETENTION", str(7 * 24 * 3600)))
+# concurrent expansions within one crawl job
+CRAWL_JOB_WORKERS = int(os.getenv("PAPERWALK_CRAWL_JOB_WORKERS", "2"))
 
-paper_db = PaperDatabaseManager(conn)
+# sampling profiler started when PAPERWALK_PROFILE names an output file
+profiler = None
+
+
+@asynccontextmanager
+async def route_limit(route):
+    """Bound the number of concurrent requests served by a route."""
+    if route not in _route_semaphores:
+        _route_semaphores[route] = asyncio.Semaphore(route_limits[route])
+    async with _route_semaphores[route]:
+        yield
+
+
+async def run_db(func, *args):
+    """Run a blocking database call on the database thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, func, *args)
+
+
+async def walk_engine(bias):
+    """Return a WalkEngine over a recent snapshot of the graph."""
+    global _snapshot_lock  # pylint: disable=global-statement
+    if _snapshot_lock is None:
+        _snapshot_lock = asyncio.Lock()
+    async with _snapshot_lock:
+        changed = _snapshot["version"] != paper_db.version
+        if _snapshot["graph"] is None or (
+            changed and time.time() - _snapshot["built"] >= SNAPSHOT_MIN_AGE
+        ):
+            version = paper_db.version
+            graph = await run_db(export_csr, conn, BIAS_PROPERTIES)
+            _snapshot.update(graph=graph, version=version, built=time.time(), engines={})
+        engines = _snapshot["engines"]
+        if bias not in engines:
+            engines[bias] = await run_db(WalkEngine, _snapshot["graph"], bias)
+        return engines[bias]
 
-semantic_scholar_api = SemanticScholarAPI(api_key=os.getenv("SEMANTIC_SCHOLAR_API_KEY"))
 
 app = FastAPI()
 
@@ -46,57 +235,557 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    """Check that Neo4j is reachable and the graph has its constraints and indexes."""
+    global profiler  # pylint: disable=global-statement
+    profiler = profile_from_env(os.environ)
+    await run_db(conn.verify)
+    await async_conn.verify()
+    await run_db(paper_db.ensure_schema)
+    await run_db(paper_db.move_abstracts)
+    await job_runner.prune(JOB_RETENTION)
+    await job_runner.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections and worker threads."""
+    if profiler is not None:
+        profiler.stop()
+        profiler.write()
+    await job_runner.stop()
+    job_store.close()
+    await semantic_scholar_api.close()
+    response_cache.close()
+    abstract_store.close()
+    search_index.close()
+    db_executor.shutdown(wait=True)
+    conn.close()
+    await async_conn.close()
+
+async def lookup_paper(paper_id):
+    async with route_limit("papers"):
+        return await paper_batcher.fetch_paper(paper_id)
+
 @app.get("/papers/{paper_id}", response_model=Paper)
 async def get_paper(paper_id: str):
     """Fetch paper data by ID."""
-    paper_data = semantic_scholar_api.fetch_paper(paper_id)
+    paper_data = await paper_flight.do(paper_id, lookup_paper, paper_id)
+    if paper_data is None:
+        raise HTTPException(status_code=404, detail=f"Paper not found: {paper_id}")
     return paper_data
 
+@app.get("/papers/{paper_id}/details", response_model=dict)
+async def get_paper_details(paper_id: str):
+    """Return a stored paper with its abstract.
+
+    The first time a paper is opened its details are fetched upstream,
+    where lookups arriving together share one /paper/batch call. The
+    abstract is then kept in the abstract store and the node is flagged
+    hydrated, so later requests are answered locally.
+    """
+    paper = await paper_reader.get_details(paper_id)
+    if paper is None:
+        raise HTTPException(status_code=404, detail=f"Paper not found: {paper_id}")
+    if not paper["hydrated"]:
+        paper_data = await paper_flight.do(paper_id, lookup_paper, paper_id)
+        if paper_data is not None:
+            abstracts = await run_db(paper_db.hydrate, [paper_data])
+            paper.update(abstract=abstracts.get(paper_id), hydrated=True)
+    return {"status": "success", "paper": paper}
+
 # insert paper
 @app.post("/papers", response_model=dict)
 async def insert_paper(paper_id: str):
     """Insert paper data into the database."""
     paper_data = await get_paper(paper_id)
-    paper_db.insert_paper(paper_id, paper_data)
+    await run_db(paper_db.insert_paper, paper_id, paper_data)
     return {"status": "success"}
 
 @app.get("/papers/{paper_id}/citations", response_model=Union[dict, list])  # Adjust the response_model as needed
 async def get_citations(paper_id: str):
     """Fetch citation data for a paper by ID."""
-    citation_data = semantic_scholar_api.fetch_citations(paper_id)
-    return citation_data
+    async with route_limit("papers"):
+        async for citation_data in semantic_scholar_api.fetch_citations(
+            paper_id, profile="detail"
+        ):
+            return citation_data
 
 @app.get("/papers/{paper_id}/references", response_model=Union[dict, list])  # Adjust the response_model as needed
 async def get_references(paper_id: str):
     """Fetch reference data for a paper by ID."""
-    reference_data = semantic_scholar_api.fetch_references(paper_id)
-    return reference_data
+    async with route_limit("papers"):
+        async for reference_data in semantic_scholar_api.fetch_references(
+            paper_id, profile="detail"
+        ):
+            return reference_data
+
+@app.get("/papers/{paper_id}/recommendations", response_model=dict)
+async def recommend_papers(
+    paper_id: str,
+    k: int = Query(20, ge=1, le=1000),
+    walks: int = Query(10_000, ge=1, le=100_000),
+    restart: float = Query(0.15, gt=0, lt=1),
+    bias: Optional[str] = None,
+):
+    """Rank the papers to read next by random walks with restart.
+
+    Walks start at ``paper_id`` and follow citations in both directions;
+    ``bias`` (pagerank, year or citationCount) favors neighbors with a high
+    value of that property. Scores are visit frequencies.
+    """
+    if bias is not None and bias not in BIASES:
+        raise HTTPException(status_code=400, detail=f"Unknown bias: {bias}")
+    async with route_limit("recommend"):
+        engine = await walk_engine(bias)
+        ranked = await run_db(
+            lambda: engine.recommend(
+                [paper_id], k=k, walks=walks, restart=restart
+            )
+        )
+        papers = await run_db(paper_db.get_papers, [pid for pid, _ in ranked])
+    return {
+        "status": "success",
+        "recommendations": [
+            {**papers.get(pid, {"paperId": pid}), "score": score}
+            for pid, score in ranked
+        ],
+    }
+
+@app.get("/authors/{author_id}/papers", response_model=dict)
+async def get_author_papers(author_id: str, limit: int = 100):
+    """List an author's stored papers, most cited first."""
+    result = await paper_reader.get_author_papers(author_id, min(limit, 1000))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Author not found: {author_id}")
+    return {"status": "success", **result}
+
+@app.get("/authors/{author_id}/coauthors", response_model=dict)
+async def get_coauthors(author_id: str, limit: int = 100):
+    """List an author's co-authors, ordered by the number of shared papers."""
+    result = await paper_reader.get_coauthors(author_id, min(limit, 1000))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Author not found: {author_id}")
+    return {"status": "success", **result}
+
+async def collect_new_pages(pages, key, known, progress=None):
+    """Drop rows already in the graph from a page stream.
+
+    Once the paper has been expanded before, the walk stops at the first
+    page that overlaps what is stored, so only the delta is fetched.
+    """
+    new_pages = []
+    async for page in pages:
+        if page is None:
+            continue
+        if progress is not None:
+            progress.add(pages=1)
+        rows = page.get("data") or []
+        fresh = [
+            row for row in rows if (row.get(key) or {}).get("paperId") not in known
+        ]
+        new_pages.append({"data": fresh})
+        if known and len(fresh) < len(rows):
+            break
+    return new_pages
 
 @app.get("/papers/expand/{paper_id}", response_model=dict)
 async def expand_paper(paper_id: str):
-    """Expand paper information by fetching and storing its citations and references."""
-    citation_data = semantic_scholar_api.fetch_citations(paper_id)
-    for citation in citation_data:
-        paper_db.insert_citations_or_references_bulk(paper_id, citation, Relation.CITES)
-    reference_data = semantic_scholar_api.fetch_references(paper_id)
-    for reference in reference_data:
-        paper_db.insert_citations_or_references_bulk(paper_id, reference, Relation.REFERENCES)
-    return {"status": "success"}
+    """Expand paper information by fetching and storing its citations and references.
+
+    Returns the paper's neighborhood subgraph. Within PAPERWALK_EXPAND_TTL
+    of the last expansion it is read straight from the graph; after that
+    only citations that are not stored yet are fetched and written.
+    Concurrent expansions of the same paper share one run.
+    """
+    return await expand_flight.do(paper_id, _expand_paper, paper_id)
+
+async def _expand_paper(paper_id):
+    async with route_limit("expand"):
+        return await expand(paper_id)
+
+async def expand(paper_id, fetch_all=False, progress=None):
+    """Fetch and store a paper's citations and references.
+
+    Without ``fetch_all`` only the first pages are fetched, a recent
+    expansion is served from the graph and an older one only fetches the
+    citations that are new. With it every page is walked again, for deep
+    expansions run as jobs. Pages fetched and rows written are added to
+    ``progress`` when given.
+    """
+    expansion = await paper_reader.get_expansion(paper_id)
+    expanded_at = (expansion or {}).get("expandedAt")
+    if not fetch_all and expanded_at and time.time() - expanded_at < EXPAND_TTL:
+        subgraph = await paper_reader.get_neighborhood(paper_id)
+        return {"status": "success", "source": "graph", "subgraph": subgraph}
+
+    citing, cited = set(), set()
+    if expanded_at and not fetch_all:
+        citing, cited = await run_db(paper_db.get_neighbor_ids, paper_id)
+    citations = await collect_new_pages(
+        semantic_scholar_api.fetch_citations(paper_id, fetch_all),
+        "citingPaper",
+        citing,
+        progress,
+    )
+    citation_stats = await run_db(
+        paper_db.ingest_pages, paper_id, citations, Relation.CITES
+    )
+    if progress is not None:
+        progress.add(rows=citation_stats["rows"])
+    # reference lists do not change once published
+    reference_stats = {"rows": 0}
+    if fetch_all or not (expanded_at and expansion.get("referencesFetched")):
+        references = await collect_new_pages(
+            semantic_scholar_api.fetch_references(paper_id, fetch_all),
+            "citedPaper",
+            cited,
+            progress,
+        )
+        reference_stats = await run_db(
+            paper_db.ingest_pages, paper_id, references, Relation.REFERENCES
+        )
+        if progress is not None:
+            progress.add(rows=reference_stats["rows"])
+    await run_db(
+        paper_db.mark_expanded,
+        paper_id,
+        citation_stats["rows"],
+        reference_stats["rows"],
+    )
+    if paper_db.ranking:
+        await run_db(
+            paper_db.ranking.after_expand,
+            paper_id,
+            bool(os.getenv("PAPERWALK_RANK_ON_EXPAND")),
+        )
+    subgraph = await run_db(paper_db.get_neighborhood, paper_id)
+    return {"status": "success", "source": "upstream", "subgraph": subgraph}
+
+async def run_expand_job(job, progress):
+    """Expand one paper for a job; the subgraph is left in the graph."""
+    expansion = await expand(job["paper_id"], job["params"]["fetch_all"], progress)
+    subgraph = expansion["subgraph"] or {"nodes": [], "edges": []}
+    return {
+        "source": expansion["source"],
+        "nodes": len(subgraph["nodes"]),
+        "edges": len(subgraph["edges"]),
+    }
+
+async def run_crawl_job(job, progress):
+    """Crawl out from the job's seeds, checkpointing so a restart resumes."""
+    params = job["params"]
+    checkpoint_path = os.path.join(
+        os.path.dirname(os.path.abspath(job_store.path)), f"crawl-{job['id']}.json"
+    )
+    crawler = Crawler(
+        semantic_scholar_api,
+        paper_db,
+        workers=CRAWL_JOB_WORKERS,
+        max_depth=params["max_depth"],
+        max_nodes=params["max_nodes"],
+        fetch_all=params["fetch_all"],
+        checkpoint_path=checkpoint_path,
+        progress=lambda stats: progress.update(**stats),
+        executor=db_executor,
+    )
+    try:
+        stats = await crawler.run(params["seeds"])
+    except asyncio.CancelledError:
+        # keep the checkpoint of a crawl interrupted by a shutdown
+        if (await job_runner.get(job["id"]))["cancel_requested"]:
+            with suppress(FileNotFoundError):
+                os.remove(checkpoint_path)
+        raise
+    with suppress(FileNotFoundError):
+        os.remove(checkpoint_path)
+    return stats
+
+job_runner = JobRunner(
+    job_store,
+    {"expand": run_expand_job, "crawl": run_crawl_job},
+    workers=int(os.getenv("PAPERWALK_JOB_WORKERS", "4")),
+    bulk_workers=int(os.getenv("PAPERWALK_JOB_BULK_WORKERS", "1")),
+)
+REGISTRY.add_collector(
+    stats_collector("paperwalk_jobs", "Background jobs", job_runner.stats)
+)
+
+def check_priority(priority):
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown priority: {priority}")
+
+@app.post("/jobs/expand/{paper_id}", response_model=dict)
+async def submit_expand_job(
+    paper_id: str, fetch_all: bool = False, priority: str = "interactive"
+):
+    """Queue an expansion of a paper and return the job.
+
+    With ``fetch_all`` every page of citations and references is fetched,
+    which can take far longer than a request may. Interactive jobs run
+    ahead of bulk ones; an identical pending job is returned instead of a
+    new one.
+    """
+    check_priority(priority)
+    job = await job_runner.submit(
+        "expand", paper_id, {"fetch_all": fetch_all}, priority
+    )
+    return {"status": "success", "job": job}
+
+@app.post("/jobs/crawl", response_model=dict)
+async def submit_crawl_job(
+    seed: List[str] = Query(...),
+    max_depth: int = 2,
+    max_nodes: int = 1000,
+    fetch_all: bool = False,
+    priority: str = "bulk",
+):
+    """Queue a multi-hop crawl from one or more ``seed`` papers."""
+    check_priority(priority)
+    params = {
+        "seeds": sorted(set(seed)),
+        "max_depth": max_depth,
+        "max_nodes": min(max_nodes, 100_000),
+        "fetch_all": fetch_all,
+    }
+    job = await job_runner.submit("crawl", None, params, priority)
+    return {"status": "success", "job": job}
+
+@app.get("/jobs", response_model=dict)
+async def list_jobs(status: Optional[str] = None, limit: int = 100):
+    """List the most recent jobs, optionally only those in ``status``."""
+    jobs = await job_runner.list(status, min(limit, 1000))
+    return {"status": "success", "jobs": jobs}
+
+@app.get("/jobs/{job_id}", response_model=dict)
+async def get_job(job_id: str, request: Request):
+    """Return a job with its status and progress (pages, rows).
+
+    Clients that accept ``text/event-stream`` or ``application/x-ndjson``
+    instead get the job every time it changes, until it has finished.
+    """
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    accept = request.headers.get("accept", "")
+    if "text/event-stream" in accept or "application/x-ndjson" in accept:
+        sse = "text/event-stream" in accept
+
+        async def stream():
+            async for update in job_runner.watch(job_id):
+                if sse:
+                    yield f"event: job\ndata: {json.dumps(update)}\n\n"
+                else:
+                    yield json.dumps(update) + "\n"
+
+        return StreamingResponse(
+            stream(), media_type="text/event-stream" if sse else "application/x-ndjson"
+        )
+    return {"status": "success", "job": job}
+
+@app.delete("/jobs/{job_id}", response_model=dict)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"status": "success", "job": job}
+
+def encode_cursor(query, offset):
+    """Return an opaque cursor pointing at search result ``offset``."""
+    state = json.dumps({"q": query, "o": offset}).encode()
+    return base64.urlsafe_b64encode(state).decode().rstrip("=")
+
+def decode_cursor(query, cursor):
+    """Return the offset a cursor points at, 0 for no cursor."""
+    if not cursor:
+        return 0
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(state["o"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if state.get("q") != query:
+        raise HTTPException(status_code=400, detail="Cursor belongs to another query")
+    return offset
+
+async def search_pages(query, offset, limit, new_papers):
+    """Yield search result pages as ``{"total", "count", "data"}``.
+
+    Hits already streamed are dropped, the others are tagged with whether
+    they are already in the graph, and the ones that are not are collected
+    in ``new_papers`` for a single write once the response is sent.
+    """
+    seen = set()
+    fetch_all = limit is None or limit > semantic_scholar_api.max_limit
+    async for page in semantic_scholar_api.search_papers(
+        query, fetch_all=fetch_all, offset=offset, limit=limit
+    ):
+        if page is None:
+            return
+        rows = page.get("data") or []
+        hits = [
+            row for row in rows if row.get("paperId") and row["paperId"] not in seen
+        ]
+        known = await run_db(paper_db.get_known_ids, [row["paperId"] for row in hits])
+        for row in hits:
+            seen.add(row["paperId"])
+            row["inGraph"] = row["paperId"] in known
+            if not row["inGraph"]:
+                new_papers.append(row)
+        yield {"total": page.get("total"), "count": len(rows), "data": hits}
+
+def next_cursor(query, position, total):
+    if total is None or position >= min(total, SEARCH_MAX_RESULTS):
+        return None
+    return encode_cursor(query, position)
+
+async def store_search_results(papers):
+    """Upsert the papers a search found in one batched write."""
+    if papers:
+        await run_db(paper_db.insert_papers_bulk, papers)
 
 @app.get("/search", response_model=Union[dict, list])  # Adjust the response_model as needed
-async def search_papers(query: str):
-    """Search papers."""
-    search_results = semantic_scholar_api.search_papers(query)
-    for results in search_results:
-        res = results["data"]
-        for paper in res:
-            paper_db.insert_paper(paper["paperId"], paper)
-    return search_results
+async def search_papers(
+    query: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Search papers.
+
+    Returns one page of ``limit`` hits with the cursor of the next page.
+    Clients that accept ``text/event-stream`` or ``application/x-ndjson``
+    instead get every hit from ``cursor`` on (up to ``limit``) as it
+    arrives, followed by a final record carrying the next cursor. Hits not
+    yet in the graph are written after the response, in one batch.
+    """
+    offset = decode_cursor(query, cursor)
+    new_papers = []
+    accept = request.headers.get("accept", "")
+    if "text/event-stream" in accept or "application/x-ndjson" in accept:
+        sse = "text/event-stream" in accept
+
+        def encode(record, event):
+            if sse:
+                return f"event: {event}\ndata: {json.dumps(record)}\n\n"
+            return json.dumps(record) + "\n"
+
+        async def stream():
+            position, total = offset, None
+            async with route_limit("search"):
+                async for page in search_pages(query, offset, limit, new_papers):
+                    position += page["count"]
+                    total = page["total"]
+                    for hit in page["data"]:
+                        yield encode(hit, "paper")
+            end = {"next": next_cursor(query, position, total), "total": total}
+            yield encode(end, "end")
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream" if sse else "application/x-ndjson",
+            background=BackgroundTask(store_search_results, new_papers),
+        )
+
+    position, total, hits = offset, None, []
+    limit = limit or semantic_scholar_api.limit
+    async with route_limit("search"):
+        async for page in search_pages(query, offset, limit, new_papers):
+            position += page["count"]
+            total = page["total"]
+            hits.extend(page["data"])
+    if total is None and offset == 0:
+        # Semantic Scholar gave up (e.g. throttled); answer from the graph
+        hits = await asyncio.get_running_loop().run_in_executor(
+            None, search_index.search, query, limit
+        )
+        return {"data": hits, "total": len(hits), "next": None, "source": "local"}
+    background_tasks.add_task(store_search_results, new_papers)
+    return {
+        "data": hits,
+        "total": total,
+        "next": next_cursor(query, position, total),
+        "source": "upstream",
+    }
+
+@app.get("/search/local", response_model=dict)
+async def search_local(query: str, k: int = 10, mode: str = "bm25"):
+    """Search the titles and abstracts of the papers stored in the graph.
+
+    ``mode`` is ``bm25``, ``vector`` (hashed TF-IDF cosine) or ``hybrid``.
+    """
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown search mode: {mode}")
+    hits = await asyncio.get_running_loop().run_in_executor(
+        None, search_index.search, query, k, mode
+    )
+    return {"status": "success", "data": hits}
+
+@app.get("/graph/view", response_model=dict)
+async def get_graph_view(
+    rank_by: str = "pagerank",
+    min_citations: int = 0,
+    limit: int = 200,
+    focus: Optional[str] = None,
+    depth: int = 1,
+    max_edges: Optional[int] = None,
+):
+    """Return a pruned subgraph for the graph view.
+
+    The ``limit`` papers ranked highest by ``rank_by`` (pagerank,
+    articlerank or citationCount) with at least ``min_citations``
+    citations, or with ``focus`` that paper's ``depth``-hop ego network.
+    Edges beyond ``max_edges`` are sampled away. Views are cached until
+    the next write to the graph.
+    """
+    if rank_by not in RANK_PROPERTIES:
+        raise HTTPException(status_code=400, detail=f"Unknown ranking: {rank_by}")
+    if depth not in (1, 2):
+        raise HTTPException(status_code=400, detail="depth must be 1 or 2")
+    limit = max(1, min(limit, 2000))
+    if max_edges is not None:
+        max_edges = max(0, min(max_edges, 20_000))
+    key = (rank_by, min_citations, limit, focus, depth, max_edges)
+    version = paper_db.version
+    view = view_cache.get(key, version)
+    if view is None:
+        async with route_limit("view"):
+            view = await run_db(
+                graph_view,
+                conn,
+                rank_by,
+                min_citations,
+                limit,
+                focus,
+                depth,
+                max_edges,
+            )
+        if view is None:
+            raise HTTPException(status_code=404, detail=f"Paper not found: {focus}")
+        view_cache.put(key, version, view)
+    return {"status": "success", "subgraph": view}
+
+@app.post("/rank", response_model=dict)
+async def rank_papers():
+    """Recompute PageRank/ArticleRank scores for every paper."""
+    async with route_limit("rank"):
+        timings = await run_db(paper_db.run_pagerank)
+    return {"status": "success", "timings": timings}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose counters and latency histograms in the Prometheus text format."""
+    # collectors may query SQLite stores, so render off the event loop
+    text = await asyncio.get_running_loop().run_in_executor(None, REGISTRY.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
 
 @app.post("/clear", response_model=dict)
 async def clean_database():
     """Clear the database."""
-    paper_db.clean_database()
+    async with route_limit("clear"):
+        await run_db(paper_db.clean_database)
     return {"status": "success"}
 
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
+import asyncio
 import os
 
-from neo4j import GraphDatabase
 from graphdatascience import GraphDataScience
 from dotenv import load_dotenv
-from paperwalk.api import SemanticScholarAPI
-from paperwalk.common.type import Paper, Relation
+from paperwalk.api import AsyncSemanticScholarAPI
+from paperwalk.crawl import Crawler
 from paperwalk.database import Neo4jConnection, PaperDatabaseManager
 
 if __name__ == "__main__":
@@ -20,43 +20,44 @@ if __name__ == "__main__":
         database="neo4j",
     )
     paper_db = PaperDatabaseManager(conn, gds)
-    paper_db.clean_database()
+    checkpoint_path = os.getenv("PAPERWALK_CRAWL_CHECKPOINT")
+    if not (checkpoint_path and os.path.exists(checkpoint_path)):
+        paper_db.clean_database()
+    paper_db.ensure_schema()
 
-    semantic_scholar_api = SemanticScholarAPI(
+    semantic_scholar_api = AsyncSemanticScholarAPI(
         api_key=os.getenv("SEMANTIC_SCHOLAR_API_KEY")
     )
 
     # Replace with the actual paper ID
     paper_id = "649def34f8be52c8b66281af98ae884c09aef38b"
-    paper_data = semantic_scholar_api.fetch_paper(paper_id)
-
-    if paper_data:
-        paper_db.insert_paper(paper_id, paper_data)
-
-    citation_data = semantic_scholar_api.fetch_citations(paper_id)
-    for citation in citation_data:
-        paper_db.insert_citations_or_references_bulk(paper_id, citation, Relation.CITES)
-        # for paper in citation_data['data'],
-        for citing_paper in citation["data"]:
-            paper_id = citing_paper["citingPaper"]["paperId"]
-            paper_data = semantic_scholar_api.fetch_paper(paper_id)
-            if paper_data:
-                paper_db.insert_paper(paper_id, paper_data)
-            reference_data = semantic_scholar_api.fetch_references(paper_id)
-            for reference in reference_data:
-                paper_db.insert_citations_or_references_bulk(
-                    paper_id, reference, Relation.REFERENCES
-                )
+
+    # seed -> citing/cited papers -> their neighbors, breadth first; rerunning
+    # after an interruption resumes from the checkpoint
+    crawler = Crawler(
+        semantic_scholar_api,
+        paper_db,
+        priority="depth",
+        workers=4,
+        max_depth=2,
+        max_nodes=500,
+        checkpoint_path=checkpoint_path,
+    )
+
+    async def crawl():
+        async with semantic_scholar_api:
+            await crawler.run([paper_id])
+
+    asyncio.run(crawl())
 
     paper_db.run_pagerank()
 
     # query
     query = """
     MATCH (p:Paper)
-    RETURN p.title, p.abstract, p.citationCount, p.citingPaperId
+    RETURN p.title, p.citationCount, p.citingPaperId
     """
-    result = conn.execute_query(query, protected=False)
-    for record in result:
+    for record in conn.stream(query):
         print(record)
 
     conn.close()
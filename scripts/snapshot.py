@@ -0,0 +1,68 @@
+"""Save, restore or clear the paper graph.
+
+    python scripts/snapshot.py export snapshots/demo
+    python scripts/snapshot.py import snapshots/demo --clear
+    python scripts/snapshot.py clear
+
+A snapshot is a directory with the papers (Parquet when pyarrow is
+installed, gzipped JSON lines otherwise), an ``edges.npy`` citation list and
+a manifest. Restored papers are also added to the local search index at
+``PAPERWALK_SEARCH_INDEX_PATH``.
+"""
+
+import argparse
+import json
+import os
+
+from dotenv import load_dotenv
+
+from paperwalk.database import (
+    Neo4jConnection,
+    PaperDatabaseManager,
+    export_snapshot,
+    import_snapshot,
+)
+from paperwalk.search import LocalSearchIndex
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["export", "import", "clear"])
+    parser.add_argument("directory", nargs="?")
+    parser.add_argument("--clear", action="store_true", help="clear before import")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    if args.command != "clear" and not args.directory:
+        parser.error(f"{args.command} needs a snapshot directory")
+
+    load_dotenv()
+    conn = Neo4jConnection(
+        uri=os.getenv("NEO4J_URI"),
+        user=os.getenv("NEO4J_USER"),
+        pwd=os.getenv("NEO4J_PWD"),
+    )
+    search_index = None
+    if args.command != "export":
+        search_index = LocalSearchIndex(
+            os.getenv("PAPERWALK_SEARCH_INDEX_PATH", ".paperwalk/search")
+        )
+    paper_db = PaperDatabaseManager(conn, search_index=search_index)
+
+    if args.command == "export":
+        report = export_snapshot(conn, args.directory, chunk_size=args.batch_size)
+    else:
+        if args.command == "clear" or args.clear:
+            paper_db.clean_database(batch_size=args.batch_size)
+        report = {"status": "cleared"}
+        if args.command == "import":
+            paper_db.ensure_schema()
+            report = import_snapshot(
+                conn,
+                args.directory,
+                batch_size=args.batch_size,
+                on_papers=lambda rows: search_index.add(
+                    row._asdict() for row in rows
+                ),
+            )
+        search_index.close()
+    print(json.dumps(report, indent=2))
+    conn.close()
@@ -1,3 +1,5 @@
 from .semantic_scholar import SemanticScholarAPI
+from .async_semantic_scholar import AsyncSemanticScholarAPI
+from .batcher import PaperBatcher
 
-__all__ = ["SemanticScholarAPI"]
\ No newline at end of file
+__all__ = ["SemanticScholarAPI", "AsyncSemanticScholarAPI", "PaperBatcher"]
\ No newline at end of file
@@ -0,0 +1,364 @@
+import asyncio
+import functools
+from collections import deque
+from logging import getLogger, INFO
+
+import backoff
+import httpx
+
+from paperwalk.api.cache import cache_key
+from paperwalk.api.rate_limit import ThrottledError, get_rate_limiter, parse_retry_after
+from paperwalk.api.semantic_scholar import (
+    BASE_URL,
+    BATCH_MAX_IDS,
+    DEFAULT_FIELDS,
+    FIELD_PROFILES,
+    MAX_TRIES,
+    RETRY_STATUS_CODES,
+    endpoint_label,
+    note_giveup,
+    note_retry,
+)
+from paperwalk.common.metrics import UPSTREAM_RESPONSES, UPSTREAM_SECONDS
+from paperwalk.common.singleflight import AsyncSingleFlight
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+# /paper/search only serves the first 1000 relevance-ranked results
+SEARCH_MAX_RESULTS = 1000
+
+
+class AsyncSemanticScholarAPI:
+    """Asynchronous Semantic Scholar API wrapper.
+
+    Keeps a pool of keep-alive connections and, once the first page of a
+    ``fetch_all`` walk reports how many results there are, fetches the
+    remaining pages concurrently. Pages are still yielded in offset order.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        max_connections=10,
+        concurrency=4,
+        cache=None,
+        base_url=BASE_URL,
+    ):
+        if api_key is not None:
+            self.api_key = api_key
+            self.header = {"x-api-key": self.api_key}
+        else:
+            self.header = None
+            logger.warning("API key is not set")
+        self.timeout = 10
+        self.fields = DEFAULT_FIELDS
+        self.profiles = dict(FIELD_PROFILES)
+        self.limit = 10
+        self.max_limit = 100
+        assert (
+            self.limit <= self.max_limit
+        ), "limit must be less than or equal to max_limit"
+        self.concurrency = concurrency
+        # a local stand-in (see benchmarks/fake_s2.py) can replace the API
+        self.base_url = base_url
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=self.header,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        # created lazily so it binds to the running event loop
+        self._semaphore = None
+        # shared by every client in the process that uses the same quota
+        self.rate_limiter = get_rate_limiter(keyed=self.header is not None)
+        # optional paperwalk.api.cache.ResponseCache shared with other clients
+        self.cache = cache
+        self._flights = AsyncSingleFlight("semantic_scholar")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled HTTP client"""
+        await self.client.aclose()
+
+    @backoff.on_exception(
+        backoff.expo,
+        (httpx.TimeoutException, httpx.TransportError, ThrottledError),
+        max_tries=MAX_TRIES,
+        on_backoff=note_retry,
+        on_giveup=note_giveup,
+        raise_on_giveup=False,
+    )
+    async def _send(
+        self, path: str, params: dict, payload: dict = None, headers: dict = None
+    ):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        endpoint = endpoint_label(path)
+        async with self._semaphore:
+            await self.rate_limiter.acquire_async()
+            with UPSTREAM_SECONDS.time(endpoint):
+                if payload is None:
+                    response = await self.client.get(
+                        path, params=params, headers=headers
+                    )
+                else:
+                    response = await self.client.post(
+                        path, params=params, json=payload
+                    )
+        UPSTREAM_RESPONSES.inc(endpoint, response.status_code)
+        if response.status_code in (200, 304):
+            return response
+        if response.status_code in RETRY_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.pause(retry_after)
+            raise ThrottledError(response.status_code, retry_after)
+        logger.error("Failed to fetch data: HTTP %d", response.status_code)
+        return None
+
+    async def _request(
+        self, path: str, params: dict, payload: dict = None
+    ) -> [dict, list, None]:
+        if payload is not None:
+            response = await self._send(path, params, payload)
+            return response.json() if response is not None else None
+        # identical GETs already in flight are awaited instead of re-sent
+        key = cache_key(self.base_url + path, params)
+        return await self._flights.do(key, self._get, path, params, key)
+
+    async def _off_loop(self, func, *args, **kwargs):
+        # the cache reads and writes SQLite, so it is called off the loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _get(self, path, params, key):
+        if self.cache is None:
+            response = await self._send(path, params)
+            return response.json() if response is not None else None
+        entry = await self._off_loop(self.cache.get, key)
+        if entry is not None and entry.fresh:
+            return entry.value
+        response = await self._send(
+            path, params, headers=entry.conditional_headers() if entry else None
+        )
+        if response is None:
+            # serve a stale copy rather than nothing when upstream is down
+            return entry.value if entry is not None else None
+        if response.status_code == 304:
+            await self._off_loop(self.cache.refresh, key, entry)
+            return entry.value
+        data = response.json()
+        await self._off_loop(
+            self.cache.set,
+            key,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    def _paper_key(self, paper_id):
+        return cache_key(f"{self.base_url}/paper/{paper_id}", {"fields": self.fields})
+
+    async def fetch_paper(self, paper_id, fields=None):
+        """Fetch a paper by its ID"""
+        return await self._request(
+            f"/paper/{paper_id}", {"fields": fields or self.fields}
+        )
+
+    async def fetch_papers_batch(self, paper_ids):
+        """Fetch many papers by ID, up to BATCH_MAX_IDS per request.
+
+        Chunks are requested concurrently. Returns a list aligned with
+        ``paper_ids``; unknown IDs and failed batches map to ``None``. Papers
+        found fresh in the cache are not requested again, and fetched papers
+        are cached individually.
+        """
+        paper_ids = list(paper_ids)
+        papers = {}
+        missing = list(dict.fromkeys(paper_ids))
+        if self.cache is not None:
+            missing = []
+
+            def lookup():
+                return {
+                    paper_id: self.cache.get(self._paper_key(paper_id))
+                    for paper_id in dict.fromkeys(paper_ids)
+                }
+
+            for paper_id, entry in (await self._off_loop(lookup)).items():
+                if entry is not None and entry.fresh:
+                    papers[paper_id] = entry.value
+                else:
+                    missing.append(paper_id)
+        chunks = [
+            missing[start : start + BATCH_MAX_IDS]
+            for start in range(0, len(missing), BATCH_MAX_IDS)
+        ]
+        responses = await asyncio.gather(
+            *(
+                self._request("/paper/batch", {"fields": self.fields}, {"ids": chunk})
+                for chunk in chunks
+            )
+        )
+        fetched = {}
+        for chunk, response in zip(chunks, responses):
+            for paper_id, paper in zip(chunk, response or []):
+                papers[paper_id] = paper
+                if paper is not None:
+                    fetched[paper_id] = paper
+        if fetched and self.cache is not None:
+
+            def store():
+                for paper_id, paper in fetched.items():
+                    self.cache.set(self._paper_key(paper_id), paper)
+
+            await self._off_loop(store)
+        return [papers.get(paper_id) for paper_id in paper_ids]
+
+    async def fetch_citations(self, paper_id, fetch_all=False, profile="edge"):
+        """Fetch citations of a paper, with the fields of ``profile``"""
+        async for page in self._fetch_related(
+            paper_id, "citations", "citationCount", fetch_all, self.profiles[profile]
+        ):
+            yield page
+
+    async def fetch_references(self, paper_id, fetch_all=False, profile="edge"):
+        """Fetch references of a paper, with the fields of ``profile``"""
+        async for page in self._fetch_related(
+            paper_id, "references", "referenceCount", fetch_all, self.profiles[profile]
+        ):
+            yield page
+
+    async def search_papers(self, query, fetch_all=False, offset=0, limit=None):
+        """Search papers
+
+        Results start at ``offset``. Without ``fetch_all`` a single page of
+        ``limit`` results (``self.limit`` by default) is returned; with it,
+        pages follow until ``limit`` results or the search cap are reached.
+        """
+        path = "/paper/search"
+        params = {"query": query, "fields": self.fields}
+        end = SEARCH_MAX_RESULTS
+        if limit is not None:
+            end = min(offset + limit, end)
+        if not fetch_all:
+            size = min(limit or self.limit, self.max_limit, end - offset)
+            if size > 0:
+                yield await self._request(
+                    path, {**params, "limit": size, "offset": offset}
+                )
+            return
+        if offset >= end:
+            return
+        first = await self._request(path, self._page_params(params, offset, end))
+        if first is None or len(first.get("data", [])) == 0:
+            return
+        yield first
+        total = min(first.get("total", 0), end)
+        async for page in self._paginate(
+            path, params, offset + self.max_limit, total, cap=end
+        ):
+            yield page
+
+    async def _fetch_related(self, paper_id, relation, count_field, fetch_all, fields):
+        path = f"/paper/{paper_id}/{relation}"
+        params = {"fields": fields}
+        if not fetch_all:
+            yield await self._request(path, {**params, "limit": self.limit})
+            return
+        # relation pages carry no total, so ask for the count alongside the
+        # first page instead of after it
+        first, paper = await asyncio.gather(
+            self._request(path, {**params, "limit": self.max_limit}),
+            self.fetch_paper(paper_id, fields=count_field),
+        )
+        if first is None or len(first.get("data", [])) == 0:
+            return
+        yield first
+        total = (paper or {}).get(count_field) or 0
+        async for page in self._paginate(path, params, self.max_limit, total):
+            yield page
+
+    async def _paginate(self, path, params, start, total, cap=None):
+        """Yield pages from ``start`` onwards, fetching ahead concurrently.
+
+        Offsets below ``total`` are requested through a sliding window of
+        tasks. Counts reported by the API can lag behind the actual lists, so
+        if the last expected page is still full, the walk continues one page
+        at a time until an empty page comes back or ``cap`` is reached.
+        """
+        window = deque()
+        offsets = iter(range(start, total, self.max_limit))
+        next_offset = start
+        last_full = True
+        try:
+            for offset in offsets:
+                window.append(self._schedule(path, params, offset, cap))
+                next_offset = offset + self.max_limit
+                if len(window) < self.concurrency * 2:
+                    continue
+                page = await window.popleft()
+                if self._is_last(page, path):
+                    return
+                last_full = len(page["data"]) == self.max_limit
+                yield page
+            while window:
+                page = await window.popleft()
+                if self._is_last(page, path):
+                    return
+                last_full = len(page["data"]) == self.max_limit
+                yield page
+            while last_full and (cap is None or next_offset < cap):
+                page = await self._request(
+                    path, self._page_params(params, next_offset, cap)
+                )
+                next_offset += self.max_limit
+                if self._is_last(page, path):
+                    return
+                last_full = len(page["data"]) == self.max_limit
+                yield page
+        finally:
+            for task in window:
+                task.cancel()
+
+    @staticmethod
+    def _is_last(page, path):
+        if page is None:
+            # stop rather than leave a silent gap in the results
+            logger.error("Giving up on %s after repeated failures", path)
+            return True
+        return len(page.get("data", [])) == 0
+
+    def _page_params(self, params, offset, cap):
+        # the last page is shortened so offset + limit never passes the cap
+        limit = self.max_limit if cap is None else min(self.max_limit, cap - offset)
+        return {**params, "limit": limit, "offset": offset}
+
+    def _schedule(self, path, params, offset, cap=None):
+        return asyncio.ensure_future(
+            self._request(path, self._page_params(params, offset, cap))
+        )
+
+
+if __name__ == "__main__":
+
+    async def main():
+        async with AsyncSemanticScholarAPI() as api:
+            paper = await api.fetch_paper("649def34f8be52c8b66281af98ae884c09aef38b")
+            print(paper)
+            async for citation in api.fetch_citations(
+                "649def34f8be52c8b66281af98ae884c09aef38b", fetch_all=True
+            ):
+                print(len(citation["data"]))
+
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+import asyncio
+from logging import getLogger, INFO
+
+from paperwalk.api.semantic_scholar import BATCH_MAX_IDS
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+
+class PaperBatcher:
+    """Coalesce individual paper lookups into ``/paper/batch`` requests.
+
+    ``fetch_paper`` calls made within ``window`` seconds of each other are
+    collected and sent as one batch call; a batch is sent right away once it
+    reaches ``max_batch`` IDs. Concurrent lookups of the same ID share one
+    slot in the batch.
+    """
+
+    def __init__(self, api, window=0.02, max_batch=BATCH_MAX_IDS):
+        self.api = api
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._timer = None
+        self.requests = 0
+        self.batches = 0
+
+    async def fetch_paper(self, paper_id):
+        """Fetch a paper by its ID through the next batch"""
+        self.requests += 1
+        future = self._pending.get(paper_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[paper_id] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.window, self._flush
+                )
+        return await asyncio.shield(future)
+
+    async def fetch_papers(self, paper_ids):
+        """Fetch several papers, sharing batches with concurrent callers"""
+        return await asyncio.gather(
+            *(self.fetch_paper(paper_id) for paper_id in paper_ids)
+        )
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.batches += 1
+            asyncio.ensure_future(self._resolve(pending))
+
+    async def _resolve(self, pending):
+        try:
+            papers = await self.api.fetch_papers_batch(list(pending))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("Batch lookup of %d papers failed: %s", len(pending), e)
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, paper in zip(pending.values(), papers):
+            if not future.done():
+                future.set_result(paper)
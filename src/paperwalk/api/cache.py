@@ -0,0 +1,245 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from logging import getLogger, INFO
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+# seconds a cached response is served without asking upstream again;
+# citations are kept for less than the backend's 24h expansion TTL, so a
+# paper expanded again sees the citations it gained since
+DEFAULT_TTLS = {
+    "paper": 7 * 24 * 3600,
+    "citations": 6 * 3600,
+    "references": 7 * 24 * 3600,
+    "search": 3600,
+}
+
+
+def cache_key(url, params=None):
+    """Normalize a request URL and its query parameters into a cache key.
+
+    Query parameters are sorted and the comma-separated ``fields`` list is
+    sorted too, so equivalent requests built in different ways share a key.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if params:
+        query.update({k: str(v) for k, v in params.items()})
+    if "fields" in query:
+        query["fields"] = ",".join(sorted(query["fields"].split(",")))
+    return f"{parts.path}?{urlencode(sorted(query.items()))}"
+
+
+def endpoint_of(key):
+    """Return the endpoint family of a cache key, used to pick its TTL."""
+    path = key.split("?", 1)[0]
+    if path.endswith("/paper/search"):
+        return "search"
+    if path.endswith("/citations"):
+        return "citations"
+    if path.endswith("/references"):
+        return "references"
+    return "paper"
+
+
+class CacheEntry:
+    """A cached response body with its validators."""
+
+    __slots__ = ("value", "etag", "last_modified", "expires_at")
+
+    def __init__(self, value, etag, last_modified, expires_at):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    def conditional_headers(self):
+        """Headers that let upstream answer 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Two-tier response cache for the Semantic Scholar clients.
+
+    Recently used entries live in an in-memory LRU. Every entry is also kept
+    in a SQLite file, so a restarted process starts warm. Each endpoint has
+    its own TTL. Once an entry expires it is revalidated with its ETag /
+    Last-Modified rather than dropped. The file holds at most
+    ``max_disk_entries`` rows; the least recently used rows go first.
+    Access times of disk hits are written in batches, with the next write.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_memory_entries=2048,
+        max_disk_entries=200_000,
+        ttls=None,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        # access times of disk hits, written with the next commit
+        self._touched = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)"
+        )
+        self._db.commit()
+
+    def close(self):
+        """Close the backing SQLite file."""
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
+
+    def get(self, key):
+        """Return the entry for ``key``, fresh or stale, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._db.execute(
+                    "SELECT body, etag, last_modified, expires_at FROM responses"
+                    " WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    body, etag, last_modified, expires_at = row
+                    entry = CacheEntry(
+                        json.loads(zlib.decompress(body)),
+                        etag,
+                        last_modified,
+                        expires_at,
+                    )
+                    self._touched[key] = time.time()
+                    if len(self._touched) >= 1000:
+                        self._flush_touched()
+                        self._db.commit()
+                    self._remember(key, entry)
+                    self.disk_hits += 1
+            if entry is not None and entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def set(self, key, value, etag=None, last_modified=None):
+        """Store a response body under ``key``."""
+        now = time.time()
+        entry = CacheEntry(
+            value, etag, last_modified, now + self.ttls[endpoint_of(key)]
+        )
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        with self._lock:
+            self._remember(key, entry)
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, entry.expires_at, now),
+            )
+            self._db.commit()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 1000:
+                self._evict()
+
+    def refresh(self, key, entry):
+        """Extend an entry's lifetime after upstream answered 304."""
+        entry.expires_at = time.time() + self.ttls[endpoint_of(key)]
+        with self._lock:
+            self.revalidated += 1
+            self._remember(key, entry)
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._db.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (entry.expires_at, time.time(), key),
+            )
+            self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self):
+        # batched so a read does not leave a write transaction open
+        if self._touched:
+            self._db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _evict(self):
+        self._writes_since_evict = 0
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_disk_entries
+        if excess <= 0:
+            return
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN"
+            " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+            (excess,),
+        )
+        self._db.commit()
+        self.evictions += excess
+        logger.debug("Evicted %d cached responses", excess)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import threading
+import time
+from logging import getLogger, INFO
+
+logger = getLogger(__name__)
+logger.setLevel(INFO)
+
+# (requests per second, burst) for each Semantic Scholar quota. Unkeyed
+# clients share the public pool, so they are kept well below it. Override
+# with SEMANTIC_SCHOLAR_RATE_LIMIT_KEYED / _UNKEYED as "rate,burst".
+RATE_LIMITS = {
+    "keyed": (1.0, 1),
+    "unkeyed": (100 / 300, 10),
+}
+
+
+class ThrottledError(Exception):
+    """Raised for responses that should be retried (429 and 5xx)."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds; dates are ignored."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by sync and async callers.
+
+    Each call reserves a token up front and then sleeps for however long the
+    reservation is in the future, so waiting callers are served in order.
+    ``pause`` blocks every caller until a point in time, which is how a
+    Retry-After from one response slows down everyone on the same quota.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.wait_seconds = 0.0
+        self.acquired = 0
+        self.throttled = 0
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._paused_until - now, 0.0)
+            self.acquired += 1
+            self.wait_seconds += wait
+            return wait
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hold back every caller for ``seconds`` after a throttled response."""
+        with self._lock:
+            self.throttled += 1
+            if seconds:
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + seconds
+                )
+
+    def stats(self):
+        """Return counters for throttle waits and throttled responses."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(keyed):
+    """Return the process-wide bucket for the keyed or unkeyed quota."""
+    quota = "keyed" if keyed else "unkeyed"
+    with _limiters_lock:
+        if quota not in _limiters:
+            rate, burst = RATE_LIMITS[quota]
+            override = os.getenv(f"SEMANTIC_SCHOLAR_RATE_LIMIT_{quota.upper()}")
+            if override:
+                rate, burst = override.split(",")
+                rate, burst = float(rate), int(burst)
+            _limiters[quota] = TokenBucket(rate, burst)
+        return _limiters[quota]
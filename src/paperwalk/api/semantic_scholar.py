@@ -10,14 +10,63 @@ from logging import (
 import requests
 import backoff
 
+from paperwalk.api.cache import cache_key, endpoint_of
+from paperwalk.api.rate_limit import ThrottledError, get_rate_limiter, parse_retry_after
+from paperwalk.common.metrics import (
+    UPSTREAM_FAILURES,
+    UPSTREAM_RESPONSES,
+    UPSTREAM_RETRIES,
+    UPSTREAM_SECONDS,
+)
+from paperwalk.common.singleflight import SingleFlight
+
 logger = getLogger(__name__)
 logger.setLevel(INFO)
 
+BASE_URL = "https://api.semanticscholar.org/graph/v1"
+DEFAULT_FIELDS = (
+    "paperId,title,authors,abstract,citationCount,referenceCount,externalIds,year,"
+    "venue"
+)
+# citation/reference pages only need what the graph stores for a neighbour;
+# abstracts are fetched separately once a paper is opened
+EDGE_FIELDS = (
+    "paperId,title,authors,citationCount,referenceCount,externalIds,year,venue"
+)
+# field sets selectable per call
+FIELD_PROFILES = {"detail": DEFAULT_FIELDS, "edge": EDGE_FIELDS}
+# the /paper/batch endpoint accepts at most 500 IDs per request
+BATCH_MAX_IDS = 500
+# attempts per request; throttled responses are retried, not dropped
+MAX_TRIES = 8
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def endpoint_label(url):
+    """Endpoint family of a request URL or path, for metrics."""
+    if url.split("?", 1)[0].endswith("/paper/batch"):
+        return "batch"
+    return endpoint_of(url)
+
+
+def note_retry(details):
+    """backoff handler counting each retried request."""
+    UPSTREAM_RETRIES.inc(endpoint_label(details["args"][1]))
+
+
+def note_giveup(details):
+    """backoff handler for a request that failed every attempt."""
+    endpoint = endpoint_label(details["args"][1])
+    UPSTREAM_FAILURES.inc(endpoint)
+    logger.error(
+        "Failed to fetch data from %s after %d tries", endpoint, details["tries"]
+    )
+
 
 class SemanticScholarAPI:
     """Semantic Scholar API wrapper"""
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None):
         if api_key is not None:
             self.api_key = api_key
             self.header = {"x-api-key": self.api_key}
@@ -25,73 +74,169 @@ class SemanticScholarAPI:
             self.header = None
             logger.warning("API key is not set")
         self.timeout = 10
-        self.fields = (
-            "paperId,title,authors,abstract,citationCount,referenceCount,externalIds,year"
-        )
+        self.fields = DEFAULT_FIELDS
+        self.profiles = dict(FIELD_PROFILES)
         self.limit = 10
         self.max_limit = 100
         assert (
             self.limit <= self.max_limit
         ), "limit must be less than or equal to max_limit"
+        # reuse keep-alive connections across calls instead of a new TCP/TLS
+        # handshake per request
+        self.session = requests.Session()
+        if self.header:
+            self.session.headers.update(self.header)
+        # shared by every client in the process that uses the same quota
+        self.rate_limiter = get_rate_limiter(keyed=self.header is not None)
+        # optional paperwalk.api.cache.ResponseCache shared with other clients
+        self.cache = cache
+        self._flights = SingleFlight("semantic_scholar")
+
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
 
     @backoff.on_exception(
         backoff.expo,
-        (requests.exceptions.Timeout, requests.exceptions.ConnectionError),
-        max_tries=3,
-        on_giveup=lambda x: logger.error("Failed to fetch data"),
+        (
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectionError,
+            ThrottledError,
+        ),
+        max_tries=MAX_TRIES,
+        on_backoff=note_retry,
+        on_giveup=note_giveup,
         raise_on_giveup=False,
     )
-    def _request(self, url: str) -> [dict, None]:
-        response = requests.get(url, headers=self.header, timeout=self.timeout)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print("Failed to fetch data")
-            return None
+    def _send(self, url: str, payload: dict = None, headers: dict = None):
+        self.rate_limiter.acquire()
+        endpoint = endpoint_label(url)
+        with UPSTREAM_SECONDS.time(endpoint):
+            if payload is None:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            else:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+        UPSTREAM_RESPONSES.inc(endpoint, response.status_code)
+        if response.status_code in (200, 304):
+            return response
+        if response.status_code in RETRY_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.pause(retry_after)
+            raise ThrottledError(response.status_code, retry_after)
+        logger.error("Failed to fetch data: HTTP %d", response.status_code)
+        return None
+
+    def _request(self, url: str, payload: dict = None) -> [dict, list, None]:
+        if payload is not None:
+            response = self._send(url, payload)
+            return response.json() if response is not None else None
+        # threads sharing this client and asking for the same URL at once
+        # wait for one upstream call
+        return self._flights.do(cache_key(url), self._get, url)
+
+    def _get(self, url):
+        if self.cache is None:
+            response = self._send(url)
+            return response.json() if response is not None else None
+        key = cache_key(url)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            return entry.value
+        response = self._send(
+            url, headers=entry.conditional_headers() if entry else None
+        )
+        if response is None:
+            # serve a stale copy rather than nothing when upstream is down
+            return entry.value if entry is not None else None
+        if response.status_code == 304:
+            self.cache.refresh(key, entry)
+            return entry.value
+        data = response.json()
+        self.cache.set(
+            key,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    def _paper_url(self, paper_id):
+        return f"{BASE_URL}/paper/{paper_id}?fields={self.fields}"
 
     def fetch_paper(self, paper_id):
         """Fetch a paper by its ID"""
-        url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}?fields={self.fields}&limit={self.limit}"
-        return self._request(url)
+        return self._request(self._paper_url(paper_id))
 
-    def fetch_citations(self, paper_id, fetch_all=False):
-        """Fetch citations of a paper"""
+    def fetch_papers_batch(self, paper_ids):
+        """Fetch many papers by ID, up to BATCH_MAX_IDS per request.
+
+        Returns a list aligned with ``paper_ids``; unknown IDs and failed
+        batches map to ``None``. Papers found fresh in the cache are not
+        requested again, and fetched papers are cached individually.
+        """
+        paper_ids = list(paper_ids)
+        papers = {}
+        missing = list(dict.fromkeys(paper_ids))
+        if self.cache is not None:
+            missing = []
+            for paper_id in dict.fromkeys(paper_ids):
+                entry = self.cache.get(cache_key(self._paper_url(paper_id)))
+                if entry is not None and entry.fresh:
+                    papers[paper_id] = entry.value
+                else:
+                    missing.append(paper_id)
+        url = f"{BASE_URL}/paper/batch?fields={self.fields}"
+        for start in range(0, len(missing), BATCH_MAX_IDS):
+            chunk = missing[start : start + BATCH_MAX_IDS]
+            response = self._request(url, {"ids": chunk})
+            for paper_id, paper in zip(chunk, response or []):
+                papers[paper_id] = paper
+                if paper is not None and self.cache is not None:
+                    self.cache.set(cache_key(self._paper_url(paper_id)), paper)
+        return [papers.get(paper_id) for paper_id in paper_ids]
+
+    def fetch_citations(self, paper_id, fetch_all=False, profile="edge"):
+        """Fetch citations of a paper, with the fields of ``profile``"""
+        fields = self.profiles[profile]
         if fetch_all:
             finished = False
             offset = 0
             while not finished:
-                url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}/citations?fields={self.fields}&limit={self.max_limit}&offset={offset}"
+                url = f"{BASE_URL}/paper/{paper_id}/citations?fields={fields}&limit={self.max_limit}&offset={offset}"
                 response = self._request(url)
                 if response is None:
-                    offset += self.max_limit
-                    continue
+                    # stop rather than leave a silent gap in the results
+                    logger.error("Giving up on %s at offset %d", url, offset)
+                    break
                 elif len(response.get("data", [])) == 0:
                     finished = True
                 else:
                     offset += self.max_limit
                     yield response
         else:
-            url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}/citations?fields={self.fields}&limit={self.limit}"
+            url = f"{BASE_URL}/paper/{paper_id}/citations?fields={fields}&limit={self.limit}"
             yield self._request(url)
 
-    def fetch_references(self, paper_id, fetch_all=False):
-        """Fetch references of a paper"""
+    def fetch_references(self, paper_id, fetch_all=False, profile="edge"):
+        """Fetch references of a paper, with the fields of ``profile``"""
+        fields = self.profiles[profile]
         if fetch_all:
             finished = False
             offset = 0
             while not finished:
-                url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}/references?fields={self.fields}&limit={self.max_limit}&offset={offset}"
+                url = f"{BASE_URL}/paper/{paper_id}/references?fields={fields}&limit={self.max_limit}&offset={offset}"
                 response = self._request(url)
                 if response is None:
-                    offset += self.max_limit
-                    continue
+                    # stop rather than leave a silent gap in the results
+                    logger.error("Giving up on %s at offset %d", url, offset)
+                    break
                 elif len(response.get("data", [])) == 0:
                     finished = True
                 else:
                     offset += self.max_limit
                     yield response
         else:
-            url = f"https://api.semanticscholar.org/graph/v1/paper/{paper_id}/references?fields={self.fields}&limit={self.limit}"
+            url = f"{BASE_URL}/paper/{paper_id}/references?fields={fields}&limit={self.limit}"
             yield self._request(url)
 
     def search_papers(self, query, fetch_all=False):
@@ -100,18 +245,19 @@ class SemanticScholarAPI:
             finished = False
             offset = 0
             while not finished:
-                url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={query}&fields={self.fields}&limit={self.max_limit}&offset={offset}"
+                url = f"{BASE_URL}/paper/search?query={query}&fields={self.fields}&limit={self.max_limit}&offset={offset}"
                 response = self._request(url)
                 if response is None:
-                    offset += self.max_limit
-                    continue
+                    # stop rather than leave a silent gap in the results
+                    logger.error("Giving up on %s at offset %d", url, offset)
+                    break
                 elif len(response.get("data", [])) == 0:
                     finished = True
                 else:
                     offset += self.max_limit
                     yield response
         else:
-            url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={query}&fields={self.fields}&limit={self.limit}"
+            url = f"{BASE_URL}/paper/search?query={query}&fields={self.fields}&limit={self.limit}"
             yield self._request(url)
 
 
@@ -0,0 +1,311 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# latency buckets in seconds, from a cache-speed lookup to a slow upstream page
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (1, 10, 100, 1000, 5000, 10_000, 50_000)
+
+# PAPERWALK_METRICS=0 turns every metric into a no-op
+ENABLED = os.getenv("PAPERWALK_METRICS", "1") != "0"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            yield self.name, _format_labels(self.labels, labels), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down, one per label combination."""
+
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[bucket] += 1
+            counts[-1] += value
+
+    def time(self, *labels):
+        """Context manager that observes the seconds spent in its block."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            values = {labels: list(counts) for labels, counts in self._values.items()}
+        for labels, counts in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket",
+                    _format_labels(self.labels, labels, le),
+                    cumulative,
+                )
+            yield f"{self.name}_count", _format_labels(self.labels, labels), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labels, labels), counts[-1]
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start, *self._labels)
+
+
+class _NullMetric:
+    """Stands in for every metric when metrics are disabled."""
+
+    kind = None
+
+    def inc(self, *labels, amount=1):
+        pass
+
+    def set(self, value, *labels):
+        pass
+
+    def observe(self, value, *labels):
+        pass
+
+    def time(self, *labels):
+        return _NULL_TIMER
+
+    def samples(self):
+        return ()
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_METRIC = _NullMetric()
+_NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    """The metrics of one process, rendered in the Prometheus text format.
+
+    Metrics are created once at import time and shared by name. Values that
+    already live elsewhere (cache counters, queue sizes) are exposed through
+    collectors: callables run only when the metrics are scraped, which
+    return ``(name, kind, documentation, [(labels dict, value), ...])``.
+    """
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, documentation, **kwargs):
+        if not self.enabled:
+            return _NULL_METRIC
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, documentation, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, documentation, labels=()):
+        return self._get(Counter, name, documentation, labels=labels)
+
+    def gauge(self, name, documentation, labels=()):
+        return self._get(Gauge, name, documentation, labels=labels)
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(
+            Histogram, name, documentation, labels=labels, buckets=buckets
+        )
+
+    def add_collector(self, collector):
+        """Register ``collector``; it is called on every scrape."""
+        if self.enabled:
+            with self._lock:
+                self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        # collectors may report the same name with different labels
+        families = {}
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                family = families.setdefault(name, (kind, documentation, []))
+                family[2].extend(samples)
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = _format_labels(labels.keys(), labels.values())
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "paperwalk_upstream_request_seconds",
+    "Semantic Scholar latency per attempt, excluding rate-limit waits.",
+    labels=("endpoint",),
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "paperwalk_upstream_responses_total",
+    "Semantic Scholar responses by HTTP status.",
+    labels=("endpoint", "status"),
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "paperwalk_upstream_retries_total",
+    "Semantic Scholar requests retried after a timeout or throttled response.",
+    labels=("endpoint",),
+)
+UPSTREAM_FAILURES = REGISTRY.counter(
+    "paperwalk_upstream_failures_total",
+    "Semantic Scholar requests given up on after every retry.",
+    labels=("endpoint",),
+)
+NEO4J_SECONDS = REGISTRY.histogram(
+    "paperwalk_neo4j_transaction_seconds",
+    "Neo4j transaction time by transaction function.",
+    labels=("work",),
+)
+NEO4J_ROWS = REGISTRY.histogram(
+    "paperwalk_neo4j_rows_per_write",
+    "Rows sent to Neo4j per UNWIND write.",
+    labels=("work",),
+    buckets=ROW_BUCKETS,
+)
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "paperwalk_singleflight_calls_total",
+    "Calls made through a single-flight group.",
+    labels=("operation",),
+)
+SINGLEFLIGHT_COLLAPSED = REGISTRY.counter(
+    "paperwalk_singleflight_collapsed_total",
+    "Calls that shared the result of an identical call already in flight.",
+    labels=("operation",),
+)
+CRAWL_FRONTIER = REGISTRY.gauge(
+    "paperwalk_crawl_frontier_size", "Papers waiting in the crawl frontier."
+)
+CRAWL_EXPANDED = REGISTRY.counter(
+    "paperwalk_crawl_expanded_total", "Papers expanded by the crawler."
+)
+JOB_SECONDS = REGISTRY.histogram(
+    "paperwalk_job_seconds",
+    "Run time of background jobs, by kind and final status.",
+    labels=("kind", "status"),
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800, 3600),
+)
+RANKING_SECONDS = REGISTRY.histogram(
+    "paperwalk_ranking_phase_seconds",
+    "Duration of the project, compute and write phases of a ranking run.",
+    labels=("engine", "phase"),
+    buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+
+def observe_timings(engine, timings):
+    """Record the phase durations of a ranking run."""
+    for phase in ("project", "compute", "write"):
+        if phase in timings:
+            RANKING_SECONDS.observe(timings[phase], engine, phase)
+
+
+def stats_collector(prefix, documentation, stats, labels=None):
+    """Build a collector exposing the numeric entries of ``stats()``.
+
+    Each entry becomes a gauge ``<prefix>_<key>``, with ``labels`` attached.
+    """
+    labels = labels or {}
+
+    def collect():
+        return [
+            (f"{prefix}_{key}", "gauge", f"{documentation}: {key}.", [(labels, value)])
+            for key, value in stats().items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+
+    return collect
@@ -0,0 +1,81 @@
+import collections
+import logging
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples every thread's stack.
+
+    A daemon thread wakes up every ``interval`` seconds and records the
+    current stack of every other thread, so the profiled code runs
+    unmodified and pays nothing but the GIL hand-offs. ``write`` saves the
+    samples in the folded format that flamegraph.pl and speedscope read:
+    one ``thread;outer;...;inner count`` line per distinct stack.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64, path=None):
+        self.interval = interval
+        self.path = path
+        self.max_depth = max_depth
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="paperwalk-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path=None):
+        """Write the folded stacks collected so far to ``path``."""
+        path = path or self.path
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(
+            "Wrote %d profile samples to %s.", sum(self.samples.values()), path
+        )
+
+
+def profile_from_env(environ):
+    """Start a SamplingProfiler if ``PAPERWALK_PROFILE`` names an output file.
+
+    ``PAPERWALK_PROFILE_INTERVAL`` sets the sampling interval in seconds.
+    Returns the running profiler, or None when profiling is off.
+    """
+    path = environ.get("PAPERWALK_PROFILE")
+    if not path:
+        return None
+    interval = float(environ.get("PAPERWALK_PROFILE_INTERVAL", "0.01"))
+    profiler = SamplingProfiler(interval, path=path)
+    profiler.start()
+    logger.info("Sampling profiler writing to %s.", path)
+    return profiler
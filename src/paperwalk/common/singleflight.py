@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+from paperwalk.common.metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COLLAPSED
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls from threads into one.
+
+    ``do(key, func, *args)`` runs ``func(*args)`` unless a call with the
+    same key is already running, in which case it waits for that call and
+    returns its result (or raises its exception). Nothing is cached: once
+    a call finishes, the next one with its key runs again. ``operation``
+    labels the counters of calls made and collapsed.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.calls = 0
+        self.collapsed = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.collapsed += 1
+        SINGLEFLIGHT_CALLS.inc(self.operation)
+        if not leader:
+            SINGLEFLIGHT_COLLAPSED.inc(self.operation)
+            call.done.wait()
+        else:
+            try:
+                call.result = func(*args)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "collapsed": self.collapsed,
+                "inflight": len(self._inflight),
+            }
+
+
+class AsyncSingleFlight:
+    """Collapse concurrent identical coroutine calls into one.
+
+    The asyncio counterpart of SingleFlight: ``await do(key, func, *args)``
+    shares one task running ``func(*args)`` between every caller that
+    arrives while it is in flight. The task is shielded, so a caller that
+    is cancelled (say, a client that disconnects) does not cancel the work
+    the others are waiting on.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.calls = 0
+        self.collapsed = 0
+        self._inflight = {}
+
+    async def do(self, key, func, *args):
+        self.calls += 1
+        SINGLEFLIGHT_CALLS.inc(self.operation)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.collapsed += 1
+            SINGLEFLIGHT_COLLAPSED.inc(self.operation)
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # every caller may have been cancelled; don't warn about an error
+        # nobody was left to see
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "inflight": len(self._inflight),
+        }
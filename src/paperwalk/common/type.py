@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 from enum import Enum
 from pydantic import BaseModel
 
@@ -8,29 +8,157 @@ class Relation(Enum):
     REFERENCES = 2
 
 
+class Author(BaseModel):
+    authorId: Optional[str] = None
+    name: Optional[str] = None
+
+
 class Paper(BaseModel):
-    def __init__(
-        self,
-        paper_id: str,
-        title: str,
-        first_author: str,
-        first_author_id: str,
-        last_author: str,
-        last_author_id: str,
-        abstract: str,
-        citation_count: int,
-        reference_count: int,
-        arxiv: str,
-        year: int,
-    ):
-        self.paper_id = paper_id
-        self.title = title
-        self.first_author = first_author
-        self.first_author_id = first_author_id
-        self.last_author = last_author
-        self.last_author_id = last_author_id
-        self.abstract = abstract
-        self.citation_count = citation_count
-        self.reference_count = reference_count
-        self.arxiv = arxiv
-        self.year = year
+    """A paper as the Semantic Scholar API returns it."""
+
+    paperId: str
+    title: Optional[str] = None
+    authors: List[Author] = []
+    abstract: Optional[str] = None
+    year: Optional[int] = None
+    citationCount: Optional[int] = None
+    referenceCount: Optional[int] = None
+    externalIds: Optional[Dict[str, Any]] = None
+    venue: Optional[str] = None
+
+
+class PaperRow(NamedTuple):
+    """The properties of one Paper node, plus its authors.
+
+    A named tuple has no per-row dict, and the driver sends it to Neo4j as a
+    plain list, so rows are cheap to build and to pack; Cypher reads the
+    fields by position (see ``PAPER_PROPERTIES``). ``_asdict()`` gives the
+    same fields keyed by property name. ``authors`` holds one
+    ``(authorId, name)`` pair per author with an ID, in byline order, and
+    becomes ``:Author`` nodes rather than a property. ``corpusId`` is the
+    Semantic Scholar corpus ID as a string; the Datasets key citations by it.
+    """
+
+    paperId: str
+    title: Optional[str] = None
+    firstAuthor: Optional[str] = None
+    firstAuthorId: Optional[str] = None
+    lastAuthor: Optional[str] = None
+    lastAuthorId: Optional[str] = None
+    abstract: Optional[str] = None
+    citationCount: int = 0
+    referenceCount: int = 0
+    ArXiv: Optional[str] = None
+    year: Optional[int] = None
+    venue: Optional[str] = None
+    corpusId: Optional[str] = None
+    authors: Tuple[Tuple[str, Optional[str]], ...] = ()
+
+
+PAPER_PROPERTIES = PaperRow._fields[:-1]
+AUTHORS_FIELD = PaperRow._fields.index("authors")
+VENUE_FIELD = PaperRow._fields.index("venue")
+CORPUS_ID_FIELD = PaperRow._fields.index("corpusId")
+
+# the properties the graph view draws; abstracts stay out of view payloads
+VIEW_PROPERTIES = (
+    "paperId",
+    "title",
+    "year",
+    "citationCount",
+    "firstAuthor",
+    "pagerank",
+    "articlerank",
+)
+
+# the properties returned for an opened paper; with an AbstractStore the
+# abstract is not on the node but read from the store
+DETAIL_PROPERTIES = PAPER_PROPERTIES + ("pagerank", "articlerank", "hydrated")
+
+_EMPTY = {}
+_new_row = tuple.__new__
+
+
+def _author_pairs(authors):
+    if not authors:
+        return ()
+    return tuple(
+        (author["authorId"], author.get("name"))
+        for author in authors
+        if author.get("authorId")
+    )
+
+
+def make_paper_row(
+    paper_id,
+    title,
+    authors,
+    abstract,
+    citation_count,
+    reference_count,
+    arxiv,
+    year,
+    venue=None,
+    corpus_id=None,
+):
+    """Build a PaperRow from already extracted fields.
+
+    ``authors`` is a list of ``{"authorId", "name"}`` dicts.
+    """
+    first = authors[0] if authors else _EMPTY
+    last = authors[-1] if authors else _EMPTY
+    return _new_row(
+        PaperRow,
+        (
+            paper_id,
+            title,
+            first.get("name"),
+            first.get("authorId"),
+            last.get("name"),
+            last.get("authorId"),
+            abstract,
+            int(citation_count or 0),
+            int(reference_count or 0),
+            arxiv,
+            year,
+            venue or None,
+            None if corpus_id is None else str(corpus_id),
+            _author_pairs(authors),
+        ),
+    )
+
+
+def paper_row(paper):
+    """Map a paper from the Semantic Scholar API onto a PaperRow."""
+    get = paper.get
+    external_ids = get("externalIds") or _EMPTY
+    return make_paper_row(
+        paper["paperId"],
+        get("title"),
+        get("authors"),
+        get("abstract"),
+        get("citationCount"),
+        get("referenceCount"),
+        external_ids.get("ArXiv"),
+        get("year"),
+        get("venue"),
+        external_ids.get("CorpusId"),
+    )
+
+
+def paper_rows(papers, key=None):
+    """Map many API papers onto PaperRows in one pass.
+
+    ``papers`` is a list of papers, or a citations/references page (or its
+    ``data`` list) when ``key`` names the nested paper, e.g. ``citingPaper``.
+    The page is read in place and entries without a paperId are skipped.
+    """
+    if isinstance(papers, dict):
+        papers = papers.get("data") or ()
+    if key is None:
+        return [paper_row(paper) for paper in papers if paper.get("paperId")]
+    return [
+        paper_row(paper)
+        for paper in [entry.get(key) for entry in papers]
+        if paper and paper.get("paperId")
+    ]
@@ -0,0 +1,10 @@
+from .crawler import Crawler
+from .frontier import Frontier
+from .seen import BloomFilter, SeenSet
+
+__all__ = [
+    'Crawler',
+    'Frontier',
+    'BloomFilter',
+    'SeenSet'
+]
\ No newline at end of file
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import os
+
+from paperwalk.common.metrics import CRAWL_EXPANDED, CRAWL_FRONTIER
+from paperwalk.common.type import Relation
+from paperwalk.crawl.frontier import Frontier
+from paperwalk.crawl.seen import BloomFilter, SeenSet, seen_from_state
+
+logger = logging.getLogger(__name__)
+
+_RELATION_KEYS = {
+    Relation.CITES: ("fetch_citations", "citingPaper"),
+    Relation.REFERENCES: ("fetch_references", "citedPaper"),
+}
+
+
+class Crawler:
+    """Concurrent multi-hop crawl of the citation graph.
+
+    ``workers`` tasks pop papers from a priority frontier and fetch their
+    citation/reference pages through an AsyncSemanticScholarAPI. Each page is
+    handed to ``writers`` tasks that run ``PaperDatabaseManager.ingest_pages``
+    on ``executor`` (the loop's default executor if None), so fetching and
+    Neo4j writes overlap. A bounded queue between the two stages keeps
+    fetching from running far ahead of writing. A page that fails to be
+    written is logged and counted in ``failed_pages``; its paper stays
+    unfinished, so a checkpointed crawl expands it again on resume.
+
+    Papers deeper than ``max_depth`` are not queued, and at most
+    ``max_nodes`` papers are queued in total. When ``checkpoint_path`` is
+    set, the frontier, the seen-set and the papers whose pages are not yet
+    written are saved every ``checkpoint_every`` expansions and at the end.
+    A new crawler pointed at the same file picks up from there.
+    ``progress``, if given, is called with the crawl stats after every
+    page is written.
+    """
+
+    def __init__(
+        self,
+        api,
+        paper_db,
+        priority="citationCount",
+        workers=4,
+        writers=1,
+        max_depth=2,
+        max_nodes=1000,
+        fetch_all=False,
+        relations=(Relation.CITES, Relation.REFERENCES),
+        checkpoint_path=None,
+        checkpoint_every=50,
+        bloom_capacity=None,
+        scores=None,
+        progress=None,
+        executor=None,
+    ):
+        self.api = api
+        self.paper_db = paper_db
+        self.workers = workers
+        self.writers = writers
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.fetch_all = fetch_all
+        self.relations = relations
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.progress = progress
+        self.executor = executor
+        self.frontier = Frontier(priority, scores)
+        self.seen = BloomFilter(bloom_capacity) if bloom_capacity else SeenSet()
+        self.stats = {
+            "enqueued": 0,
+            "expanded": 0,
+            "pages": 0,
+            "rows": 0,
+            "failed_pages": 0,
+        }
+        self._unfinished = {}
+        # _settle tasks, awaited before the final checkpoint
+        self._settling = set()
+        self._active = 0
+        self._ready = None
+        self._writes = None
+        self._checkpoint_lock = None
+
+    async def run(self, seeds=()):
+        """Crawl from ``seeds`` (or the checkpoint) and return crawl stats."""
+        loop = asyncio.get_running_loop()
+        self._ready = asyncio.Condition()
+        self._writes = asyncio.Queue(maxsize=self.workers * 4)
+        self._checkpoint_lock = asyncio.Lock()
+        if not self._restore():
+            seed_papers = [
+                paper
+                for paper in await self.api.fetch_papers_batch(seeds)
+                if paper is not None
+            ]
+            await loop.run_in_executor(
+                self.executor, self.paper_db.insert_papers_bulk, seed_papers
+            )
+            for paper in seed_papers:
+                self._enqueue(paper, 0)
+
+        writers = [asyncio.ensure_future(self._writer()) for _ in range(self.writers)]
+        workers = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # when one worker fails the others are stopped too, or they could
+            # block on the full write queue once the writers have exited
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for _ in writers:
+                await self._writes.put(None)
+            await asyncio.gather(*writers)
+            await asyncio.gather(*self._settling)
+            await self._checkpoint()
+        logger.info("Crawl finished: %s", self.stats)
+        return self.stats
+
+    def _enqueue(self, info, depth):
+        paper_id = info.get("paperId")
+        if not paper_id or paper_id in self.seen:
+            return
+        if self.stats["enqueued"] >= self.max_nodes:
+            return
+        self.seen.add(paper_id)
+        self.frontier.push(info, depth)
+        CRAWL_FRONTIER.set(len(self.frontier))
+        self.stats["enqueued"] += 1
+
+    async def _worker(self):
+        while True:
+            async with self._ready:
+                # another worker may still add papers to an empty frontier
+                while not self.frontier and self._active:
+                    await self._ready.wait()
+                if not self.frontier:
+                    self._ready.notify_all()
+                    return
+                entry = self.frontier.pop()
+                CRAWL_FRONTIER.set(len(self.frontier))
+                self._unfinished[entry[1]] = entry
+                self._active += 1
+            try:
+                await self._expand(entry)
+            finally:
+                async with self._ready:
+                    self._active -= 1
+                    self.stats["expanded"] += 1
+                    CRAWL_EXPANDED.inc()
+                    self._ready.notify_all()
+            if self.checkpoint_path and self.stats["expanded"] % self.checkpoint_every == 0:
+                await self._checkpoint()
+
+    async def _expand(self, entry):
+        _, paper_id, depth = entry
+        written = []
+        for relation in self.relations:
+            method, key = _RELATION_KEYS[relation]
+            async for page in getattr(self.api, method)(paper_id, self.fetch_all):
+                if not page:
+                    continue
+                self.stats["pages"] += 1
+                done = asyncio.get_running_loop().create_future()
+                await self._writes.put((paper_id, page, relation, done))
+                written.append(done)
+                if depth + 1 > self.max_depth:
+                    continue
+                async with self._ready:
+                    for related in page.get("data") or []:
+                        self._enqueue(related.get(key) or {}, depth + 1)
+                    self._ready.notify_all()
+        # the paper only counts as crawled once all of its pages are written
+        task = asyncio.ensure_future(self._settle(paper_id, written))
+        self._settling.add(task)
+        task.add_done_callback(self._settling.discard)
+
+    async def _settle(self, paper_id, written):
+        if all(await asyncio.gather(*written)):
+            self._unfinished.pop(paper_id, None)
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._writes.get()
+            if item is None:
+                return
+            paper_id, page, relation, done = item
+            # a failed page must not stop the writer: the workers would
+            # block on the full queue forever
+            written = False
+            try:
+                stats = await loop.run_in_executor(
+                    self.executor,
+                    self.paper_db.ingest_pages,
+                    paper_id,
+                    [page],
+                    relation,
+                )
+                self.stats["rows"] += stats["rows"]
+                written = True
+            except Exception as e:
+                self.stats["failed_pages"] += 1
+                logger.error("Failed to write a page of %s: %r", paper_id, e)
+            finally:
+                done.set_result(written)
+            if self.progress is not None:
+                try:
+                    self.progress(self.stats)
+                except Exception as e:
+                    logger.error("Crawl progress callback failed: %r", e)
+
+    async def _checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            "frontier": self.frontier.to_state()
+            + [list(entry) for entry in self._unfinished.values()],
+            "seen": self.seen.to_state(),
+            "stats": dict(self.stats),
+        }
+        async with self._checkpoint_lock:
+            await asyncio.get_running_loop().run_in_executor(
+                None, _write_json_atomic, self.checkpoint_path, state
+            )
+
+    def _restore(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.frontier.load_state(state["frontier"])
+        self.seen = seen_from_state(state["seen"])
+        self.stats.update(state["stats"])
+        logger.info(
+            "Resumed crawl from %s with %d queued papers.",
+            self.checkpoint_path,
+            len(self.frontier),
+        )
+        return True
+
+
+def _write_json_atomic(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,66 @@
+import heapq
+import itertools
+
+
+def _by_citation_count(info, depth, scores):
+    return -(info.get("citationCount") or 0)
+
+
+def _by_pagerank(info, depth, scores):
+    return -scores.get(info["paperId"], 0.0)
+
+
+def _by_depth(info, depth, scores):
+    return depth
+
+
+# lower values are crawled first
+PRIORITIES = {
+    "citationCount": _by_citation_count,
+    "pagerank": _by_pagerank,
+    "depth": _by_depth,
+}
+
+
+class Frontier:
+    """Priority queue of papers waiting to be expanded.
+
+    Papers with equal priority come out in insertion order, so the
+    ``depth`` strategy is a plain breadth-first walk. ``scores`` feeds the
+    ``pagerank`` strategy, e.g. from an earlier ranking run.
+    """
+
+    def __init__(self, priority="citationCount", scores=None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown frontier priority: {priority}")
+        self.priority = priority
+        self.scores = scores or {}
+        self._key = PRIORITIES[priority]
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, info, depth):
+        """Queue a paper; ``info`` is API paper data with at least paperId."""
+        key = self._key(info, depth, self.scores)
+        heapq.heappush(self._heap, (key, next(self._counter), info["paperId"], depth))
+
+    def pop(self):
+        """Return the next ``(key, paper_id, depth)`` entry to expand."""
+        key, _, paper_id, depth = heapq.heappop(self._heap)
+        return key, paper_id, depth
+
+    def push_entry(self, entry):
+        """Re-queue an entry returned by ``pop``."""
+        key, paper_id, depth = entry
+        heapq.heappush(self._heap, (key, next(self._counter), paper_id, depth))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def to_state(self):
+        return [[key, paper_id, depth] for key, _, paper_id, depth in sorted(self._heap)]
+
+    def load_state(self, state):
+        self._heap = []
+        for entry in state:
+            self.push_entry(entry)
@@ -0,0 +1,102 @@
+import base64
+import hashlib
+import math
+
+
+class SeenSet:
+    """Exact set of visited paper IDs."""
+
+    def __init__(self, items=()):
+        self._items = set(items)
+
+    def add(self, paper_id):
+        self._items.add(paper_id)
+
+    def __contains__(self, paper_id):
+        return paper_id in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def to_state(self):
+        return {"kind": "set", "items": sorted(self._items)}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["items"])
+
+
+class BloomFilter:
+    """Compact probabilistic seen-set for very large crawls.
+
+    Sized for ``capacity`` items at ``error_rate`` false positives. A false
+    positive makes the crawler skip a paper it has not visited; it never
+    visits a paper twice.
+    """
+
+    def __init__(self, capacity=10_000_000, error_rate=0.001, bits=None, hashes=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = int(
+            -capacity * math.log(error_rate) / (math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        if hashes is not None:
+            self.num_hashes = hashes
+        self._bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.num_bits = len(self._bits) * 8
+        self._count = 0
+
+    def _positions(self, paper_id):
+        digest = hashlib.blake2b(paper_id.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, paper_id):
+        added = False
+        for pos in self._positions(paper_id):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self._count += 1
+
+    def __contains__(self, paper_id):
+        for pos in self._positions(paper_id):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self._count
+
+    def to_state(self):
+        return {
+            "kind": "bloom",
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "hashes": self.num_hashes,
+            "count": self._count,
+            "bits": base64.b64encode(bytes(self._bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        bloom = cls(
+            state["capacity"],
+            state["error_rate"],
+            bits=bytearray(base64.b64decode(state["bits"])),
+            hashes=state["hashes"],
+        )
+        bloom._count = state["count"]
+        return bloom
+
+
+def seen_from_state(state):
+    """Rebuild a seen-set from its checkpoint state."""
+    if state["kind"] == "bloom":
+        return BloomFilter.from_state(state)
+    return SeenSet.from_state(state)
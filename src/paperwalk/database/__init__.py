@@ -1,6 +1,15 @@
-from .database import Neo4jConnection, PaperDatabaseManager
+from .abstracts import AbstractStore
+from .async_reader import AsyncPaperReader
+from .connection import AsyncNeo4jConnection, Neo4jConnection
+from .database import PaperDatabaseManager
+from .snapshot import export_snapshot, import_snapshot
 
 __all__ = [
+    'AbstractStore',
+    'AsyncNeo4jConnection',
+    'AsyncPaperReader',
     'Neo4jConnection',
-    'PaperDatabaseManager'
+    'PaperDatabaseManager',
+    'export_snapshot',
+    'import_snapshot'
 ]
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import threading
+import zlib
+
+# marks a paper whose details were fetched and that has no abstract
+_NO_ABSTRACT = b""
+
+
+class AbstractStore:
+    """Compressed paper abstracts, kept outside the graph in a SQLite file.
+
+    Abstracts are most of the text on a Paper node, yet only read when a
+    paper is opened, so they live here instead and the nodes stay small.
+    Each one is stored zlib-compressed under its paperId. A paper fetched
+    without an abstract is recorded too, so it is not fetched again.
+    """
+
+    def __init__(self, path, level=9):
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS abstracts (
+                paper_id TEXT PRIMARY KEY,
+                body BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._db.commit()
+
+    def close(self):
+        """Close the backing SQLite file."""
+        with self._lock:
+            self._db.close()
+
+    def get_many(self, paper_ids):
+        """Return ``{paperId: abstract}`` for the papers that are stored.
+
+        Papers stored without an abstract map to None; papers not stored
+        are left out.
+        """
+        paper_ids = list(dict.fromkeys(paper_ids))
+        found = {}
+        with self._lock:
+            # stay below SQLite's limit on bound parameters
+            for start in range(0, len(paper_ids), 900):
+                chunk = paper_ids[start : start + 900]
+                found.update(
+                    self._db.execute(
+                        "SELECT paper_id, body FROM abstracts WHERE paper_id IN"
+                        f" ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                )
+            self.hits += len(found)
+            self.misses += len(paper_ids) - len(found)
+        return {
+            paper_id: zlib.decompress(body).decode() if body else None
+            for paper_id, body in found.items()
+        }
+
+    def put_many(self, abstracts):
+        """Store ``{paperId: abstract}``; a None abstract records its absence."""
+        rows = [
+            (
+                paper_id,
+                zlib.compress(abstract.encode(), self.level)
+                if abstract
+                else _NO_ABSTRACT,
+            )
+            for paper_id, abstract in abstracts.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO abstracts VALUES (?, ?)", rows
+            )
+            self._db.commit()
+            self.writes += len(rows)
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value)
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Drop every stored abstract."""
+        with self._lock:
+            self._db.execute("DELETE FROM abstracts")
+            self._db.execute("DELETE FROM meta")
+            self._db.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
@@ -0,0 +1,74 @@
+from paperwalk.database.database import (
+    AUTHOR_PAPERS_QUERY,
+    COAUTHORS_QUERY,
+    DETAILS_QUERY,
+    EXPANSION_QUERY,
+    NEIGHBORHOOD_QUERY,
+    attach_abstract,
+    neighborhood_subgraph,
+)
+
+
+class AsyncPaperReader:
+    """Read-only graph queries awaited on the event loop.
+
+    Mirrors the read methods of PaperDatabaseManager over an
+    AsyncNeo4jConnection, so request handlers serve stored data without
+    a hop to the database thread pool. ``abstracts`` is the AbstractStore
+    the manager writes to, if any.
+    """
+
+    def __init__(self, conn, abstracts=None):
+        self.conn = conn
+        self.abstracts = abstracts
+
+    async def get_expansion(self, paper_id):
+        """Return when and how far a paper was expanded, or None."""
+        return await self.conn.execute_read(_read_expansion, paper_id)
+
+    async def get_details(self, paper_id):
+        """Return the stored properties of a paper and its abstract, or None."""
+        paper = await self.conn.execute_read(_read_details, paper_id)
+        return attach_abstract(paper, self.abstracts)
+
+    async def get_neighborhood(self, paper_id, limit=500):
+        """Return a paper and its direct citations/references as a subgraph."""
+        return await self.conn.execute_read(_read_neighborhood, paper_id, limit)
+
+    async def get_author_papers(self, author_id, limit=100):
+        """Return an author and their papers, most cited first."""
+        return await self.conn.execute_read(_read_author_papers, author_id, limit)
+
+    async def get_coauthors(self, author_id, limit=100):
+        """Return the authors sharing papers with ``author_id``."""
+        return await self.conn.execute_read(_read_coauthors, author_id, limit)
+
+
+async def _single(tx, query, **parameters):
+    result = await tx.run(query, **parameters)
+    return await result.single()
+
+
+async def _read_expansion(tx, paper_id):
+    record = await _single(tx, EXPANSION_QUERY, paperId=paper_id)
+    return dict(record) if record else None
+
+
+async def _read_details(tx, paper_id):
+    record = await _single(tx, DETAILS_QUERY, paperId=paper_id)
+    return dict(record["paper"]) if record else None
+
+
+async def _read_neighborhood(tx, paper_id, limit):
+    record = await _single(tx, NEIGHBORHOOD_QUERY, paperId=paper_id, limit=limit)
+    return neighborhood_subgraph(record, paper_id)
+
+
+async def _read_author_papers(tx, author_id, limit):
+    record = await _single(tx, AUTHOR_PAPERS_QUERY, authorId=author_id, limit=limit)
+    return dict(record) if record else None
+
+
+async def _read_coauthors(tx, author_id, limit):
+    record = await _single(tx, COAUTHORS_QUERY, authorId=author_id, limit=limit)
+    return dict(record) if record else None
@@ -0,0 +1,290 @@
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from neo4j import (
+    READ_ACCESS,
+    WRITE_ACCESS,
+    AsyncGraphDatabase,
+    GraphDatabase,
+    RoutingControl,
+)
+from paperwalk.common.metrics import NEO4J_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# driver defaults, overridable per connection
+MAX_POOL_SIZE = 100
+ACQUISITION_TIMEOUT = 60.0
+FETCH_SIZE = 1000
+
+
+class _PoolStats:
+    """Sessions borrowed from a connection pool, for utilization reporting.
+
+    The driver does not expose its pool, so this counts the sessions the
+    connection hands out; each holds at most one pooled connection.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.in_use = 0
+        self.peak = 0
+        self.sessions = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.in_use += 1
+            self.sessions += 1
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, failed):
+        with self._lock:
+            self.in_use -= 1
+            self.failed += failed
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak,
+                "utilization": round(self.in_use / self.max_size, 3),
+                "peak_utilization": round(self.peak / self.max_size, 3),
+                "sessions": self.sessions,
+                "failed": self.failed,
+            }
+
+
+class Neo4jConnection:
+    """Neo4j connection class.
+
+    Holds one driver and its connection pool, sized by ``max_pool_size``;
+    sessions wait up to ``acquisition_timeout`` seconds for a free
+    connection. Reads are routed to readers and writes to the leader of
+    a cluster. Unless ``verify`` is False the server is contacted up front
+    and the constructor raises if it cannot be reached.
+    """
+
+    def __init__(
+        self,
+        uri,
+        user,
+        pwd,
+        max_pool_size=MAX_POOL_SIZE,
+        acquisition_timeout=ACQUISITION_TIMEOUT,
+        fetch_size=FETCH_SIZE,
+        verify=True,
+    ):
+        self.__uri = uri
+        self.__user = user
+        self.__password = pwd
+        self.fetch_size = fetch_size
+        self._stats = _PoolStats(max_pool_size)
+        self.__driver = GraphDatabase.driver(
+            self.__uri,
+            auth=(self.__user, self.__password),
+            encrypted=False,
+            connection_timeout=5,
+            max_connection_pool_size=max_pool_size,
+            connection_acquisition_timeout=acquisition_timeout,
+        )
+        if verify:
+            self.verify()
+
+    def verify(self):
+        """Raise, after closing the driver, if the server is unreachable."""
+        try:
+            self.__driver.verify_connectivity()
+        except Exception as e:
+            logger.error("Failed to connect to Neo4j at %s: %s", self.__uri, e)
+            self.__driver.close()
+            raise
+
+    def close(self):
+        """Close the driver."""
+        self.__driver.close()
+
+    def pool_stats(self):
+        """Return the pool size, sessions in use and their peak."""
+        return self._stats.snapshot()
+
+    @contextmanager
+    def _session(self, db, access_mode, fetch_size=None):
+        self._stats.acquire()
+        failed = True
+        try:
+            with self.__driver.session(
+                database=db,
+                default_access_mode=access_mode,
+                fetch_size=fetch_size or self.fetch_size,
+            ) as session:
+                yield session
+            failed = False
+        finally:
+            self._stats.release(failed)
+
+    def execute_query(self, query, parameters=None, db=None, read=False):
+        """Run a single query and return all its records.
+
+        The query runs in a managed transaction, routed to a reader when
+        ``read`` is set, and is retried on transient errors.
+        """
+        routing = RoutingControl.READ if read else RoutingControl.WRITE
+        with NEO4J_SECONDS.time("query"):
+            self._stats.acquire()
+            failed = True
+            try:
+                records = self.__driver.execute_query(
+                    query, parameters, routing_=routing, database_=db
+                ).records
+                failed = False
+                return records
+            finally:
+                self._stats.release(failed)
+
+    def run_autocommit(self, query, parameters=None, db=None):
+        """Run a write query in an auto-commit transaction and return its summary.
+
+        Needed for ``CALL { ... } IN TRANSACTIONS``, which the server rejects
+        inside the managed transactions of ``execute_query``. The query is
+        not retried, and errors are raised to the caller.
+        """
+        with NEO4J_SECONDS.time("autocommit"):
+            with self._session(db, WRITE_ACCESS) as session:
+                return session.run(query, parameters).consume()
+
+    def stream(self, query, parameters=None, db=None, fetch_size=None):
+        """Yield the records of a read query as they arrive.
+
+        Records are pulled from the server ``fetch_size`` at a time, so a
+        large result is never held in memory at once. The session stays
+        open until the generator is exhausted or closed, and unlike
+        ``execute_read`` a failure part way through is not retried.
+        """
+        with self._session(db, READ_ACCESS, fetch_size) as session:
+            yield from session.run(query, parameters)
+
+    def execute_read(self, work, *args, db=None, fetch_size=None):
+        """Run ``work(tx, *args)`` in a managed read transaction.
+
+        ``fetch_size`` bounds how many records are buffered per round trip
+        while ``work`` iterates over a result.
+        """
+        with NEO4J_SECONDS.time(work.__name__):
+            with self._session(db, READ_ACCESS, fetch_size) as session:
+                return session.execute_read(work, *args)
+
+    def execute_write(self, work, *args, db=None):
+        """Run ``work(tx, *args)`` in a managed write transaction.
+
+        The driver retries the transaction function on transient errors
+        (deadlocks, leader switches) until its retry time runs out.
+        """
+        with NEO4J_SECONDS.time(work.__name__):
+            with self._session(db, WRITE_ACCESS) as session:
+                return session.execute_write(work, *args)
+
+
+class AsyncNeo4jConnection:
+    """Asynchronous counterpart of Neo4jConnection for the event loop.
+
+    Transaction functions are coroutines taking an async transaction.
+    Nothing is contacted on construction; await ``verify`` to fail fast.
+    """
+
+    def __init__(
+        self,
+        uri,
+        user,
+        pwd,
+        max_pool_size=MAX_POOL_SIZE,
+        acquisition_timeout=ACQUISITION_TIMEOUT,
+        fetch_size=FETCH_SIZE,
+    ):
+        self.__uri = uri
+        self.fetch_size = fetch_size
+        self._stats = _PoolStats(max_pool_size)
+        self.__driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=(user, pwd),
+            encrypted=False,
+            connection_timeout=5,
+            max_connection_pool_size=max_pool_size,
+            connection_acquisition_timeout=acquisition_timeout,
+        )
+
+    async def verify(self):
+        """Raise, after closing the driver, if the server is unreachable."""
+        try:
+            await self.__driver.verify_connectivity()
+        except Exception as e:
+            logger.error("Failed to connect to Neo4j at %s: %s", self.__uri, e)
+            await self.__driver.close()
+            raise
+
+    async def close(self):
+        """Close the driver."""
+        await self.__driver.close()
+
+    def pool_stats(self):
+        """Return the pool size, sessions in use and their peak."""
+        return self._stats.snapshot()
+
+    @asynccontextmanager
+    async def _session(self, db, access_mode, fetch_size=None):
+        self._stats.acquire()
+        failed = True
+        try:
+            async with self.__driver.session(
+                database=db,
+                default_access_mode=access_mode,
+                fetch_size=fetch_size or self.fetch_size,
+            ) as session:
+                yield session
+            failed = False
+        finally:
+            self._stats.release(failed)
+
+    async def execute_query(self, query, parameters=None, db=None, read=False):
+        """Run a single query and return all its records."""
+        routing = RoutingControl.READ if read else RoutingControl.WRITE
+        with NEO4J_SECONDS.time("query"):
+            self._stats.acquire()
+            failed = True
+            try:
+                result = await self.__driver.execute_query(
+                    query, parameters, routing_=routing, database_=db
+                )
+                failed = False
+                return result.records
+            finally:
+                self._stats.release(failed)
+
+    async def run_autocommit(self, query, parameters=None, db=None):
+        """Run a write query in an auto-commit transaction and return its summary."""
+        with NEO4J_SECONDS.time("autocommit"):
+            async with self._session(db, WRITE_ACCESS) as session:
+                result = await session.run(query, parameters)
+                return await result.consume()
+
+    async def stream(self, query, parameters=None, db=None, fetch_size=None):
+        """Yield the records of a read query as they arrive."""
+        async with self._session(db, READ_ACCESS, fetch_size) as session:
+            result = await session.run(query, parameters)
+            async for record in result:
+                yield record
+
+    async def execute_read(self, work, *args, db=None, fetch_size=None):
+        """Await ``work(tx, *args)`` in a managed read transaction."""
+        with NEO4J_SECONDS.time(work.__name__):
+            async with self._session(db, READ_ACCESS, fetch_size) as session:
+                return await session.execute_read(work, *args)
+
+    async def execute_write(self, work, *args, db=None):
+        """Await ``work(tx, *args)`` in a managed write transaction."""
+        with NEO4J_SECONDS.time(work.__name__):
+            async with self._session(db, WRITE_ACCESS) as session:
+                return await session.execute_write(work, *args)
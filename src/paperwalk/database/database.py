@@ -1,269 +1,598 @@
 import logging
 import os
+import time
 
-from neo4j import GraphDatabase
 from graphdatascience import GraphDataScience
 from dotenv import load_dotenv
 from paperwalk.api import SemanticScholarAPI
-from paperwalk.common.type import Paper, Relation
+from paperwalk.common.metrics import NEO4J_ROWS
+from paperwalk.common.type import (
+    AUTHORS_FIELD,
+    DETAIL_PROPERTIES,
+    PAPER_PROPERTIES,
+    VENUE_FIELD,
+    VIEW_PROPERTIES,
+    Relation,
+    paper_row,
+    paper_rows,
+)
+from paperwalk.database.connection import Neo4jConnection  # noqa: F401
+from paperwalk.database.ranking import RankingService
+from paperwalk.graph import compact_paper, rank_graph
+from paperwalk.database.schema import ensure_schema
+
+logger = logging.getLogger(__name__)
 
 logging.basicConfig(level=logging.INFO)
 
 
-class Neo4jConnection:
-    """Neo4j connection class."""
+def _on_create_set(node, row):
+    # PaperRows arrive as lists, in PAPER_PROPERTIES order
+    return ", ".join(
+        f"{node}.{name} = {row}[{i}]" for i, name in enumerate(PAPER_PROPERTIES) if i
+    )
 
-    def __init__(self, uri, user, pwd):
-        self.__uri = uri
-        self.__user = user
-        self.__password = pwd
-        self.__driver = None
-        try:
-            self.__driver = GraphDatabase.driver(
-                self.__uri,
-                auth=(self.__user, self.__password),
-                encrypted=False,
-                connection_timeout=5,
-            )
-            self.__driver.verify_connectivity()
-        except Exception as e:
-            print("Failed to create the driver:", e)
-
-    def close(self):
-        """Close the driver."""
-        if self.__driver:
-            self.__driver.close()
-
-    def execute_query(self, query, parameters=None, db=None, protected=True):
-        """Execute a query."""
-        if protected:
-            with self.__driver.session(database=db) as session:
-                return session.run(query, parameters)
-        else:
-            return self.__driver.session(database=db).run(query, parameters)
+
+# citations whose endpoints are not stored are dropped
+MERGE_CITATIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Paper {paperId: row[0]})
+MATCH (b:Paper {paperId: row[1]})
+MERGE (a)-[:CITES]->(b)
+"""
+
+# the same, for (citing, cited) corpus ID pairs from the Datasets
+MERGE_CORPUS_CITATIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Paper {corpusId: row[0]})
+MATCH (b:Paper {corpusId: row[1]})
+MERGE (a)-[:CITES]->(b)
+"""
+
+
+def _link_authors_and_venue(node, row):
+    # runs in the same UNWIND as the paper MERGE, so linking adds no round trip
+    return f"""
+FOREACH (author IN {row}[{AUTHORS_FIELD}] |
+    MERGE (a:Author {{authorId: author[0]}})
+    ON CREATE SET a.name = author[1]
+    MERGE (a)-[:AUTHORED]->({node}))
+FOREACH (venue IN CASE WHEN {row}[{VENUE_FIELD}] IS NULL
+        THEN [] ELSE [{row}[{VENUE_FIELD}]] END |
+    MERGE (v:Venue {{name: venue}})
+    MERGE ({node})-[:PUBLISHED_IN]->(v))
+"""
+
+
+MERGE_PAPERS_QUERY = f"""
+UNWIND $rows AS row
+MERGE (p:Paper {{paperId: row[0]}})
+ON CREATE SET {_on_create_set("p", "row")}
+{_link_authors_and_venue("p", "row")}
+"""
 
 
 class PaperDatabaseManager:
     """Paper database manager class."""
 
-    def __init__(self, neo4j_connection, gds: GraphDataScience = None):
+    def __init__(
+        self,
+        neo4j_connection,
+        gds: GraphDataScience = None,
+        search_index=None,
+        abstracts=None,
+    ):
         self.conn = neo4j_connection
-        if gds:
-            self.gds = gds
+        self.gds = gds
+        # optional LocalSearchIndex kept in step with every paper written
+        self.search_index = search_index
+        # optional AbstractStore; when set, abstracts are kept off the nodes
+        self.abstracts = abstracts
+        self.ranking = RankingService(gds) if gds else None
+        # bumped on every write so in-memory snapshots know when to rebuild
+        self.version = 0
         self.logger = logging.getLogger(__name__)
 
-    def clean_database(self):
-        """Clean the database."""
+    def ensure_schema(self):
+        """Create constraints and indexes if they are missing."""
+        return ensure_schema(self.conn)
+
+    def clean_database(self, batch_size=10_000):
+        """Clean the database.
+
+        Nodes are deleted ``batch_size`` at a time, each batch in its own
+        transaction, so clearing a large graph does not need the whole
+        delete to fit in the transaction heap. Errors are logged and raised.
+        """
         try:
             # Delete all nodes and relationships
-            self.conn.execute_query("MATCH (n) DETACH DELETE n")
+            self.conn.run_autocommit(
+                "MATCH (n) CALL { WITH n DETACH DELETE n } "
+                f"IN TRANSACTIONS OF {int(batch_size)} ROWS"
+            )
             # Delete all graphs
-            self.gds.graph.drop(self.gds.graph.get("papersGraph"))
-            # graphs = self.gds.graph.list()
-            # for graph in graphs:
-            #     self.gds.graph.drop(self.gds.graph.get(graph))
+            if self.ranking:
+                self.ranking.drop()
+            if self.search_index is not None:
+                self.search_index.clear()
+            if self.abstracts is not None:
+                self.abstracts.clear()
+            self.version += 1
             self.logger.info("Database cleaned successfully.")
         except Exception as e:
-            print("Failed to clean the database:", e)
+            self.logger.error("Failed to clean the database: %s", e)
+            raise
 
     def run_pagerank(self):
-        """Run PageRank."""
-        G_papers, _projection = self.gds.graph.project(
-            graph_name="papersGraph",
-            relationship_spec="CITES",
-            node_spec="Paper",
-        )
-
-        # Run PageRank
-        # results = self.gds.pageRank.stream(self.gds.graph.get("papersGraph"))
-        # print(results)
-
-        _ = self.gds.pageRank.write(
-            G=G_papers,  # self.gds.graph.get("papersGraph"),
-            maxIterations=20,
-            dampingFactor=0.85,
-            writeProperty="pagerank",
-        )
-
-        _ = self.gds.articleRank.write(
-            G=G_papers,
-            writeProperty="articlerank",
-        )
+        """Run PageRank, in-process when the GDS plugin is not available."""
+        if self.ranking:
+            timings = self.ranking.refresh(force=True)
+        else:
+            timings = rank_graph(self.conn)
+        # new scores change what views and walks rank highest
+        self.version += 1
+        return timings
 
     def insert_paper(self, paper_id, paper_data):
         """Insert a paper."""
-        query = """
-        MERGE (p:Paper {paperId: $paperId})
-        ON CREATE SET p.title = $title, p.firstAuthor = $firstAuthor, \
-            p.firstAuthorId = $firstAuthorId, p.lastAuthor = $lastAuthor, \
-            p.lastAuthorId = $lastAuthorId, p.abstract = $abstract, \
-            p.citationCount = $citationCount, p.referenceCount = $referenceCount, \
-            p.ArXiv = $ArXiv, p.year = $year
-        """
-        authors = paper_data.get("authors", [])
-        paper_param = {
-            "paperId": paper_data["paperId"],
-            "title": paper_data.get("title"),
-            "firstAuthor": authors[0].get("name") if authors else None,
-            "firstAuthorId": authors[0].get("authorId") if authors else None,
-            "lastAuthor": authors[-1].get("name") if authors else None,
-            "lastAuthorId": authors[-1].get("authorId") if authors else None,
-            "abstract": paper_data.get("abstract"),
-            "citationCount": int(paper_data.get("citationCount", 0)),
-            "referenceCount": int(paper_data.get("referenceCount", 0)),
-            "ArXiv": paper_data.get("externalIds", {}).get("ArXiv"),
-            "year": paper_data.get("year"),
-        }
+        row = paper_row(paper_data)
         try:
-            self.logger.info("Inserted paper %s.", paper_id)
-            self.conn.execute_query(query, paper_param)
+            rows, hydrated = self._take_abstracts([row])
+            self.conn.execute_write(_write_papers, rows)
+            if hydrated:
+                self.conn.execute_write(_write_hydrated, hydrated)
+            self.logger.debug("Inserted paper %s.", paper_id)
+            self.version += 1
+            self._index_papers([row._asdict()])
         except Exception as e:
             self.logger.error("Error inserting paper %s: %s", paper_id, e)
 
     def insert_papers_bulk(self, papers_data):
         """Insert papers in bulk."""
-        query = """
-        UNWIND $papers as paper
-        MERGE (p:Paper {paperId: paper.paperId})
-        ON CREATE SET p.title = paper.title, p.firstAuthor = paper.firstAuthor, 
-            p.firstAuthorId = paper.firstAuthorId, p.lastAuthor = paper.lastAuthor, 
-            p.lastAuthorId = paper.lastAuthorId, p.abstract = paper.abstract, 
-            p.citationCount = paper.citationCount, p.referenceCount = paper.referenceCount, 
-            p.ArXiv = paper.ArXiv, p.year = paper.year
-        """
-        papers_parameters = []
-        for paper_data in papers_data:
-            authors = paper_data.get("authors", [])
-            paper_param = {
-                "paperId": paper_data["paperId"],
-                "title": paper_data.get("title"),
-                "firstAuthor": authors[0].get("name") if authors else None,
-                "firstAuthorId": authors[0].get("authorId") if authors else None,
-                "lastAuthor": authors[-1].get("name") if authors else None,
-                "lastAuthorId": authors[-1].get("authorId") if authors else None,
-                "abstract": paper_data.get("abstract"),
-                "citationCount": int(paper_data.get("citationCount", 0)),
-                "referenceCount": int(paper_data.get("referenceCount", 0)),
-                "ArXiv": paper_data.get("externalIds", {}).get("ArXiv"),
-                "year": paper_data.get("year"),
-            }
-            papers_parameters.append(paper_param)
-
-        parameters = {"papers": papers_parameters}
-
+        rows = paper_rows(papers_data)
         try:
-            self.conn.execute_query(query, parameters)
-            self.logger.info("Bulk inserted %d papers.", len(papers_parameters))
+            written, hydrated = self._take_abstracts(rows)
+            self.conn.execute_write(_write_papers, written)
+            if hydrated:
+                self.conn.execute_write(_write_hydrated, hydrated)
+            NEO4J_ROWS.observe(len(rows), "_write_papers")
+            self.version += 1
+            self._index_papers(row._asdict() for row in rows)
+            self.logger.debug("Bulk inserted %d papers.", len(rows))
         except Exception as e:
             self.logger.error("Error in bulk insertion: %s", e)
 
     def insert_citation_or_reference(self, paper_id, paper_data, relation: Relation):
         """Insert a citation or reference."""
-        if relation == Relation.CITES:
-            query = """
-            MERGE (p1:Paper {paperId: $paperId})
-            MERGE (p2:Paper {paperId: $citingPaperId})
-            ON CREATE SET p2.title = $title, p2.firstAuthor = $firstAuthor, \
-                p2.firstAuthorId = $firstAuthorId, p2.lastAuthor = $lastAuthor, \
-                p2.lastAuthorId = $lastAuthorId, p2.abstract = $abstract, \
-                p2.citationCount = $citationCount, p2.referenceCount = $referenceCount, \
-                p2.ArXiv = $ArXiv, p2.year = $year
-            MERGE (p2)-[:CITES]->(p1)
-            """
-            key = "citingPaper"
-        elif relation == Relation.REFERENCES:
-            query = """
-            MERGE (p1:Paper {paperId: $paperId})
-            MERGE (p2:Paper {paperId: $citingPaperId})
-            ON CREATE SET p2.title = $title, p2.firstAuthor = $firstAuthor, \
-                p2.firstAuthorId = $firstAuthorId, p2.lastAuthor = $lastAuthor, \
-                p2.lastAuthorId = $lastAuthorId, p2.abstract = $abstract, \
-                p2.citationCount = $citationCount, p2.referenceCount = $referenceCount, \
-                p2.ArXiv = $ArXiv, p2.year = $year
-            MERGE (p1)-[:CITES]->(p2)
-            """
-            key = "citedPaper"
-
-        for relation_paper in paper_data["data"]:
-            paper_info = relation_paper.get(key, {})
-            authors = paper_info.get("authors", [])
-            parameters = {
-                "paperId": paper_id,
-                "citingPaperId": paper_info.get("paperId"),
-                "title": paper_info.get("title"),
-                "firstAuthor": authors[0].get("name") if authors else None,
-                "firstAuthorId": authors[0].get("authorId") if authors else None,
-                "lastAuthor": authors[-1].get("name") if authors else None,
-                "lastAuthorId": authors[-1].get("authorId") if authors else None,
-                "abstract": paper_info.get("abstract"),
-                "citationCount": int(paper_info.get("citationCount", 0)),
-                "referenceCount": int(paper_info.get("referenceCount", 0)),
-                "ArXiv": paper_info.get("externalIds", {}).get("ArXiv"),
-                "year": paper_info.get("year"),
-            }
-            try:
-                self.conn.execute_query(query, parameters)
-                self.logger.info("Inserted paper %s.", paper_info.get('paperId'))
-            except Exception as e:
-                self.logger.error(
-                    "Error inserting paper %s: %s", paper_info.get('paperId'), e
-                )
+        self.ingest_pages(paper_id, [paper_data], relation)
 
     def insert_citations_or_references_bulk(
         self, paper_id, paper_data, relation: Relation
     ):
         """Insert citations or references in bulk."""
-        if relation == Relation.CITES:
-            query = """
-            UNWIND $papers as paper
-            MERGE (p1:Paper {paperId: $paperId})
-            MERGE (p2:Paper {paperId: paper.citingPaperId})
-            ON CREATE SET p2.title = paper.title, p2.firstAuthor = paper.firstAuthor, 
-                p2.firstAuthorId = paper.firstAuthorId, p2.lastAuthor = paper.lastAuthor, 
-                p2.lastAuthorId = paper.lastAuthorId, p2.abstract = paper.abstract, 
-                p2.citationCount = paper.citationCount, p2.referenceCount = paper.referenceCount, 
-                p2.ArXiv = paper.ArXiv, p2.year = paper.year
-            MERGE (p2)-[:CITES]->(p1)
-            """
-            key = "citingPaper"
-        elif relation == Relation.REFERENCES:
-            query = """
-            UNWIND $papers as paper
-            MERGE (p1:Paper {paperId: $paperId})
-            MERGE (p2:Paper {paperId: paper.citingPaperId})
-            ON CREATE SET p2.title = paper.title, p2.firstAuthor = paper.firstAuthor, 
-                p2.firstAuthorId = paper.firstAuthorId, p2.lastAuthor = paper.lastAuthor, 
-                p2.lastAuthorId = paper.lastAuthorId, p2.abstract = paper.abstract, 
-                p2.citationCount = paper.citationCount, p2.referenceCount = paper.referenceCount, 
-                p2.ArXiv = paper.ArXiv, p2.year = paper.year
-            MERGE (p1)-[:CITES]->(p2)
-            """
-            key = "citedPaper"
-
-        papers_parameters = []
-        for relation_paper in paper_data["data"]:
-            paper_info = relation_paper.get(key, {})
-            authors = paper_info.get("authors", [])
-            parameters = {
-                "paperId": paper_id,
-                "citingPaperId": paper_info.get("paperId"),
-                "title": paper_info.get("title"),
-                "firstAuthor": authors[0].get("name") if authors else None,
-                "firstAuthorId": authors[0].get("authorId") if authors else None,
-                "lastAuthor": authors[-1].get("name") if authors else None,
-                "lastAuthorId": authors[-1].get("authorId") if authors else None,
-                "abstract": paper_info.get("abstract"),
-                "citationCount": int(paper_info.get("citationCount", 0)),
-                "referenceCount": int(paper_info.get("referenceCount", 0)),
-                "ArXiv": paper_info.get("externalIds", {}).get("ArXiv"),
-                "year": paper_info.get("year"),
-            }
-            papers_parameters.append(parameters)
-
-        parameters = {"papers": papers_parameters, "paperId": paper_id}
+        self.ingest_pages(paper_id, [paper_data], relation)
+
+    def _index_papers(self, papers):
+        """Add papers to the search index.
+
+        Papers carrying an abstract replace what is indexed for them, so an
+        abstract fetched after the paper was first seen becomes searchable.
+        """
+        if self.search_index is None:
+            return
+        papers = list(papers)
+        self.search_index.add(paper for paper in papers if not paper.get("abstract"))
+        self.search_index.upsert(paper for paper in papers if paper.get("abstract"))
+
+    def _take_abstracts(self, rows):
+        """Split the abstracts off PaperRows about to be written.
+
+        With an abstract store the abstracts are saved there and the rows
+        come back without them. Either way the papers that had one are
+        returned as ``[paperId, abstract]`` pairs for ``_write_hydrated``.
+        """
+        with_abstract = [row for row in rows if row.abstract]
+        if not with_abstract:
+            return rows, []
+        if self.abstracts is None:
+            return rows, [[row.paperId, row.abstract] for row in with_abstract]
+        self.abstracts.put_many({row.paperId: row.abstract for row in with_abstract})
+        rows = [row._replace(abstract=None) if row.abstract else row for row in rows]
+        return rows, [[row.paperId, None] for row in with_abstract]
+
+    def hydrate(self, papers_data):
+        """Keep the details of papers fetched in full and flag them hydrated.
+
+        ``papers_data`` are API papers fetched with the detail fields. Their
+        abstracts go to the abstract store (or onto the nodes without one);
+        a paper without an abstract is recorded as such, so it is not
+        fetched again, and abstracts are added to the search index. Returns
+        the abstracts keyed by paperId.
+        """
+        abstracts = {
+            paper["paperId"]: paper.get("abstract")
+            for paper in papers_data
+            if paper and paper.get("paperId")
+        }
+        if not abstracts:
+            return {}
+        if self.abstracts is not None:
+            self.abstracts.put_many(abstracts)
+            rows = [[paper_id, None] for paper_id in abstracts]
+        else:
+            rows = [[paper_id, abstract] for paper_id, abstract in abstracts.items()]
+        self.conn.execute_write(_write_hydrated, rows)
+        self._index_papers(paper for paper in papers_data if paper)
+        return abstracts
+
+    def move_abstracts(self, batch_size=5000):
+        """Move abstracts written onto Paper nodes into the abstract store.
+
+        Graphs built before the store existed keep every abstract on its
+        node. The move runs once per store, in batches of ``batch_size``
+        walked in paperId order; later calls return at once. Returns the
+        number of abstracts moved.
+        """
+        if self.abstracts is None or self.abstracts.get_meta("moved_from_graph"):
+            return 0
+        moved, after = 0, ""
+        while True:
+            batch = self.conn.execute_read(_read_node_abstracts, after, batch_size)
+            if not batch:
+                break
+            self.abstracts.put_many(dict(batch))
+            self.conn.execute_write(
+                _write_hydrated, [[paper_id, None] for paper_id, _ in batch]
+            )
+            self._index_papers(
+                {"paperId": paper_id, "abstract": abstract}
+                for paper_id, abstract in batch
+            )
+            moved += len(batch)
+            after = batch[-1][0]
+        self.abstracts.set_meta("moved_from_graph", str(moved))
+        if moved:
+            self.logger.info("Moved %d abstracts into the abstract store.", moved)
+        return moved
+
+    def get_details(self, paper_id):
+        """Return the stored properties of a paper, or None.
+
+        The abstract comes from the abstract store when there is one;
+        ``hydrated`` tells whether the paper's details were fetched yet.
+        """
+        paper = self.conn.execute_read(_read_details, paper_id)
+        return attach_abstract(paper, self.abstracts)
+
+    def get_expansion(self, paper_id):
+        """Return when and how far a paper was expanded, or None."""
+        return self.conn.execute_read(_read_expansion, paper_id)
+
+    def mark_expanded(self, paper_id, citations=0, references=0):
+        """Record an expansion of ``paper_id`` and the rows it added."""
+        self.conn.execute_write(
+            _write_expansion, paper_id, citations, references, time.time()
+        )
+
+    def get_neighbor_ids(self, paper_id):
+        """Return the IDs of the papers citing and cited by ``paper_id``."""
+        return self.conn.execute_read(_read_neighbor_ids, paper_id)
+
+    def get_neighborhood(self, paper_id, limit=500):
+        """Return a paper and its direct citations/references as a subgraph.
+
+        The result is ``{"nodes": [...], "edges": [[source, target], ...]}``
+        with only the properties the graph view draws, or None if the paper
+        is not in the graph.
+        """
+        return self.conn.execute_read(_read_neighborhood, paper_id, limit)
+
+    def get_known_ids(self, paper_ids):
+        """Return the subset of ``paper_ids`` already stored in the graph."""
+        return self.conn.execute_read(_read_known_ids, list(paper_ids))
+
+    def get_papers(self, paper_ids):
+        """Return the graph-view properties of papers, keyed by paperId."""
+        return self.conn.execute_read(_read_papers, list(paper_ids))
+
+    def get_author_papers(self, author_id, limit=100):
+        """Return an author and their papers, most cited first.
+
+        The result is ``{"author": {...}, "papers": [...]}`` with graph-view
+        paper properties, or None if the author is not in the graph.
+        """
+        return self.conn.execute_read(_read_author_papers, author_id, limit)
+
+    def get_coauthors(self, author_id, limit=100):
+        """Return the authors sharing papers with ``author_id``.
+
+        Co-authors are ordered by the number of shared papers; each entry is
+        ``{"authorId", "name", "sharedPapers"}``. Returns None if the author
+        is not in the graph.
+        """
+        return self.conn.execute_read(_read_coauthors, author_id, limit)
 
+    def ingest_pages(self, paper_id, pages, relation: Relation, chunk_size=5000):
+        """Write a stream of citation or reference pages for one paper.
+
+        Rows from ``pages`` are regrouped into chunks of ``chunk_size`` and
+        each chunk is written by one UNWIND in a managed transaction, which
+        the driver retries on transient errors. The anchor paper is merged
+        once up front and matched once per chunk. Returns write statistics.
+        """
+        key = "citingPaper" if relation == Relation.CITES else "citedPaper"
+        start = time.perf_counter()
+        rows_written = 0
+        chunks = 0
         try:
-            self.conn.execute_query(query, parameters)
-            self.logger.info("Bulk inserted %d papers.", len(papers_parameters))
+            self.conn.execute_write(_merge_anchor, paper_id)
         except Exception as e:
-            self.logger.error("Error in bulk insertion: %s", e)
\ No newline at end of file
+            self.logger.error("Error inserting paper %s: %s", paper_id, e)
+            return {"rows": 0, "chunks": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+
+        def flush(rows):
+            nonlocal rows_written, chunks
+            try:
+                written, hydrated = self._take_abstracts(rows)
+                self.conn.execute_write(
+                    _write_relation_chunk, paper_id, written, relation
+                )
+                if hydrated:
+                    self.conn.execute_write(_write_hydrated, hydrated)
+                NEO4J_ROWS.observe(len(rows), "_write_relation_chunk")
+                rows_written += len(rows)
+                self._index_papers(row._asdict() for row in rows)
+                chunks += 1
+            except Exception as e:
+                self.logger.error("Error in bulk insertion: %s", e)
+
+        buffer = []
+        for page in pages:
+            if not page:
+                continue
+            buffer.extend(paper_rows(page, key))
+            while len(buffer) >= chunk_size:
+                flush(buffer[:chunk_size])
+                buffer = buffer[chunk_size:]
+        if buffer:
+            flush(buffer)
+
+        if self.ranking:
+            self.ranking.note_ingested(rows_written)
+        if rows_written:
+            self.version += 1
+        seconds = time.perf_counter() - start
+        stats = {
+            "rows": rows_written,
+            "chunks": chunks,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(rows_written / seconds, 1) if seconds else 0.0,
+        }
+        self.logger.debug(
+            "Bulk inserted %d papers for %s in %d chunks (%.1f rows/s).",
+            rows_written, paper_id, chunks, stats["rows_per_sec"],
+        )
+        return stats
+
+
+EXPANSION_QUERY = """
+MATCH (p:Paper {paperId: $paperId})
+RETURN p.expandedAt AS expandedAt,
+    p.citationsFetched AS citationsFetched,
+    p.referencesFetched AS referencesFetched
+"""
+
+
+def _read_expansion(tx, paper_id):
+    record = tx.run(EXPANSION_QUERY, paperId=paper_id).single()
+    return dict(record) if record else None
+
+
+def _write_expansion(tx, paper_id, citations, references, expanded_at):
+    tx.run(
+        """
+        MERGE (p:Paper {paperId: $paperId})
+        SET p.expandedAt = $expandedAt,
+            p.citationsFetched = coalesce(p.citationsFetched, 0) + $citations,
+            p.referencesFetched = coalesce(p.referencesFetched, 0) + $references
+        """,
+        paperId=paper_id,
+        citations=citations,
+        references=references,
+        expandedAt=expanded_at,
+    ).consume()
+
+
+def _read_neighbor_ids(tx, paper_id):
+    record = tx.run(
+        """
+        MATCH (p:Paper {paperId: $paperId})
+        RETURN [(c:Paper)-[:CITES]->(p) | c.paperId] AS citing,
+            [(p)-[:CITES]->(r:Paper) | r.paperId] AS cited
+        """,
+        paperId=paper_id,
+    ).single()
+    if record is None:
+        return set(), set()
+    return set(record["citing"]), set(record["cited"])
+
+
+_VIEW_FIELDS = ", ".join(f".{name}" for name in VIEW_PROPERTIES)
+
+
+def _read_known_ids(tx, paper_ids):
+    result = tx.run(
+        """
+        UNWIND $paperIds AS paperId
+        MATCH (p:Paper {paperId: paperId})
+        RETURN p.paperId AS paperId
+        """,
+        paperIds=paper_ids,
+    )
+    return {record["paperId"] for record in result}
+
+
+def _read_papers(tx, paper_ids):
+    result = tx.run(
+        f"""
+        UNWIND $paperIds AS paperId
+        MATCH (p:Paper {{paperId: paperId}})
+        RETURN p {{{_VIEW_FIELDS}}} AS paper
+        """,
+        paperIds=paper_ids,
+    )
+    return {record["paper"]["paperId"]: record["paper"] for record in result}
+
+
+AUTHOR_PAPERS_QUERY = f"""
+MATCH (a:Author {{authorId: $authorId}})
+CALL {{
+    WITH a
+    MATCH (a)-[:AUTHORED]->(p:Paper)
+    WITH p ORDER BY p.citationCount DESC LIMIT $limit
+    RETURN collect(p {{{_VIEW_FIELDS}}}) AS papers
+}}
+RETURN a {{.authorId, .name}} AS author, papers
+"""
+
+
+def _read_author_papers(tx, author_id, limit):
+    record = tx.run(AUTHOR_PAPERS_QUERY, authorId=author_id, limit=limit).single()
+    return dict(record) if record else None
+
+
+COAUTHORS_QUERY = """
+MATCH (a:Author {authorId: $authorId})
+CALL {
+    WITH a
+    MATCH (a)-[:AUTHORED]->(:Paper)<-[:AUTHORED]-(c:Author)
+    WHERE c <> a
+    WITH c, count(*) AS shared
+    ORDER BY shared DESC LIMIT $limit
+    RETURN collect(c {.authorId, .name, sharedPapers: shared}) AS coauthors
+}
+RETURN a {.authorId, .name} AS author, coauthors
+"""
+
+
+def _read_coauthors(tx, author_id, limit):
+    record = tx.run(COAUTHORS_QUERY, authorId=author_id, limit=limit).single()
+    return dict(record) if record else None
+
+
+NEIGHBORHOOD_QUERY = f"""
+MATCH (p:Paper {{paperId: $paperId}})
+CALL {{
+    WITH p
+    MATCH (c:Paper)-[:CITES]->(p)
+    RETURN collect(c {{{_VIEW_FIELDS}}})[..$limit] AS citations
+}}
+CALL {{
+    WITH p
+    MATCH (p)-[:CITES]->(r:Paper)
+    RETURN collect(r {{{_VIEW_FIELDS}}})[..$limit] AS references
+}}
+RETURN p {{{_VIEW_FIELDS}}} AS paper, citations, references
+"""
+
+
+def neighborhood_subgraph(record, paper_id):
+    """Turn a NEIGHBORHOOD_QUERY record into ``{"nodes", "edges"}``.
+
+    Null properties, e.g. of a paper merged by ID only, are left out.
+    """
+    if record is None:
+        return None
+    nodes = {record["paper"]["paperId"]: compact_paper(record["paper"])}
+    edges = []
+    for citing in record["citations"]:
+        nodes[citing["paperId"]] = compact_paper(citing)
+        edges.append([citing["paperId"], paper_id])
+    for cited in record["references"]:
+        nodes[cited["paperId"]] = compact_paper(cited)
+        edges.append([paper_id, cited["paperId"]])
+    return {"nodes": list(nodes.values()), "edges": edges}
+
+
+def _read_neighborhood(tx, paper_id, limit):
+    record = tx.run(NEIGHBORHOOD_QUERY, paperId=paper_id, limit=limit).single()
+    return neighborhood_subgraph(record, paper_id)
+
+
+DETAILS_QUERY = f"""
+MATCH (p:Paper {{paperId: $paperId}})
+RETURN p {{{", ".join(f".{name}" for name in DETAIL_PROPERTIES)}}} AS paper
+"""
+
+
+def _read_details(tx, paper_id):
+    record = tx.run(DETAILS_QUERY, paperId=paper_id).single()
+    return dict(record["paper"]) if record else None
+
+
+def attach_abstract(paper, abstracts):
+    """Fill in the abstract of a DETAILS_QUERY paper from an AbstractStore.
+
+    With a store, a paper counts as hydrated once its abstract (or the lack
+    of one) is stored there; without one the node's flag is used.
+    """
+    if paper is None:
+        return None
+    if abstracts is not None:
+        found = abstracts.get_many([paper["paperId"]])
+        paper["hydrated"] = paper["paperId"] in found
+        paper["abstract"] = found.get(paper["paperId"], paper.get("abstract"))
+    else:
+        paper["hydrated"] = bool(paper.get("hydrated"))
+    return paper
+
+
+def _read_node_abstracts(tx, after, limit):
+    result = tx.run(
+        """
+        MATCH (p:Paper)
+        WHERE p.paperId > $after AND p.abstract IS NOT NULL
+        RETURN p.paperId AS paperId, p.abstract AS abstract
+        ORDER BY p.paperId
+        LIMIT $limit
+        """,
+        after=after,
+        limit=limit,
+    )
+    return [(record["paperId"], record["abstract"]) for record in result]
+
+
+def _write_hydrated(tx, rows):
+    tx.run(
+        """
+        UNWIND $rows AS row
+        MATCH (p:Paper {paperId: row[0]})
+        SET p.hydrated = true, p.abstract = row[1]
+        """,
+        rows=rows,
+    ).consume()
+
+
+def _write_papers(tx, rows):
+    tx.run(MERGE_PAPERS_QUERY, rows=rows).consume()
+
+
+def _merge_anchor(tx, paper_id):
+    tx.run("MERGE (:Paper {paperId: $paperId})", paperId=paper_id).consume()
+
+
+_RELATION_CHUNK_QUERY = f"""
+MATCH (p1:Paper {{paperId: $paperId}})
+UNWIND $papers AS paper
+MERGE (p2:Paper {{paperId: paper[0]}})
+ON CREATE SET {_on_create_set("p2", "paper")}
+{_link_authors_and_venue("p2", "paper")}
+"""
+
+
+def _write_relation_chunk(tx, paper_id, rows, relation):
+    if relation == Relation.CITES:
+        query = _RELATION_CHUNK_QUERY + "MERGE (p2)-[:CITES]->(p1)"
+    else:
+        query = _RELATION_CHUNK_QUERY + "MERGE (p1)-[:CITES]->(p2)"
+    tx.run(query, paperId=paper_id, papers=rows).consume()
@@ -0,0 +1,195 @@
+import logging
+import time
+
+from paperwalk.common.metrics import observe_timings
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_PROJECTION_QUERY = """
+MATCH (seed:Paper {paperId: $paperId})-[:CITES*0..%d]-(n:Paper)
+WITH DISTINCT n
+OPTIONAL MATCH (n)-[:CITES]->(m:Paper)
+WITH gds.graph.project(
+    $graphName, n, m,
+    {
+        sourceNodeLabels: labels(n),
+        targetNodeLabels: CASE WHEN m IS NULL THEN null ELSE labels(m) END,
+        sourceNodeProperties: {pagerank: coalesce(n.pagerank, 0.0)},
+        targetNodeProperties: CASE WHEN m IS NULL THEN null
+            ELSE {pagerank: coalesce(m.pagerank, 0.0)} END
+    }
+) AS g
+RETURN g.nodeCount AS nodeCount
+"""
+
+# Scores from a neighborhood run sum to a different total than the global
+# ones, so they are scaled to match the global scores the neighborhood's
+# papers already had before being written over them.
+_LOCAL_WRITE_QUERY = """
+CALL gds.%(algorithm)s.stream($graphName, $config)
+YIELD nodeId, score
+WITH gds.util.asNode(nodeId) AS p, score
+WITH collect([p, score]) AS rows,
+    sum(coalesce(p.%(property)s, 0.0)) AS globalSum,
+    sum(CASE WHEN p.%(property)s IS NULL THEN 0.0 ELSE score END) AS localSum
+WITH rows,
+    CASE WHEN globalSum > 0 AND localSum > 0
+        THEN globalSum / localSum ELSE 1.0 END AS scale
+UNWIND rows AS row
+WITH row[0] AS p, row[1] * scale AS score, scale
+SET p.%(property)s = score
+RETURN count(p) AS written, max(scale) AS scale
+"""
+
+
+class RankingService:
+    """Keep PageRank and ArticleRank scores fresh on a growing graph.
+
+    The named in-memory projection is reused until at least
+    ``refresh_after_rows`` rows have been ingested since it was built.
+    PageRank warm-starts from the previous ``pagerank`` values, so each
+    refresh needs far fewer iterations than a cold run. After an expansion,
+    ``refresh_neighborhood`` recomputes scores only for the papers within
+    ``hops`` of the expanded one, rescaled to the global scores they
+    replace. ``timings`` holds the duration of the
+    project, compute and write phases of the last run, in seconds.
+    """
+
+    def __init__(
+        self,
+        gds,
+        graph_name="papersGraph",
+        refresh_after_rows=10_000,
+        max_iterations=20,
+        damping_factor=0.85,
+        tolerance=1e-6,
+    ):
+        self.gds = gds
+        self.graph_name = graph_name
+        self.refresh_after_rows = refresh_after_rows
+        self.max_iterations = max_iterations
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+        self.pending_rows = 0
+        self.timings = {}
+        self._projected = False
+
+    def note_ingested(self, rows):
+        """Record that ``rows`` papers or edges were written since the last run."""
+        self.pending_rows += rows
+
+    def is_stale(self):
+        return self.pending_rows >= self.refresh_after_rows
+
+    def drop(self, graph_name=None):
+        """Drop an in-memory projection if it exists."""
+        graph_name = graph_name or self.graph_name
+        if self.gds.graph.exists(graph_name)["exists"]:
+            self.gds.graph.drop(self.gds.graph.get(graph_name))
+        if graph_name == self.graph_name:
+            self._projected = False
+
+    def refresh(self, force=False):
+        """Recompute scores over the whole graph if enough has changed."""
+        if not force and not self.is_stale():
+            return None
+        timings = {}
+        graph = self._project(timings)
+        self._write_scores(graph, timings)
+        self.pending_rows = 0
+        self.timings = timings
+        observe_timings("gds", timings)
+        logger.info("Ranking refreshed: %s", timings)
+        return timings
+
+    def after_expand(self, paper_id, local=True):
+        """Refresh scores after ``paper_id`` was expanded.
+
+        Runs a full refresh once enough rows have piled up, otherwise (when
+        ``local`` is set) only the expanded paper's neighborhood.
+        """
+        if self.is_stale():
+            return self.refresh()
+        if local:
+            return self.refresh_neighborhood(paper_id)
+        return None
+
+    def refresh_neighborhood(self, paper_id, hops=2):
+        """Recompute scores for the papers within ``hops`` of ``paper_id``.
+
+        A PageRank over the neighborhood alone is not on the scale of the
+        global run, so the scores written are scaled by the ratio of the
+        neighborhood's existing global scores to their local ones.
+        """
+        graph_name = f"{self.graph_name}_{paper_id}"
+        timings = {}
+        start = time.perf_counter()
+        self.drop(graph_name)
+        self.gds.run_cypher(
+            _LOCAL_PROJECTION_QUERY % hops,
+            {"paperId": paper_id, "graphName": graph_name},
+        )
+        timings["project"] = time.perf_counter() - start
+        start = time.perf_counter()
+        pagerank = {
+            "maxIterations": self.max_iterations,
+            "dampingFactor": self.damping_factor,
+            "tolerance": self.tolerance,
+            "seedProperty": "pagerank",
+        }
+        try:
+            for algorithm, prop, config in (
+                ("pageRank", "pagerank", pagerank),
+                ("articleRank", "articlerank", {}),
+            ):
+                self.gds.run_cypher(
+                    _LOCAL_WRITE_QUERY % {"algorithm": algorithm, "property": prop},
+                    {"graphName": graph_name, "config": config},
+                )
+        finally:
+            self.drop(graph_name)
+        # the reused full projection holds the scores just overwritten
+        self.drop()
+        timings["write"] = time.perf_counter() - start
+        self.timings = timings
+        observe_timings("gds", timings)
+        return timings
+
+    def _project(self, timings):
+        start = time.perf_counter()
+        if self._projected and self.pending_rows == 0:
+            graph = self.gds.graph.get(self.graph_name)
+        else:
+            self.drop()
+            # seed properties can only be projected once they exist
+            has_scores = "pagerank" in set(
+                self.gds.run_cypher("CALL db.propertyKeys()")["propertyKey"]
+            )
+            node_spec = (
+                {"Paper": {"properties": {"pagerank": {"defaultValue": 0.0}}}}
+                if has_scores
+                else "Paper"
+            )
+            graph, _ = self.gds.graph.project(self.graph_name, node_spec, "CITES")
+            self._projected = True
+        timings["project"] = time.perf_counter() - start
+        return graph
+
+    def _write_scores(self, graph, timings):
+        seed = {}
+        if "pagerank" in graph.node_properties("Paper"):
+            seed["seedProperty"] = "pagerank"
+        pagerank = self.gds.pageRank.write(
+            graph,
+            maxIterations=self.max_iterations,
+            dampingFactor=self.damping_factor,
+            tolerance=self.tolerance,
+            writeProperty="pagerank",
+            **seed,
+        )
+        articlerank = self.gds.articleRank.write(graph, writeProperty="articlerank")
+        timings["compute"] = (
+            pagerank["computeMillis"] + articlerank["computeMillis"]
+        ) / 1000
+        timings["write"] = (pagerank["writeMillis"] + articlerank["writeMillis"]) / 1000
+        timings["iterations"] = int(pagerank["ranIterations"])
@@ -0,0 +1,101 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Ordered schema migrations. Each entry is (version, statements); statements
+# must be idempotent so a partially applied migration can simply be re-run.
+MIGRATIONS = [
+    (
+        1,
+        [
+            "CREATE CONSTRAINT paper_id_unique IF NOT EXISTS "
+            "FOR (p:Paper) REQUIRE p.paperId IS UNIQUE",
+            "CREATE INDEX paper_year IF NOT EXISTS FOR (p:Paper) ON (p.year)",
+            "CREATE INDEX paper_citation_count IF NOT EXISTS "
+            "FOR (p:Paper) ON (p.citationCount)",
+            "CREATE INDEX paper_arxiv IF NOT EXISTS FOR (p:Paper) ON (p.ArXiv)",
+            "CREATE INDEX paper_first_author_id IF NOT EXISTS "
+            "FOR (p:Paper) ON (p.firstAuthorId)",
+            "CREATE FULLTEXT INDEX paper_text IF NOT EXISTS "
+            "FOR (p:Paper) ON EACH [p.title, p.abstract]",
+        ],
+    ),
+    (
+        2,
+        [
+            "CREATE CONSTRAINT author_id_unique IF NOT EXISTS "
+            "FOR (a:Author) REQUIRE a.authorId IS UNIQUE",
+            "CREATE CONSTRAINT venue_name_unique IF NOT EXISTS "
+            "FOR (v:Venue) REQUIRE v.name IS UNIQUE",
+            "CREATE INDEX author_name IF NOT EXISTS FOR (a:Author) ON (a.name)",
+        ],
+    ),
+    (
+        3,
+        [
+            # ordered top-k reads for the graph view
+            "CREATE INDEX paper_pagerank IF NOT EXISTS "
+            "FOR (p:Paper) ON (p.pagerank)",
+            "CREATE INDEX paper_articlerank IF NOT EXISTS "
+            "FOR (p:Paper) ON (p.articlerank)",
+        ],
+    ),
+    (
+        4,
+        [
+            # citations from the Datasets are keyed by corpus ID
+            "CREATE INDEX paper_corpus_id IF NOT EXISTS "
+            "FOR (p:Paper) ON (p.corpusId)",
+        ],
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _current_version(tx):
+    record = tx.run(
+        "MATCH (s:SchemaVersion {name: 'paperwalk'}) RETURN s.version AS version"
+    ).single()
+    return record["version"] if record else 0
+
+
+def _run_statement(tx, statement):
+    tx.run(statement).consume()
+
+
+def _record_version(tx, version):
+    tx.run(
+        """
+        MERGE (s:SchemaVersion {name: 'paperwalk'})
+        SET s.version = $version, s.appliedAt = $appliedAt
+        """,
+        version=version,
+        appliedAt=time.time(),
+    ).consume()
+
+
+def ensure_schema(conn):
+    """Apply pending schema migrations and return the schema version.
+
+    The applied version is kept on a single ``:SchemaVersion`` node, so
+    calling this on every startup only costs one read once the schema is up
+    to date.
+    """
+    version = conn.execute_write(_current_version)
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        start = time.perf_counter()
+        # schema changes cannot share a transaction with data writes
+        for statement in statements:
+            conn.execute_write(_run_statement, statement)
+        conn.execute_write(_record_version, target)
+        version = target
+        logger.info(
+            "Applied schema migration %d in %.2fs.",
+            target,
+            time.perf_counter() - start,
+        )
+    return version
@@ -0,0 +1,251 @@
+import gzip
+import json
+import logging
+import os
+import time
+from array import array
+
+import numpy as np
+
+from paperwalk.common.metrics import NEO4J_ROWS
+from paperwalk.common.type import CORPUS_ID_FIELD, PAPER_PROPERTIES, PaperRow
+from paperwalk.database.database import MERGE_CITATIONS_QUERY, MERGE_PAPERS_QUERY
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+# version 1 snapshots were written before PaperRow had a corpusId
+_READABLE_VERSIONS = (1, SNAPSHOT_VERSION)
+MANIFEST = "manifest.json"
+EDGES = "edges.npy"
+PAPERS_PARQUET = "papers.parquet"
+PAPERS_JSONL = "papers.jsonl.gz"
+
+_PAPER_COLUMNS = PaperRow._fields
+
+_NODE_CHUNK_QUERY = f"""
+MATCH (p:Paper)
+WHERE p.paperId > $after
+WITH p ORDER BY p.paperId LIMIT $limit
+RETURN [{", ".join(f"p.{name}" for name in PAPER_PROPERTIES)},
+    [(a:Author)-[:AUTHORED]->(p) | [a.authorId, a.name]]] AS row
+"""
+
+_EDGE_CHUNK_QUERY = """
+MATCH (p:Paper)
+WHERE p.paperId > $after
+WITH p ORDER BY p.paperId LIMIT $limit
+RETURN p.paperId AS paperId, [(p)-[:CITES]->(c:Paper) | c.paperId] AS cites
+"""
+
+
+def _read_node_chunk(tx, after, limit):
+    result = tx.run(_NODE_CHUNK_QUERY, after=after, limit=limit)
+    return [record["row"] for record in result]
+
+
+def _read_edge_chunk(tx, after, limit):
+    result = tx.run(_EDGE_CHUNK_QUERY, after=after, limit=limit)
+    return [(record["paperId"], record["cites"]) for record in result]
+
+
+def _write_rows(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+
+class _ParquetPapers:
+    def __init__(self, path):
+        self._schema = pa.schema(
+            [
+                ("paperId", pa.string()),
+                ("title", pa.string()),
+                ("firstAuthor", pa.string()),
+                ("firstAuthorId", pa.string()),
+                ("lastAuthor", pa.string()),
+                ("lastAuthorId", pa.string()),
+                ("abstract", pa.string()),
+                ("citationCount", pa.int64()),
+                ("referenceCount", pa.int64()),
+                ("ArXiv", pa.string()),
+                ("year", pa.int32()),
+                ("venue", pa.string()),
+                ("corpusId", pa.string()),
+                ("authors", pa.list_(pa.list_(pa.string()))),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows):
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(zip(*rows), self._schema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _JsonlPapers:
+    def __init__(self, path):
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=1)
+
+    def write(self, rows):
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+
+    def close(self):
+        self._file.close()
+
+
+def export_snapshot(conn, directory, chunk_size=50_000):
+    """Stream every Paper and CITES edge out of Neo4j into ``directory``.
+
+    Papers are read in paperId order, ``chunk_size`` per read transaction,
+    and written to ``papers.parquet`` (one row group per chunk) when
+    pyarrow is installed, else to ``papers.jsonl.gz``; each row holds the
+    ``PaperRow`` fields, authors included. Citations go to ``edges.npy``,
+    an int32 ``(edges, 2)`` array of row numbers in the papers file that
+    ``np.load(..., mmap_mode="r")`` maps without reading it. Scores such as
+    pagerank are not saved; rerun the ranking after a restore.
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    if pq is not None:
+        papers_file, papers = PAPERS_PARQUET, _ParquetPapers
+    else:
+        papers_file, papers = PAPERS_JSONL, _JsonlPapers
+    writer = papers(os.path.join(directory, papers_file))
+    index = {}
+    after = ""
+    try:
+        while True:
+            rows = conn.execute_read(_read_node_chunk, after, chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                index[row[0]] = len(index)
+            writer.write(rows)
+            after = rows[-1][0]
+    finally:
+        writer.close()
+
+    # a second pass, once every paper has its row number
+    edges = array("i")
+    after = ""
+    while True:
+        chunk = conn.execute_read(_read_edge_chunk, after, chunk_size)
+        if not chunk:
+            break
+        for paper_id, cites in chunk:
+            source = index.get(paper_id)
+            if source is None:
+                continue
+            for cited in cites:
+                target = index.get(cited)
+                if target is not None:
+                    edges.append(source)
+                    edges.append(target)
+        after = chunk[-1][0]
+    np.save(
+        os.path.join(directory, EDGES),
+        np.frombuffer(edges, dtype=np.int32).reshape(-1, 2),
+    )
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "papers": len(index),
+        "citations": len(edges) // 2,
+        "papers_file": papers_file,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    logger.info(
+        "Exported a snapshot of %d papers and %d citations in %.2fs.",
+        manifest["papers"],
+        manifest["citations"],
+        time.perf_counter() - start,
+    )
+    return manifest
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") not in _READABLE_VERSIONS:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+    return manifest
+
+
+def iter_snapshot_papers(directory, batch_size=10_000):
+    """Yield the PaperRows of a snapshot in lists of up to ``batch_size``."""
+    manifest = read_manifest(directory)
+    path = os.path.join(directory, manifest["papers_file"])
+    if manifest["papers_file"] == PAPERS_PARQUET:
+        if pq is None:
+            raise RuntimeError("Reading a Parquet snapshot needs pyarrow.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            columns = [
+                batch.column(name).to_pylist()
+                if name in batch.schema.names
+                else [None] * batch.num_rows
+                for name in _PAPER_COLUMNS
+            ]
+            yield [PaperRow._make(row) for row in zip(*columns)]
+        return
+    old = manifest["version"] == 1
+    rows = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            if old:
+                row.insert(CORPUS_ID_FIELD, None)
+            rows.append(PaperRow._make(row))
+            if len(rows) >= batch_size:
+                yield rows
+                rows = []
+    if rows:
+        yield rows
+
+
+def import_snapshot(conn, directory, batch_size=10_000, on_papers=None):
+    """Load a snapshot written by ``export_snapshot`` into Neo4j.
+
+    Papers (with their authors and venues) and then citations are written
+    ``batch_size`` rows per managed transaction with the ingestion MERGEs,
+    so loading into a non-empty graph merges rather than duplicates.
+    ``on_papers`` is called with every batch of PaperRows once written.
+    Returns the manifest with the load time added.
+    """
+    start = time.perf_counter()
+    manifest = read_manifest(directory)
+    ids = []
+    for rows in iter_snapshot_papers(directory, batch_size):
+        conn.execute_write(_write_rows, MERGE_PAPERS_QUERY, rows)
+        NEO4J_ROWS.observe(len(rows), "_write_rows")
+        ids.extend(row[0] for row in rows)
+        if on_papers is not None:
+            on_papers(rows)
+
+    ids = np.array(ids, dtype=object)
+    edges = np.load(os.path.join(directory, EDGES), mmap_mode="r")
+    for offset in range(0, len(edges), batch_size):
+        chunk = np.asarray(edges[offset : offset + batch_size])
+        rows = np.stack([ids[chunk[:, 0]], ids[chunk[:, 1]]], axis=1).tolist()
+        conn.execute_write(_write_rows, MERGE_CITATIONS_QUERY, rows)
+        NEO4J_ROWS.observe(len(rows), "_write_rows")
+
+    seconds = time.perf_counter() - start
+    logger.info(
+        "Imported a snapshot of %d papers and %d citations in %.2fs.",
+        manifest["papers"],
+        manifest["citations"],
+        seconds,
+    )
+    return {**manifest, "seconds": round(seconds, 3)}
@@ -0,0 +1,15 @@
+from .fixtures import write_synthetic_shards
+from .importer import DatasetImporter, import_shard
+from .records import citation_row, paper_row, read_shard
+from .sinks import CsvSink, Neo4jSink
+
+__all__ = [
+    'write_synthetic_shards',
+    'DatasetImporter',
+    'import_shard',
+    'citation_row',
+    'paper_row',
+    'read_shard',
+    'CsvSink',
+    'Neo4jSink'
+]
\ No newline at end of file
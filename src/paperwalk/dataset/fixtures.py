@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+
+
+def _paper_record(corpus_id, rng):
+    authors = [
+        {
+            "authorId": str(rng.randrange(1, 10**6)),
+            "name": f"Author {rng.randrange(10**4)}",
+        }
+        for _ in range(rng.randint(0, 4))
+    ]
+    arxiv = None
+    if rng.random() < 0.3:
+        arxiv = f"{rng.randint(7, 24):02d}{rng.randint(1, 12):02d}.{corpus_id:05d}"
+    abstract = None
+    if rng.random() < 0.5:
+        abstract = f'Abstract of paper {corpus_id}, with "quotes"\nand a newline.'
+    return {
+        "corpusid": corpus_id,
+        "url": "https://www.semanticscholar.org/paper/"
+        + hashlib.sha1(str(corpus_id).encode()).hexdigest(),
+        "externalids": {"CorpusId": str(corpus_id), "ArXiv": arxiv},
+        "title": f"Synthetic paper {corpus_id}",
+        "authors": authors,
+        "year": rng.randint(1990, 2024),
+        "referencecount": rng.randint(0, 50),
+        "citationcount": rng.randint(0, 5000),
+        "venue": f"Venue {rng.randrange(50)}" if rng.random() < 0.8 else "",
+        "abstract": abstract,
+    }
+
+
+def write_synthetic_shards(
+    directory, papers=1000, citations_per_paper=10, shards=2, seed=0
+):
+    """Write small papers and citations shards in the Datasets format.
+
+    Papers get corpus IDs ``1..papers``; each cites ``citations_per_paper``
+    random others, and about 1% of citations are unresolved (no cited ID).
+    Returns ``{"papers": [paths], "citations": [paths]}``.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = {"papers": [], "citations": []}
+    for kind in paths:
+        for shard in range(shards):
+            path = os.path.join(directory, f"{kind}-{shard:03d}.jsonl.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                for corpus_id in range(shard + 1, papers + 1, shards):
+                    if kind == "papers":
+                        f.write(json.dumps(_paper_record(corpus_id, rng)) + "\n")
+                        continue
+                    for _ in range(citations_per_paper):
+                        cited = rng.randint(1, papers)
+                        if rng.random() < 0.01:
+                            cited = None
+                        record = {
+                            "citationid": rng.randrange(10**9),
+                            "citingcorpusid": corpus_id,
+                            "citedcorpusid": cited,
+                            "isinfluential": rng.random() < 0.1,
+                        }
+                        f.write(json.dumps(record) + "\n")
+            paths[kind].append(path)
+    return paths
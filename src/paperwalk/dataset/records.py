@@ -0,0 +1,72 @@
+import gzip
+import json
+
+from paperwalk.common.type import make_paper_row
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    loads = json.loads
+
+
+def url_paper_id(url):
+    """paperId from a Semantic Scholar paper URL, ``.../paper/<paperId>``."""
+    if not url:
+        return None
+    return url.rstrip("/").rpartition("/")[2] or None
+
+
+def paper_row(record):
+    """Map a record of the ``papers`` dataset onto a PaperRow.
+
+    The record's ``url`` gives the paperId the API uses, so dataset and API
+    papers share one ID, and the corpus ID is kept as ``corpusId``. Returns
+    None for records without either.
+    """
+    paper_id = url_paper_id(record.get("url"))
+    corpus_id = record.get("corpusid")
+    if paper_id is None or corpus_id is None:
+        return None
+    return make_paper_row(
+        paper_id,
+        record.get("title"),
+        record.get("authors"),
+        record.get("abstract"),
+        record.get("citationcount"),
+        record.get("referencecount"),
+        (record.get("externalids") or {}).get("ArXiv"),
+        record.get("year"),
+        record.get("venue"),
+        corpus_id,
+    )
+
+
+def citation_row(record):
+    """Map a record of the ``citations`` dataset onto a (citing, cited) pair.
+
+    The pair holds corpus IDs, resolved against ``corpusId`` when written.
+    Returns None when either side is not in the corpus.
+    """
+    citing = record.get("citingcorpusid")
+    cited = record.get("citedcorpusid")
+    if citing is None or cited is None:
+        return None
+    return str(citing), str(cited)
+
+
+ROW_MAPPERS = {"papers": paper_row, "citations": citation_row}
+
+
+def read_shard(path, kind):
+    """Yield the mapped rows of a JSONL(.gz) shard one line at a time."""
+    mapper = ROW_MAPPERS[kind]
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = mapper(loads(line))
+            if row is not None:
+                yield row
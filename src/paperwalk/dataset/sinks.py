@@ -0,0 +1,211 @@
+import csv
+import gzip
+import os
+
+from paperwalk.common.metrics import NEO4J_ROWS
+from paperwalk.common.type import (
+    AUTHORS_FIELD,
+    CORPUS_ID_FIELD,
+    PAPER_PROPERTIES,
+    VENUE_FIELD,
+)
+from paperwalk.database import Neo4jConnection
+from paperwalk.database.database import (
+    MERGE_CORPUS_CITATIONS_QUERY,
+    MERGE_PAPERS_QUERY,
+)
+
+# column types for neo4j-admin; the rest are strings. Papers are keyed by
+# corpus ID, which is what the citations shards refer to them by.
+_CSV_TYPES = {
+    "corpusId": "corpusId:ID(Paper)",
+    "citationCount": "citationCount:long",
+    "referenceCount": "referenceCount:long",
+    "year": "year:int",
+}
+
+
+# header, and the label or type written at the end of each row, per file
+_CSV_FILES = {
+    "papers": (
+        [_CSV_TYPES.get(name, name) for name in PAPER_PROPERTIES] + [":LABEL"],
+        "Paper",
+    ),
+    "citations": ([":START_ID(Paper)", ":END_ID(Paper)", ":TYPE"], "CITES"),
+    "authors": (["authorId:ID(Author)", "name", ":LABEL"], "Author"),
+    "authored": ([":START_ID(Author)", ":END_ID(Paper)", ":TYPE"], "AUTHORED"),
+    "venues": (["name:ID(Venue)", ":LABEL"], "Venue"),
+    "published_in": (
+        [":START_ID(Paper)", ":END_ID(Venue)", ":TYPE"],
+        "PUBLISHED_IN",
+    ),
+}
+
+# files written next to each papers shard
+_PAPER_FILES = ("papers", "authors", "authored", "venues", "published_in")
+
+
+class CsvSink:
+    """Write shards as gzipped CSVs for ``neo4j-admin database import``.
+
+    Every citations shard becomes one ``citations-*.csv.gz`` file, and every
+    papers shard one file each for papers, authors, venues and their
+    ``AUTHORED``/``PUBLISHED_IN`` relationships, next to shared header
+    files; a shard's files only appear once it is complete. Authors and
+    venues shared between shards are written once per shard and merged by
+    ``--skip-duplicate-nodes``. ``command()`` returns the import command.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def prepare(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for name, (header, _) in _CSV_FILES.items():
+            path = os.path.join(self.directory, f"{name}-header.csv")
+            with open(path, "w", newline="") as f:
+                csv.writer(f).writerow(header)
+
+    def open(self, shard, kind):
+        if kind == "papers":
+            return _PaperCsvWriter(self.directory, shard)
+        return _CsvWriter(self.directory, shard, kind)
+
+    def command(self, database="neo4j"):
+        def files(name):
+            header = os.path.join(self.directory, f"{name}-header.csv")
+            return f'"{header},{self.directory}/{name}-.*\\.csv\\.gz"'
+
+        return (
+            f"neo4j-admin database import full {database} "
+            f"--nodes=Paper={files('papers')} "
+            f"--nodes=Author={files('authors')} "
+            f"--nodes=Venue={files('venues')} "
+            f"--relationships=CITES={files('citations')} "
+            f"--relationships=AUTHORED={files('authored')} "
+            f"--relationships=PUBLISHED_IN={files('published_in')} "
+            "--multiline-fields=true --skip-duplicate-nodes=true "
+            "--skip-bad-relationships=true"
+        )
+
+
+class _CsvWriter:
+    def __init__(self, directory, shard, kind):
+        name = os.path.basename(shard).split(".")[0]
+        self.path = os.path.join(directory, f"{kind}-{name}.csv.gz")
+        self.tmp_path = f"{self.path}.tmp"
+        self.label = _CSV_FILES[kind][1]
+        # fast compression: the files are read once, by neo4j-admin
+        self._file = gzip.open(self.tmp_path, "wt", newline="", compresslevel=1)
+        self._writer = csv.writer(self._file)
+
+    def write(self, row):
+        self._writer.writerow((*row, self.label))
+
+    def close(self):
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self.tmp_path)
+
+
+class _PaperCsvWriter:
+    def __init__(self, directory, shard):
+        self._writers = {
+            kind: _CsvWriter(directory, shard, kind) for kind in _PAPER_FILES
+        }
+        write = {kind: writer.write for kind, writer in self._writers.items()}
+        self._papers = write["papers"]
+        self._authors = write["authors"]
+        self._authored = write["authored"]
+        self._venues = write["venues"]
+        self._published_in = write["published_in"]
+        self._properties = len(PAPER_PROPERTIES)
+        # there are few venues, so each is written once per shard
+        self._seen_venues = set()
+
+    def write(self, row):
+        paper_id = row[CORPUS_ID_FIELD]
+        self._papers(row[: self._properties])
+        for author_id, name in row[AUTHORS_FIELD]:
+            self._authors((author_id, name))
+            self._authored((author_id, paper_id))
+        venue = row[VENUE_FIELD]
+        if venue:
+            if venue not in self._seen_venues:
+                self._seen_venues.add(venue)
+                self._venues((venue,))
+            self._published_in((paper_id, venue))
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+
+    def abort(self):
+        for writer in self._writers.values():
+            writer.abort()
+
+
+_connections = {}
+
+
+def _write_rows(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+
+class Neo4jSink:
+    """Write shards straight into Neo4j with large UNWIND transactions.
+
+    Each importer process opens its own connection. Rows are written in
+    batches of ``batch_size`` per managed transaction; the MERGEs make a
+    re-run of a half-written shard harmless.
+    """
+
+    def __init__(self, uri, user, pwd, batch_size=10_000):
+        self.uri = uri
+        self.user = user
+        self.pwd = pwd
+        self.batch_size = batch_size
+
+    def prepare(self):
+        pass
+
+    def connection(self):
+        key = (self.uri, self.user)
+        if key not in _connections:
+            _connections[key] = Neo4jConnection(self.uri, self.user, self.pwd)
+        return _connections[key]
+
+    def open(self, shard, kind):
+        if kind == "papers":
+            query = MERGE_PAPERS_QUERY
+        else:
+            query = MERGE_CORPUS_CITATIONS_QUERY
+        return _Neo4jWriter(self.connection(), query, self.batch_size)
+
+
+class _Neo4jWriter:
+    def __init__(self, conn, query, batch_size):
+        self.conn = conn
+        self.query = query
+        self.batch_size = batch_size
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self.conn.execute_write(_write_rows, self.query, self._rows)
+            NEO4J_ROWS.observe(len(self._rows), "_write_rows")
+            self._rows = []
+
+    def close(self):
+        self._flush()
+
+    def abort(self):
+        self._rows = []
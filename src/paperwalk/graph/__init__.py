@@ -0,0 +1,29 @@
+from .csr import CSRGraph, export_csr
+from .rank import (
+    articlerank,
+    pagerank,
+    personalized_pagerank,
+    rank_graph,
+    write_scores,
+)
+from .view import RANK_PROPERTIES, ViewCache, compact_paper, graph_view, sample_edges
+from .walk import BIAS_PROPERTIES, BIASES, WalkEngine, recommend_many
+
+__all__ = [
+    'CSRGraph',
+    'export_csr',
+    'articlerank',
+    'pagerank',
+    'personalized_pagerank',
+    'rank_graph',
+    'write_scores',
+    'RANK_PROPERTIES',
+    'ViewCache',
+    'compact_paper',
+    'graph_view',
+    'sample_edges',
+    'BIAS_PROPERTIES',
+    'BIASES',
+    'WalkEngine',
+    'recommend_many'
+]
\ No newline at end of file
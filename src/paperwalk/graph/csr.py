@@ -0,0 +1,148 @@
+import logging
+import time
+from array import array
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CSRGraph:
+    """Citation graph in compressed sparse row form.
+
+    Node ``i`` is the paper ``ids[i]``. Its outgoing CITES edges point at
+    ``indices[indptr[i]:indptr[i + 1]]``. Indices are int32 and offsets are
+    int64, so a graph with millions of edges takes a few bytes per edge.
+    ``properties`` maps a node property name to a float64 array (NaN where
+    the property is missing).
+    """
+
+    def __init__(self, ids, indptr, indices, properties=None):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.properties = properties or {}
+        self._index = None
+
+    @property
+    def num_nodes(self):
+        return len(self.ids)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def index(self):
+        """Mapping from paperId to node index, built on first use."""
+        if self._index is None:
+            self._index = {paper_id: i for i, paper_id in enumerate(self.ids)}
+        return self._index
+
+    @classmethod
+    def from_edges(cls, ids, src, dst, properties=None):
+        """Build a graph from parallel int arrays of edge endpoints."""
+        num_nodes = len(ids)
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        order = np.argsort(src, kind="stable")
+        indices = dst[order]
+        counts = np.bincount(src, minlength=num_nodes)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(ids, indptr, indices, properties)
+
+    def out_degree(self):
+        return np.diff(self.indptr).astype(np.int32)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.num_nodes).astype(np.int32)
+
+    def sources(self, start, stop):
+        """Source node of every edge whose source is in ``[start, stop)``."""
+        return np.repeat(
+            np.arange(start, stop, dtype=np.int32),
+            np.diff(self.indptr[start : stop + 1]),
+        )
+
+    def transpose(self):
+        """Return the graph with every edge reversed."""
+        graph = CSRGraph.from_edges(
+            self.ids, self.sources(0, self.num_nodes), self.indices, self.properties
+        )
+        graph._index = self._index
+        return graph
+
+    def symmetrize(self):
+        """Return the undirected version of the graph (edges both ways)."""
+        src = self.sources(0, self.num_nodes)
+        graph = CSRGraph.from_edges(
+            self.ids,
+            np.concatenate([src, self.indices]),
+            np.concatenate([self.indices, src]),
+            self.properties,
+        )
+        graph._index = self._index
+        return graph
+
+
+def _read_nodes(tx, ids, index, columns):
+    # the driver may retry the transaction, so start from scratch each time
+    del ids[:]
+    index.clear()
+    for column in columns.values():
+        del column[:]
+    projection = "".join(f", p.{name} AS {name}" for name in columns)
+    result = tx.run(f"MATCH (p:Paper) RETURN p.paperId AS paperId{projection}")
+    for record in result:
+        paper_id = record["paperId"]
+        if paper_id is not None and paper_id not in index:
+            index[paper_id] = len(ids)
+            ids.append(paper_id)
+            for name, column in columns.items():
+                value = record[name]
+                column.append(float(value) if value is not None else float("nan"))
+
+
+def _read_edges(tx, index, src, dst):
+    # the driver may retry the transaction, so start from scratch each time
+    del src[:]
+    del dst[:]
+    result = tx.run(
+        "MATCH (a:Paper)-[:CITES]->(b:Paper) RETURN a.paperId AS s, b.paperId AS t"
+    )
+    for record in result:
+        s = index.get(record["s"])
+        t = index.get(record["t"])
+        if s is not None and t is not None:
+            src.append(s)
+            dst.append(t)
+
+
+def export_csr(conn, properties=()):
+    """Stream every Paper and CITES edge out of Neo4j into a CSRGraph.
+
+    Records are consumed one at a time into compact int arrays, so peak
+    memory is the paperId mapping plus about 8 bytes per edge and 8 bytes
+    per node for each of the numeric ``properties`` requested.
+    """
+    start = time.perf_counter()
+    ids, index = [], {}
+    columns = {name: array("d") for name in properties}
+    conn.execute_read(_read_nodes, ids, index, columns)
+    src, dst = array("i"), array("i")
+    conn.execute_read(_read_edges, index, src, dst)
+    graph = CSRGraph.from_edges(
+        ids,
+        np.frombuffer(src, dtype=np.int32),
+        np.frombuffer(dst, dtype=np.int32),
+        {name: np.frombuffer(column) for name, column in columns.items()},
+    )
+    graph._index = index
+    logger.info(
+        "Exported %d papers and %d citations in %.2fs.",
+        graph.num_nodes,
+        graph.num_edges,
+        time.perf_counter() - start,
+    )
+    return graph
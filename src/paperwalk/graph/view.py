@@ -0,0 +1,220 @@
+import collections
+import threading
+import time
+
+from paperwalk.common.type import VIEW_PROPERTIES
+
+# properties a view can be ranked by
+RANK_PROPERTIES = ("pagerank", "articlerank", "citationCount")
+
+_PROJECTION = ", ".join(f".{name}" for name in VIEW_PROPERTIES)
+
+
+def _read_top_papers(tx, rank_by, min_citations, limit, exclude):
+    # backed by the index on the ranking property; papers written since the
+    # last ranking have no score and are left to the citationCount top-up
+    result = tx.run(
+        f"""
+        MATCH (p:Paper)
+        WHERE p.{rank_by} IS NOT NULL AND p.citationCount >= $minCitations
+            AND NOT p.paperId IN $exclude
+        RETURN p {{{_PROJECTION}}} AS paper
+        ORDER BY p.{rank_by} DESC
+        LIMIT $limit
+        """,
+        minCitations=min_citations,
+        limit=limit,
+        exclude=exclude,
+    )
+    return [record["paper"] for record in result]
+
+
+def _read_ego_papers(tx, focus, depth, rank_by, min_citations, limit):
+    record = tx.run(
+        f"""
+        MATCH (f:Paper {{paperId: $focus}})
+        OPTIONAL MATCH (f)-[:CITES*1..{depth}]-(n:Paper)
+        WHERE n <> f AND n.citationCount >= $minCitations
+        WITH f, collect(DISTINCT n) AS neighbors
+        CALL {{
+            WITH neighbors
+            UNWIND neighbors AS n
+            WITH n
+            ORDER BY coalesce(n.{rank_by}, -1.0) DESC, n.citationCount DESC
+            LIMIT $limit
+            RETURN collect(n {{{_PROJECTION}}}) AS papers
+        }}
+        RETURN f {{{_PROJECTION}}} AS focus, papers
+        """,
+        focus=focus,
+        minCitations=min_citations,
+        limit=limit,
+    ).single()
+    if record is None:
+        return None
+    return [record["focus"], *record["papers"]]
+
+
+def _read_edges_among(tx, paper_ids):
+    result = tx.run(
+        """
+        UNWIND $paperIds AS paperId
+        MATCH (a:Paper {paperId: paperId})-[:CITES]->(b:Paper)
+        WHERE b.paperId IN $paperIds
+        RETURN a.paperId AS s, b.paperId AS t
+        """,
+        paperIds=paper_ids,
+    )
+    return [[record["s"], record["t"]] for record in result]
+
+
+def sample_edges(edges, scores, max_edges):
+    """Keep at most ``max_edges`` of ``edges``, favouring well-ranked ends.
+
+    Every node first keeps the edge to its best-ranked neighbour, so no
+    node that had an edge is left isolated; the remaining budget goes to
+    the edges with the highest combined endpoint score. The choice is
+    deterministic, so a view does not reshuffle between requests.
+    """
+    if len(edges) <= max_edges:
+        return edges
+
+    def weight(i):
+        return scores[edges[i][0]] + scores[edges[i][1]]
+
+    strongest = {}
+    for i, (source, target) in enumerate(edges):
+        for node, other in ((source, target), (target, source)):
+            best = strongest.get(node)
+            if best is None or scores[other] > best[0]:
+                strongest[node] = (scores[other], i)
+    backbone = {i for _, i in strongest.values()}
+    chosen = set(sorted(backbone, key=weight, reverse=True)[:max_edges])
+    rest = sorted(
+        (i for i in range(len(edges)) if i not in chosen), key=weight, reverse=True
+    )
+    chosen.update(rest[: max_edges - len(chosen)])
+    return [edges[i] for i in sorted(chosen)]
+
+
+def compact_paper(paper):
+    """Return a paper map without its null properties, floats rounded.
+
+    Missing properties are left out rather than sent as nulls, which the
+    frontend treats as absent.
+    """
+    return {
+        name: round(value, 6) if isinstance(value, float) else value
+        for name, value in paper.items()
+        if value is not None
+    }
+
+
+def graph_view(
+    conn,
+    rank_by="pagerank",
+    min_citations=0,
+    limit=200,
+    focus=None,
+    depth=1,
+    max_edges=None,
+):
+    """Return a pruned subgraph small enough to draw.
+
+    Without ``focus`` the view holds the ``limit`` papers ranked highest by
+    ``rank_by`` among those with at least ``min_citations`` citations,
+    topped up by citation count with papers that are not ranked yet. With
+    ``focus`` it holds that paper and its best-ranked neighbours within
+    ``depth`` hops. Edges between the chosen papers are sampled down to
+    ``max_edges`` (default ``4 * limit``) by ``sample_edges``.
+
+    The result is ``{"nodes", "edges", "total_edges", "sampled"}`` with
+    only the properties the view draws; each edge is a ``[source, target]``
+    pair of positions in ``nodes``, which keeps 40-character paperIds out
+    of the edge list. Returns None if ``focus`` is unknown.
+    """
+    if rank_by not in RANK_PROPERTIES:
+        raise ValueError(f"Unknown ranking property: {rank_by}")
+    if depth not in (1, 2):
+        raise ValueError(f"Ego-network depth must be 1 or 2, got {depth}")
+    if max_edges is None:
+        max_edges = 4 * limit
+    if focus is not None:
+        papers = conn.execute_read(
+            _read_ego_papers, focus, depth, rank_by, min_citations, limit
+        )
+        if papers is None:
+            return None
+    else:
+        papers = conn.execute_read(_read_top_papers, rank_by, min_citations, limit, [])
+        if len(papers) < limit and rank_by != "citationCount":
+            papers += conn.execute_read(
+                _read_top_papers,
+                "citationCount",
+                min_citations,
+                limit - len(papers),
+                [paper["paperId"] for paper in papers],
+            )
+    paper_ids = [paper["paperId"] for paper in papers]
+    edges = conn.execute_read(_read_edges_among, paper_ids) if paper_ids else []
+    scores = {
+        paper["paperId"]: paper.get(rank_by) or paper.get("citationCount") or 0
+        for paper in papers
+    }
+    sampled = sample_edges(edges, scores, max_edges)
+    position = {paper_id: i for i, paper_id in enumerate(paper_ids)}
+    return {
+        "nodes": [compact_paper(paper) for paper in papers],
+        "edges": [[position[source], position[target]] for source, target in sampled],
+        "total_edges": len(edges),
+        "sampled": len(sampled) < len(edges),
+    }
+
+
+class ViewCache:
+    """LRU cache of views, keyed by filters and tagged with a data version.
+
+    An entry is only served while the version it was built at is current
+    and it is younger than ``ttl`` seconds; the TTL bounds staleness from
+    writers that do not bump the version, such as other processes.
+    """
+
+    def __init__(self, maxsize=64, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, built, value = entry
+                if entry_version == version and time.time() - built < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,149 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _bias_pagerank(properties):
+    return np.nan_to_num(properties["pagerank"], nan=0.15)
+
+
+def _bias_citation_count(properties):
+    return np.log1p(np.nan_to_num(properties["citationCount"], nan=0.0)) + 1.0
+
+
+def _bias_year(properties):
+    years = properties["year"]
+    newest = np.nanmax(years) if np.isfinite(years).any() else 0.0
+    # a paper ten years older than the newest one gets about a third of the weight
+    return np.exp(np.nan_to_num(years - newest, nan=-20.0) / 10.0)
+
+
+# node weights used to bias the choice of the next step
+BIASES = {
+    "pagerank": _bias_pagerank,
+    "citationCount": _bias_citation_count,
+    "year": _bias_year,
+}
+BIAS_PROPERTIES = ("pagerank", "citationCount", "year")
+
+
+class WalkEngine:
+    """Vectorized random walks with restart over an adjacency snapshot.
+
+    Walks move along CITES edges in both directions. With ``bias`` set, the
+    next paper is drawn in proportion to one of the ``BIASES`` weights of
+    the neighbors; otherwise neighbors are equally likely. All walks advance
+    together, one NumPy step per hop, so 10k walks of 20 hops take tens of
+    milliseconds on a graph that fits in memory.
+    """
+
+    def __init__(self, graph, bias=None):
+        self.graph = graph.symmetrize()
+        self.bias = bias
+        self.degree = np.diff(self.graph.indptr)
+        self._cumulative = None
+        self._row_start = None
+        if bias is not None:
+            weights = BIASES[bias](self.graph.properties)[self.graph.indices]
+            self._cumulative = np.cumsum(weights)
+            self._row_start = np.concatenate([[0.0], self._cumulative])[
+                self.graph.indptr[:-1]
+            ]
+            self._row_total = (
+                np.concatenate([[0.0], self._cumulative])[self.graph.indptr[1:]]
+                - self._row_start
+            )
+
+    def _step(self, pos, rng):
+        draws = rng.random(len(pos))
+        if self._cumulative is None:
+            offsets = (draws * self.degree[pos]).astype(np.int64)
+            return self.graph.indices[self.graph.indptr[pos] + offsets]
+        targets = self._row_start[pos] + draws * self._row_total[pos]
+        # bisect each walk's own row instead of the whole cumulative array;
+        # the searches stay in cache and finish in log2(max degree) rounds
+        lo = self.graph.indptr[pos].copy()
+        hi = self.graph.indptr[pos + 1] - 1
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            right = active & (self._cumulative[mid] <= targets)
+            lo = np.where(right, mid + 1, lo)
+            hi = np.where(active & ~right, mid, hi)
+        return self.graph.indices[lo]
+
+    def visit_counts(self, seeds, walks=10_000, length=20, restart=0.15, seed=None):
+        """Run ``walks`` walks from ``seeds`` and count visits per node."""
+        index = self.graph.index
+        starts = np.array([index[s] for s in seeds if s in index], dtype=np.int64)
+        if len(starts) == 0:
+            return np.zeros(self.graph.num_nodes, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        origin = starts[rng.integers(0, len(starts), walks)]
+        pos = origin.copy()
+        visits = np.empty((length, walks), dtype=np.int64)
+        for hop in range(length):
+            moving = self.degree[pos] > 0
+            step = pos.copy()
+            step[moving] = self._step(pos[moving], rng)
+            back = (rng.random(walks) < restart) | ~moving
+            pos = np.where(back, origin, step)
+            visits[hop] = pos
+        return np.bincount(visits.ravel(), minlength=self.graph.num_nodes)
+
+    def recommend(self, seeds, k=20, exclude=None, **walk_kwargs):
+        """Return the ``k`` most visited papers as ``[(paperId, score)]``.
+
+        The seeds themselves and any paperIds in ``exclude`` are left out.
+        Scores are visit frequencies and sum to at most 1.
+        """
+        counts = self.visit_counts(seeds, **walk_kwargs).astype(np.float64)
+        total = counts.sum()
+        skip = set(seeds) | set(exclude or ())
+        for paper_id in skip:
+            if paper_id in self.graph.index:
+                counts[self.graph.index[paper_id]] = 0
+        if total == 0:
+            return []
+        k = min(k, int((counts > 0).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-counts, k - 1)[:k]
+        top = top[np.argsort(-counts[top])]
+        return [(self.graph.ids[i], float(counts[i] / total)) for i in top]
+
+
+_worker_engine = None
+
+
+def _init_worker(graph, bias):
+    global _worker_engine  # pylint: disable=global-statement
+    _worker_engine = WalkEngine(graph, bias)
+
+
+def _recommend_in_worker(args):
+    seeds, k, walk_kwargs = args
+    return _worker_engine.recommend(seeds, k=k, **walk_kwargs)
+
+
+def recommend_many(graph, seed_sets, k=20, bias=None, processes=None, **walk_kwargs):
+    """Run ``recommend`` for many seed sets across CPU cores.
+
+    Each worker process builds its own engine once, then serves seed sets
+    from a shared queue. Returns one ranking per seed set, in order.
+    """
+    processes = processes or os.cpu_count() or 1
+    jobs = [(list(seeds), k, walk_kwargs) for seeds in seed_sets]
+    if processes == 1 or len(jobs) == 1:
+        engine = WalkEngine(graph, bias)
+        return [engine.recommend(seeds, k=k, **kwargs) for seeds, k, kwargs in jobs]
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(graph, bias)
+    ) as pool:
+        return list(pool.map(_recommend_in_worker, jobs))
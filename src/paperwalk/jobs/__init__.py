@@ -0,0 +1,10 @@
+from .runner import JobProgress, JobRunner
+from .store import FINISHED, PRIORITIES, JobStore
+
+__all__ = [
+    'JobProgress',
+    'JobRunner',
+    'FINISHED',
+    'PRIORITIES',
+    'JobStore'
+]
\ No newline at end of file
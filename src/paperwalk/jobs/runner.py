@@ -0,0 +1,225 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from paperwalk.common.metrics import JOB_SECONDS
+from paperwalk.jobs.store import FINISHED, PRIORITIES, priority_value
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    """Progress counters of a running job, e.g. pages fetched, rows written.
+
+    Every change is queued for the store's thread and wakes the watchers of
+    the job; changes are saved in order, ahead of the job's outcome.
+    """
+
+    def __init__(self, runner, job_id):
+        self.runner = runner
+        self.job_id = job_id
+        self.counts = {}
+
+    def add(self, **counts):
+        for name, amount in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + amount
+        self._save()
+
+    def update(self, **counts):
+        self.counts.update(counts)
+        self._save()
+
+    def _save(self):
+        self.runner._executor.submit(
+            self.runner.store.update_progress, self.job_id, dict(self.counts)
+        )
+        self.runner.changed()
+
+
+class JobRunner:
+    """Pool of asyncio workers draining a JobStore.
+
+    ``handlers`` maps a job kind to a coroutine function called as
+    ``handler(job, progress)``; what it returns is stored as the job's
+    result. ``workers`` jobs run at once, of which at most ``bulk_workers``
+    have bulk priority, so bulk crawls never hold every worker and
+    interactive jobs start as soon as a worker is free.
+
+    Cancelling a running job cancels its task. Jobs interrupted by
+    ``stop()`` or by a crash are queued again on the next ``start()``.
+    Store calls run on a thread of their own, one at a time and in order,
+    so SQLite never blocks the event loop.
+    """
+
+    def __init__(self, store, handlers, workers=4, bulk_workers=1, poll_interval=1.0):
+        self.store = store
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="paperwalk-jobs")
+        self.handlers = handlers
+        self.workers = workers
+        self.bulk_workers = min(bulk_workers, workers)
+        self.poll_interval = poll_interval
+        self._tasks = {}
+        self._bulk_running = 0
+        self._workers = []
+        self._wake = None
+        self._changed = None
+        self._stopping = False
+
+    async def start(self):
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Event()
+        await self._call("recover")
+        self._workers = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Stop the workers; running jobs are requeued."""
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # wait for the progress saves still queued
+        await self._call("counts")
+
+    async def _call(self, method, *args, **kwargs):
+        """Run a JobStore method on the store's thread."""
+        call = functools.partial(getattr(self.store, method), *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def get(self, job_id):
+        """Return a job, or None."""
+        return await self._call("get", job_id)
+
+    async def list(self, status=None, limit=100):
+        """Return the most recent jobs, optionally only those in ``status``."""
+        return await self._call("list", status, limit)
+
+    async def prune(self, max_age):
+        """Delete finished jobs older than ``max_age`` seconds."""
+        return await self._call("prune", max_age)
+
+    async def submit(self, kind, paper_id=None, params=None, priority="interactive"):
+        """Queue a job and return it."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await self._call("submit", kind, paper_id, params, priority)
+        if self._wake is not None:
+            self._wake.set()
+        return job
+
+    async def cancel(self, job_id):
+        """Cancel a job and return it, or None if it does not exist."""
+        job = await self._call("cancel", job_id)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        self.changed()
+        return job
+
+    def changed(self):
+        """Wake the coroutines watching jobs."""
+        if self._changed is None:
+            return
+        # watchers wait on the current event; the next change uses a new one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def watch(self, job_id):
+        """Yield a job every time it changes, until it has finished.
+
+        The store is also re-read every ``poll_interval`` seconds, so jobs
+        run by another process are followed too.
+        """
+        last = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job != last:
+                yield job
+                last = job
+            if job["status"] in FINISHED:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        counts = self.store.counts()
+        return {
+            **{f"jobs_{status}": count for status, count in counts.items()},
+            "running": len(self._tasks),
+            "bulk_running": self._bulk_running,
+        }
+
+    async def _worker(self):
+        while not self._stopping:
+            self._wake.clear()
+            # take a bulk slot before awaiting the store: checked after the
+            # await, every idle worker would pass the check at once
+            slot = self._bulk_running < self.bulk_workers
+            if slot:
+                self._bulk_running += 1
+            try:
+                job = await self._call(
+                    "claim", None if slot else PRIORITIES["bulk"]
+                )
+            except BaseException:
+                if slot:
+                    self._bulk_running -= 1
+                raise
+            bulk = job is not None and (
+                priority_value(job["priority"]) >= PRIORITIES["bulk"]
+            )
+            if slot and not bulk:
+                self._bulk_running -= 1
+                if job is not None:
+                    # another worker may have passed over a bulk job
+                    self._wake.set()
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job, bulk)
+
+    async def _run(self, job, bulk):
+        # a bulk job's slot was taken by the worker that claimed it
+        progress = JobProgress(self, job["id"])
+        task = asyncio.ensure_future(self.handlers[job["kind"]](job, progress))
+        self._tasks[job["id"]] = task
+        self.changed()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait({task})
+        finally:
+            del self._tasks[job["id"]]
+            if bulk:
+                self._bulk_running -= 1
+        if task.cancelled():
+            cancel_requested = (await self.get(job["id"]))["cancel_requested"]
+            if self._stopping and not cancel_requested:
+                await self._call("requeue", job["id"])
+                status = "queued"
+            else:
+                await self._call("finish", job["id"], "cancelled")
+                status = "cancelled"
+        elif task.exception() is not None:
+            error = task.exception()
+            logger.error("Job %s (%s) failed: %r", job["id"], job["kind"], error)
+            await self._call("finish", job["id"], "failed", error=repr(error))
+            status = "failed"
+        else:
+            await self._call("finish", job["id"], "succeeded", result=task.result())
+            status = "succeeded"
+        JOB_SECONDS.observe(time.perf_counter() - started, job["kind"], status)
+        self.changed()
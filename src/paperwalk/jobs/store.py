@@ -0,0 +1,283 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+# lower runs first; a job may also be given any integer
+PRIORITIES = {"interactive": 0, "bulk": 10}
+_PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+# statuses a job never leaves
+FINISHED = ("succeeded", "failed", "cancelled")
+
+_COLUMNS = (
+    "id, kind, paper_id, params, priority, status, progress, result, error,"
+    " cancel_requested, created_at, started_at, finished_at"
+)
+
+
+def priority_value(priority):
+    """Return the numeric priority for a priority name or number."""
+    if isinstance(priority, int):
+        return priority
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown job priority: {priority}")
+    return PRIORITIES[priority]
+
+
+def _to_job(row):
+    (
+        job_id,
+        kind,
+        paper_id,
+        params,
+        priority,
+        status,
+        progress,
+        result,
+        error,
+        cancel_requested,
+        created_at,
+        started_at,
+        finished_at,
+    ) = row
+    return {
+        "id": job_id,
+        "kind": kind,
+        "paper_id": paper_id,
+        "params": json.loads(params),
+        "priority": _PRIORITY_NAMES.get(priority, priority),
+        "status": status,
+        "progress": json.loads(progress),
+        "result": json.loads(result) if result is not None else None,
+        "error": error,
+        "cancel_requested": bool(cancel_requested),
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
+
+
+class JobStore:
+    """Persistent queue of background jobs in a SQLite file.
+
+    A job is queued with a kind, an optional paperId, JSON parameters and a
+    priority, then claimed by a worker (lowest priority number first, then
+    oldest first), and finishes as succeeded, failed or cancelled. Its
+    progress counters and result are stored as JSON. Submitting a job
+    identical to one still queued or running returns that job instead,
+    raising its priority if the new one is more urgent.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                paper_id TEXT,
+                params TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_queue"
+            " ON jobs(status, priority, created_at)"
+        )
+        self._db.commit()
+
+    def close(self):
+        """Close the backing SQLite file."""
+        with self._lock:
+            self._db.close()
+
+    def submit(self, kind, paper_id=None, params=None, priority="interactive"):
+        """Queue a job and return it, or return the identical pending job."""
+        params = json.dumps(params or {}, sort_keys=True)
+        priority = priority_value(priority)
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs"
+                " WHERE kind = ? AND paper_id IS ? AND params = ?"
+                " AND status IN ('queued', 'running') AND cancel_requested = 0",
+                (kind, paper_id, params),
+            ).fetchone()
+            if row is not None:
+                if row[5] == "queued" and priority < row[4]:
+                    self._db.execute(
+                        "UPDATE jobs SET priority = ? WHERE id = ?", (priority, row[0])
+                    )
+                    self._db.commit()
+                    row = row[:4] + (priority,) + row[5:]
+                return _to_job(row)
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, paper_id, params, priority, status,"
+                " progress, created_at) VALUES (?, ?, ?, ?, ?, 'queued', '{}', ?)",
+                (job_id, kind, paper_id, params, priority, time.time()),
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Return a job, or None."""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _to_job(row) if row else None
+
+    def list(self, status=None, limit=100):
+        """Return the most recent jobs, optionally only those in ``status``."""
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        args = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self._db.execute(
+                query + " ORDER BY created_at DESC LIMIT ?", args + (limit,)
+            ).fetchall()
+        return [_to_job(row) for row in rows]
+
+    def claim(self, max_priority=None):
+        """Mark the most urgent queued job running and return it, or None.
+
+        With ``max_priority`` only jobs more urgent than it are considered.
+        """
+        query = f"SELECT {_COLUMNS} FROM jobs WHERE status = 'queued'"
+        args = ()
+        if max_priority is not None:
+            query += " AND priority < ?"
+            args = (max_priority,)
+        with self._lock:
+            row = self._db.execute(
+                query + " ORDER BY priority, created_at LIMIT 1", args
+            ).fetchone()
+            if row is None:
+                return None
+            started_at = time.time()
+            self._db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                (started_at, row[0]),
+            )
+            self._db.commit()
+        job = _to_job(row)
+        job.update(status="running", started_at=started_at)
+        return job
+
+    def update_progress(self, job_id, progress):
+        """Replace the progress counters of a job."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ?",
+                (json.dumps(progress), job_id),
+            )
+            self._db.commit()
+
+    def finish(self, job_id, status, result=None, error=None):
+        """Record how a running job ended."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?"
+                " WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._db.commit()
+
+    def requeue(self, job_id):
+        """Put a running job back in the queue, e.g. when shutting down."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL"
+                " WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+            self._db.commit()
+
+    def cancel(self, job_id):
+        """Cancel a job and return it, or None if it does not exist.
+
+        A queued job is cancelled at once; a running one is flagged, and
+        the worker running it marks it cancelled once it has stopped.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?"
+                " WHERE id = ? AND status = 'queued'",
+                (now, job_id),
+            )
+            self._db.execute(
+                "UPDATE jobs SET cancel_requested = 1"
+                " WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def recover(self):
+        """Requeue the jobs a stopped process left running.
+
+        Jobs whose cancellation was already requested are cancelled instead.
+        Returns the number of jobs requeued.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?"
+                " WHERE status = 'running' AND cancel_requested = 1",
+                (time.time(),),
+            )
+            requeued = self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL"
+                " WHERE status = 'running'"
+            ).rowcount
+            self._db.commit()
+        if requeued:
+            logger.info("Requeued %d interrupted jobs", requeued)
+        return requeued
+
+    def prune(self, max_age):
+        """Delete finished jobs older than ``max_age`` seconds."""
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                FINISHED + (time.time() - max_age,),
+            ).rowcount
+            self._db.commit()
+        return deleted
+
+    def counts(self):
+        """Return the number of jobs in each status."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
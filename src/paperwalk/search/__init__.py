@@ -0,0 +1,9 @@
+from .index import MODES, LocalSearchIndex
+from .text import HashingVectorizer, tokenize
+
+__all__ = [
+    'MODES',
+    'LocalSearchIndex',
+    'HashingVectorizer',
+    'tokenize'
+]
\ No newline at end of file
@@ -0,0 +1,339 @@
+import json
+import logging
+import math
+import os
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from paperwalk.search.text import HashingVectorizer, tokenize
+
+logger = logging.getLogger(__name__)
+
+MODES = ("bm25", "vector", "hybrid")
+
+# fields kept per document and returned with every hit
+_DOC_FIELDS = ("paperId", "title", "year", "citationCount", "firstAuthor")
+
+# rows added to the vector file whenever it runs out of room
+_GROW_ROWS = 4096
+
+
+def _doc_fields(paper):
+    doc = {name: paper.get(name) for name in _DOC_FIELDS}
+    if doc["firstAuthor"] is None:
+        authors = paper.get("authors") or []
+        doc["firstAuthor"] = authors[0].get("name") if authors else None
+    return doc
+
+
+def _doc_text(title, abstract):
+    return " ".join(filter(None, (title, abstract)))
+
+
+def _top_k(scores, k):
+    k = min(k, int((scores > 0).sum()))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class LocalSearchIndex:
+    """Full-text search over the titles and abstracts of stored papers.
+
+    Keeps a BM25 inverted index in memory and one hashed TF-IDF vector per
+    paper in a memory-mapped file under ``path``. Papers are appended to a
+    log as they are added, so a restart replays the log into the inverted
+    index and reopens the vectors. ``close`` records how much of the log
+    the vectors cover, and entries past that are vectorized again on load.
+    ``upsert`` appends a new entry for a paper already indexed, and the
+    latest entry wins on replay. ``search`` ranks by BM25, by vector
+    cosine, or by reciprocal-rank fusion of the two.
+    """
+
+    def __init__(self, path, dim=256, k1=1.2, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.vectorizer = HashingVectorizer(dim)
+        self._lock = threading.Lock()
+        self._log_path = os.path.join(path, "docs.jsonl")
+        self._vectors_path = os.path.join(path, f"vectors-{dim}.f32")
+        self._state_path = os.path.join(path, f"vectors-{dim}.json")
+        os.makedirs(path, exist_ok=True)
+        self._reset()
+        self._load()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _reset(self):
+        self.docs = []
+        self._doc_ids = {}
+        self._postings = {}
+        self._lengths = array("i")
+        # where each document's latest entry starts in the log
+        self._offsets = array("q")
+        self._log_size = 0
+        self._total_length = 0
+        self._length_norm = None
+        self._vectors = None
+        self._log = None
+
+    def _open_vectors(self, rows):
+        row_bytes = self.vectorizer.dim * 4
+        size = 0
+        if os.path.exists(self._vectors_path):
+            size = os.path.getsize(self._vectors_path)
+        if size < rows * row_bytes:
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+            size = rows * row_bytes
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(size // row_bytes, self.vectorizer.dim),
+        )
+
+    def _read_state(self):
+        if not os.path.exists(self._state_path):
+            return {"rows": 0, "log_size": 0}
+        with open(self._state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_state(self):
+        tmp_path = f"{self._state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"rows": len(self.docs), "log_size": self._log_size}, f)
+        os.replace(tmp_path, self._state_path)
+
+    def _load(self):
+        self._open_vectors(_GROW_ROWS)
+        # the log entries whose vectors were flushed by the last close()
+        covered = self._read_state()["log_size"]
+        if os.path.exists(self._log_path):
+            log_path = self._log_path
+            with open(log_path, "rb") as f, open(log_path, "rb") as reader:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # a torn last line from an interrupted write
+                        break
+                    doc, terms = entry["doc"], tokenize(entry["text"])
+                    number = self._doc_ids.get(doc["paperId"])
+                    if number is None:
+                        self._index(doc, terms, self._log_size)
+                    else:
+                        old_terms = tokenize(self._stored_text(reader, number))
+                        self._reindex(number, doc, terms, old_terms, self._log_size)
+                    self._log_size += len(line)
+            # drop a torn tail so the next entry starts on a line of its own
+            if os.path.getsize(self._log_path) > self._log_size:
+                os.truncate(self._log_path, self._log_size)
+        stale = [
+            number
+            for number, offset in enumerate(self._offsets)
+            if offset >= covered
+        ]
+        if stale:
+            logger.warning(
+                "Search vectors are behind the log; reindexing %d papers.",
+                len(stale),
+            )
+            if len(self.docs) > len(self._vectors):
+                self._open_vectors(len(self.docs) + _GROW_ROWS)
+            with open(self._log_path, "rb") as reader:
+                for number in stale:
+                    terms = tokenize(self._stored_text(reader, number))
+                    self._vectors[number] = self.vectorizer.transform(terms)
+        self._log = open(self._log_path, "ab")
+        logger.info("Loaded %d papers into the local search index.", len(self.docs))
+
+    def _stored_text(self, reader, number):
+        reader.seek(self._offsets[number])
+        return json.loads(reader.readline())["text"]
+
+    def _index(self, doc, terms, offset):
+        number = len(self.docs)
+        self.docs.append(doc)
+        self._doc_ids[doc["paperId"]] = number
+        self._add_postings(number, terms)
+        self._lengths.append(len(terms))
+        self._offsets.append(offset)
+        self._total_length += len(terms)
+        self._length_norm = None
+        return number
+
+    def _reindex(self, number, doc, terms, old_terms, offset):
+        """Replace the document ``number`` indexed from ``old_terms``."""
+        for term in set(old_terms):
+            docs, counts = self._postings[term]
+            position = docs.index(number)
+            del docs[position]
+            del counts[position]
+            if not docs:
+                del self._postings[term]
+        self._add_postings(number, terms)
+        self.docs[number] = doc
+        self._total_length += len(terms) - self._lengths[number]
+        self._lengths[number] = len(terms)
+        self._offsets[number] = offset
+        self._length_norm = None
+
+    def _add_postings(self, number, terms):
+        for term, count in Counter(terms).items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = (array("i"), array("i"))
+            posting[0].append(number)
+            posting[1].append(count)
+
+    def _set_vector(self, number, terms):
+        if number >= len(self._vectors):
+            self._open_vectors(number + _GROW_ROWS)
+        self._vectors[number] = self.vectorizer.transform(terms)
+
+    def _entry(self, doc, text):
+        """Encode a log entry and return it with the offset it will be at."""
+        line = (json.dumps({"doc": doc, "text": text}) + "\n").encode()
+        offset = self._log_size
+        self._log_size += len(line)
+        return line, offset
+
+    def _write_log(self, lines):
+        if lines:
+            self._log.write(b"".join(lines))
+            self._log.flush()
+
+    def add(self, papers):
+        """Index the papers that are not indexed yet; returns how many."""
+        added = 0
+        with self._lock:
+            lines = []
+            for paper in papers:
+                paper_id = paper.get("paperId")
+                if not paper_id or paper_id in self._doc_ids:
+                    continue
+                text = _doc_text(paper.get("title"), paper.get("abstract"))
+                terms = tokenize(text)
+                doc = _doc_fields(paper)
+                line, offset = self._entry(doc, text)
+                self._set_vector(self._index(doc, terms, offset), terms)
+                lines.append(line)
+                added += 1
+            self._write_log(lines)
+        return added
+
+    def upsert(self, papers):
+        """Index papers, replacing the text of those already indexed.
+
+        An indexed paper keeps the fields it is not given, so passing just
+        ``paperId`` and ``abstract`` adds the abstract to its indexed title.
+        Returns how many papers were added or changed.
+        """
+        papers = {paper["paperId"]: paper for paper in papers if paper.get("paperId")}
+        changed = 0
+        with self._lock:
+            lines = []
+            with open(self._log_path, "rb") as reader:
+                for paper_id, paper in papers.items():
+                    number = self._doc_ids.get(paper_id)
+                    doc = _doc_fields(paper)
+                    if number is None:
+                        text = _doc_text(doc["title"], paper.get("abstract"))
+                        terms = tokenize(text)
+                        line, offset = self._entry(doc, text)
+                        number = self._index(doc, terms, offset)
+                    else:
+                        old_doc = self.docs[number]
+                        for name, value in doc.items():
+                            if value is None:
+                                doc[name] = old_doc[name]
+                        text = _doc_text(doc["title"], paper.get("abstract"))
+                        old_text = self._stored_text(reader, number)
+                        if text == old_text and doc == old_doc:
+                            continue
+                        terms = tokenize(text)
+                        line, offset = self._entry(doc, text)
+                        self._reindex(number, doc, terms, tokenize(old_text), offset)
+                    self._set_vector(number, terms)
+                    lines.append(line)
+                    changed += 1
+            self._write_log(lines)
+        return changed
+
+    def clear(self):
+        """Drop every indexed paper."""
+        with self._lock:
+            self._log.close()
+            del self._vectors
+            for path in (self._log_path, self._vectors_path, self._state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._reset()
+            self._load()
+
+    def close(self):
+        with self._lock:
+            self._vectors.flush()
+            self._log.close()
+            self._write_state()
+
+    def _idf(self, df):
+        n = len(self.docs)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, terms):
+        n = len(self.docs)
+        if self._length_norm is None:
+            lengths = np.array(self._lengths, dtype=np.float32)
+            average = self._total_length / n or 1.0
+            self._length_norm = self.k1 * (1.0 - self.b + self.b * lengths / average)
+        scores = np.zeros(n, dtype=np.float32)
+        for term in set(terms):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            # views over the postings; nothing appends to them under the lock
+            docs = np.frombuffer(posting[0], dtype=np.intc)
+            tf = np.frombuffer(posting[1], dtype=np.intc).astype(np.float32)
+            weight = self._idf(len(docs)) * (self.k1 + 1.0)
+            scores[docs] += weight * tf / (tf + self._length_norm[docs])
+        return scores
+
+    def _cosine(self, terms):
+        def idf(term):
+            posting = self._postings.get(term)
+            return self._idf(len(posting[0])) if posting else 0.0
+
+        query = self.vectorizer.transform(terms, idf)
+        return np.asarray(self._vectors[: len(self.docs)] @ query)
+
+    def search(self, query, k=10, mode="bm25"):
+        """Return the ``k`` best matches for ``query`` as dicts with a score."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        terms = tokenize(query)
+        with self._lock:
+            if not terms or not self.docs:
+                return []
+            if mode == "bm25":
+                scores = self._bm25(terms)
+            elif mode == "vector":
+                scores = self._cosine(terms)
+            else:
+                # reciprocal-rank fusion of the two rankings
+                depth = max(k * 5, 100)
+                scores = np.zeros(len(self.docs), dtype=np.float32)
+                for ranking in (self._bm25(terms), self._cosine(terms)):
+                    top = _top_k(ranking, depth)
+                    scores[top] += 1.0 / (60.0 + np.arange(1, len(top) + 1))
+            top = _top_k(scores, k)
+            return [{**self.docs[i], "score": float(scores[i])} for i in top]
@@ -0,0 +1,73 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again all also an and any are as at be been before
+    being between both but by can could did do does doing during each for
+    from further had has have having here how i if in into is it its itself
+    may more most no nor not of off on once only or other our out over own
+    same should so some such than that the their them then there these they
+    this those through to too under until up very was we were what when
+    where which while who whom why will with would you your
+    """.split()
+)
+
+
+def tokenize(text):
+    """Lowercase ``text`` and split it into terms, dropping stopwords."""
+    if not text:
+        return []
+    return [
+        token
+        for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def _bucket(term, dim):
+    # 32-bit FNV-1a; Python's hash() is salted per process and the vectors
+    # are kept on disk. The top bit picks the sign, encoded as ~bucket.
+    value = 2166136261
+    for byte in term.encode():
+        value = ((value ^ byte) * 16777619) & 0xFFFFFFFF
+    bucket = value % dim
+    return bucket if value & 0x80000000 else ~bucket
+
+
+class HashingVectorizer:
+    """Project term counts onto ``dim`` signed hash buckets.
+
+    Documents get sublinear term frequencies and unit length; queries are
+    additionally weighted by ``idf`` so the dot product is an lnc.ltc
+    TF-IDF cosine without storing a vocabulary.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self._buckets = {}
+
+    def _lookup(self, term):
+        bucket = self._buckets.get(term)
+        if bucket is None:
+            bucket = self._buckets[term] = _bucket(term, self.dim)
+        return bucket
+
+    def transform(self, terms, idf=None):
+        counts = Counter(terms)
+        if not counts:
+            return np.zeros(self.dim, dtype=np.float32)
+        codes = np.fromiter(map(self._lookup, counts), np.int64, len(counts))
+        weights = 1.0 + np.log(np.fromiter(counts.values(), np.float64, len(counts)))
+        if idf is not None:
+            weights *= np.fromiter(map(idf, counts), np.float64, len(counts))
+        weights = np.where(codes >= 0, weights, -weights)
+        vector = np.bincount(
+            np.where(codes >= 0, codes, ~codes), weights=weights, minlength=self.dim
+        ).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
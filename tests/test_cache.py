@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import httpx
+
+from paperwalk.api import AsyncSemanticScholarAPI
+from paperwalk.api.cache import ResponseCache, cache_key
+from paperwalk.api.rate_limit import TokenBucket
+
+PAPER_KEY = cache_key("https://api.test/paper/p1", {"fields": "year,title"})
+
+
+def _expire(cache, key):
+    cache.get(key).expires_at = time.time() - 1
+
+
+def test_cache_key_ignores_parameter_order():
+    assert cache_key("https://api.test/paper/p1?fields=title,year") == PAPER_KEY
+    assert cache_key(
+        "https://api.test/paper/p1", {"fields": "title,year", "limit": 5}
+    ) == cache_key("https://api.test/paper/p1?limit=5", {"fields": "year,title"})
+
+
+def test_expired_entries_are_kept_stale(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get(PAPER_KEY) is None
+    cache.set(PAPER_KEY, {"paperId": "p1"}, etag='"v1"')
+    assert cache.get(PAPER_KEY).fresh
+    _expire(cache, PAPER_KEY)
+    entry = cache.get(PAPER_KEY)
+    assert not entry.fresh
+    assert entry.value == {"paperId": "p1"}
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+    cache.refresh(PAPER_KEY, entry)
+    assert cache.get(PAPER_KEY).fresh
+    assert cache.stats()["revalidated"] == 1
+    cache.close()
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, max_memory_entries=1)
+    cache.set(PAPER_KEY, {"paperId": "p1"})
+    cache.set("/paper/p2?", {"paperId": "p2"})
+    # p1 was pushed out of memory and is read back from disk
+    assert cache.get(PAPER_KEY).value == {"paperId": "p1"}
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert cache.get("/paper/p2?").value == {"paperId": "p2"}
+    assert cache.get(PAPER_KEY).fresh
+    cache.close()
+
+
+def test_disk_hits_update_access_times_in_batches(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, max_memory_entries=1)
+    cache.set(PAPER_KEY, {"paperId": "p1"})
+    cache.set("/paper/p2?", {"paperId": "p2"})
+    (before,) = cache._db.execute(
+        "SELECT accessed_at FROM responses WHERE key = ?", (PAPER_KEY,)
+    ).fetchone()
+    time.sleep(0.01)
+    cache.get(PAPER_KEY)
+    assert PAPER_KEY in cache._touched
+    cache.close()
+
+    cache = ResponseCache(path)
+    (after,) = cache._db.execute(
+        "SELECT accessed_at FROM responses WHERE key = ?", (PAPER_KEY,)
+    ).fetchone()
+    assert after > before
+    cache.close()
+
+
+def _client(cache, handler):
+    api = AsyncSemanticScholarAPI(
+        api_key="test", cache=cache, base_url="https://api.test"
+    )
+    api.client = httpx.AsyncClient(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    api.rate_limiter = TokenBucket(1000.0, 1000)
+    return api
+
+
+def test_client_serves_stale_entries_while_upstream_fails(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    responses = [
+        httpx.Response(
+            200, json={"paperId": "p1", "year": 2020}, headers={"ETag": "1"}
+        ),
+        httpx.Response(404),
+        httpx.Response(304),
+        httpx.Response(200, json={"paperId": "p1", "year": 2021}),
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return responses.pop(0)
+
+    async def fetch_repeatedly():
+        async with _client(cache, handler) as api:
+            key = api._paper_key("p1")
+            results = [await api.fetch_paper("p1")]
+            # fresh: served without a request
+            results.append(await api.fetch_paper("p1"))
+            for _ in range(3):
+                _expire(cache, key)
+                results.append(await api.fetch_paper("p1"))
+            return results
+
+    results = asyncio.run(fetch_repeatedly())
+    assert [paper["year"] for paper in results] == [2020, 2020, 2020, 2020, 2021]
+    assert len(requests) == 4
+    assert requests[1].headers["If-None-Match"] == "1"
+    cache.close()
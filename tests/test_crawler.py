@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from paperwalk.crawl import Crawler
+
+
+class FakeAPI:
+    """Three citing papers per page, three pages per paper."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+
+    async def fetch_papers_batch(self, paper_ids):
+        return [{"paperId": paper_id, "citationCount": 1} for paper_id in paper_ids]
+
+    async def fetch_citations(self, paper_id, fetch_all=False):
+        if paper_id == self.fail_on:
+            raise RuntimeError("upstream down")
+        for page in range(3):
+            yield {
+                "data": [
+                    {"citingPaper": {"paperId": f"{paper_id}.{page}{i}"}}
+                    for i in range(3)
+                ]
+            }
+
+    fetch_references = fetch_citations
+
+
+class FakeDB:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.pages = []
+
+    def insert_papers_bulk(self, papers):
+        pass
+
+    def ingest_pages(self, paper_id, pages, relation):
+        if self.fail:
+            raise RuntimeError("neo4j down")
+        self.pages.append(paper_id)
+        return {"rows": sum(len(page["data"]) for page in pages)}
+
+
+def _run(crawler, seeds=("s",)):
+    return asyncio.run(asyncio.wait_for(crawler.run(list(seeds)), 10))
+
+
+def test_crawl_writes_every_page():
+    db = FakeDB()
+    stats = _run(Crawler(FakeAPI(), db, workers=3, max_depth=1, max_nodes=100))
+    # both relations return the same 9 papers, so the seed has 9 neighbours;
+    # each of the 10 papers has 3 pages of 3 papers per relation
+    assert stats["expanded"] == 10
+    assert stats["pages"] == len(db.pages) == 10 * 6
+    assert stats["rows"] == 10 * 6 * 3
+
+
+def test_failed_writes_do_not_stall_the_crawl():
+    stats = _run(
+        Crawler(
+            FakeAPI(),
+            FakeDB(fail=True),
+            workers=2,
+            max_depth=1,
+            max_nodes=100,
+            progress=lambda stats: 1 / 0,
+        )
+    )
+    assert stats["failed_pages"] == stats["pages"] > 0
+    assert stats["rows"] == 0
+
+
+def test_failing_worker_stops_the_crawl_and_keeps_a_checkpoint(tmp_path):
+    checkpoint = tmp_path / "crawl.json"
+    crawler = Crawler(
+        FakeAPI(fail_on="s.00"),
+        FakeDB(),
+        workers=4,
+        max_depth=2,
+        max_nodes=200,
+        checkpoint_path=str(checkpoint),
+    )
+    with pytest.raises(RuntimeError):
+        _run(crawler)
+    state = json.loads(checkpoint.read_text())
+    queued = {entry[1] for entry in state["frontier"]}
+    # the paper whose expansion failed is crawled again on resume
+    assert "s.00" in queued
+    assert "s" not in queued
+
+
+def test_failing_worker_stops_the_other_workers():
+    api = FakeAPI(fail_on="s.00")
+    fetched = []
+    fetch_citations = api.fetch_citations
+
+    async def slow_fetch(paper_id, fetch_all=False):
+        fetched.append(paper_id)
+        if paper_id != "s.00":
+            await asyncio.sleep(0.01)
+        async for page in fetch_citations(paper_id, fetch_all):
+            yield page
+
+    api.fetch_citations = api.fetch_references = slow_fetch
+
+    async def crawl():
+        crawler = Crawler(api, FakeDB(), workers=4, max_depth=3, max_nodes=1000)
+        with pytest.raises(RuntimeError):
+            await crawler.run(["s"])
+        calls = len(fetched)
+        await asyncio.sleep(0.1)
+        return calls
+
+    calls = asyncio.run(asyncio.wait_for(crawl(), 10))
+    assert len(fetched) == calls
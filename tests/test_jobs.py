@@ -0,0 +1,121 @@
+import asyncio
+
+from paperwalk.jobs import JobRunner, JobStore
+
+
+def _runner(tmp_path, handlers, **kwargs):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    return JobRunner(store, handlers, poll_interval=0.05, **kwargs)
+
+
+def test_bulk_jobs_never_take_every_worker(tmp_path):
+    running = {"bulk": 0, "peak": 0}
+
+    async def crawl(job, progress):
+        running["bulk"] += 1
+        running["peak"] = max(running["peak"], running["bulk"])
+        await asyncio.sleep(0.1)
+        running["bulk"] -= 1
+
+    async def expand(job, progress):
+        return job["paper_id"]
+
+    runner = _runner(
+        tmp_path, {"crawl": crawl, "expand": expand}, workers=4, bulk_workers=1
+    )
+
+    async def run():
+        bulk = [
+            await runner.submit("crawl", params={"seed": seed}, priority="bulk")
+            for seed in "abc"
+        ]
+        await runner.start()
+        await asyncio.sleep(0.02)
+        job = await runner.submit("expand", "p1")
+        async for update in runner.watch(job["id"]):
+            pass
+        # the interactive job finished while the first crawl was running
+        assert update["status"] == "succeeded"
+        assert (await runner.get(bulk[-1]["id"]))["status"] == "queued"
+        for job in bulk:
+            async for update in runner.watch(job["id"]):
+                pass
+        await runner.stop()
+
+    asyncio.run(run())
+    assert running["peak"] == 1
+
+
+def test_interactive_jobs_run_first(tmp_path):
+    order = []
+
+    async def record(job, progress):
+        order.append(job["paper_id"])
+
+    runner = _runner(tmp_path, {"expand": record}, workers=1)
+
+    async def run():
+        await runner.submit("expand", "bulk", priority="bulk")
+        await runner.submit("expand", "interactive")
+        await runner.start()
+        while len(order) < 2:
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    asyncio.run(run())
+    assert order == ["interactive", "bulk"]
+
+
+def test_identical_pending_job_is_reused_and_promoted(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    first = store.submit("expand", "p1", priority="bulk")
+    second = store.submit("expand", "p1", priority="interactive")
+    assert second["id"] == first["id"]
+    assert second["priority"] == "interactive"
+
+
+def test_failed_and_cancelled_jobs_are_recorded(tmp_path):
+    async def fail(job, progress):
+        progress.add(pages=1)
+        raise RuntimeError("upstream down")
+
+    async def hang(job, progress):
+        await asyncio.sleep(60)
+
+    runner = _runner(tmp_path, {"fail": fail, "hang": hang}, workers=2)
+
+    async def run():
+        await runner.start()
+        failed = await runner.submit("fail")
+        hanging = await runner.submit("hang")
+        async for update in runner.watch(failed["id"]):
+            pass
+        assert update["status"] == "failed"
+        assert "upstream down" in update["error"]
+        assert update["progress"] == {"pages": 1}
+        while (await runner.get(hanging["id"]))["status"] != "running":
+            await asyncio.sleep(0.01)
+        await runner.cancel(hanging["id"])
+        async for update in runner.watch(hanging["id"]):
+            pass
+        assert update["status"] == "cancelled"
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_stop_requeues_running_jobs(tmp_path):
+    async def hang(job, progress):
+        await asyncio.sleep(60)
+
+    runner = _runner(tmp_path, {"hang": hang}, workers=1)
+
+    async def run():
+        await runner.start()
+        job = await runner.submit("hang")
+        while (await runner.get(job["id"]))["status"] != "running":
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return await runner.get(job["id"])
+
+    assert asyncio.run(run())["status"] == "queued"
@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+
+from paperwalk.search import LocalSearchIndex
+
+PAPERS = [
+    {"paperId": "a", "title": "Graph neural networks", "abstract": "Message passing."},
+    {"paperId": "b", "title": "Random walks on a graph", "authors": [{"name": "Ann"}]},
+    {"paperId": "c", "title": "Protein folding", "abstract": "Structure prediction."},
+]
+
+
+def _ids(hits):
+    return [hit["paperId"] for hit in hits]
+
+
+def test_add_and_search(tmp_path):
+    index = LocalSearchIndex(str(tmp_path))
+    assert index.add(PAPERS) == 3
+    assert index.add(PAPERS[:1]) == 0
+    assert set(_ids(index.search("graph"))) == {"a", "b"}
+    assert _ids(index.search("protein", mode="vector"))[0] == "c"
+    assert _ids(index.search("folding structure", mode="hybrid"))[0] == "c"
+    assert index.search("walks")[0]["firstAuthor"] == "Ann"
+    index.close()
+
+
+def test_reopen_replays_the_log(tmp_path):
+    index = LocalSearchIndex(str(tmp_path))
+    index.add(PAPERS)
+    index.close()
+    index = LocalSearchIndex(str(tmp_path))
+    assert len(index) == 3
+    assert _ids(index.search("protein", mode="vector")) == ["c"]
+    index.close()
+
+
+def test_upsert_replaces_text_and_the_latest_entry_wins(tmp_path):
+    index = LocalSearchIndex(str(tmp_path))
+    index.add(PAPERS)
+    assert index.upsert([{"paperId": "c", "abstract": "Membrane transport."}]) == 1
+    assert index.upsert([{"paperId": "c", "abstract": "Membrane transport."}]) == 0
+    assert index.upsert([{"paperId": "d", "title": "Membrane proteins"}]) == 1
+    assert index.search("structure") == []
+    # the title is kept when only the abstract is given
+    assert set(_ids(index.search("protein membrane"))) == {"c", "d"}
+    index.close()
+
+    index = LocalSearchIndex(str(tmp_path))
+    assert len(index) == 4
+    assert index.search("structure") == []
+    assert _ids(index.search("transport")) == ["c"]
+    assert _ids(index.search("transport", mode="vector")) == ["c"]
+    index.close()
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    index = LocalSearchIndex(str(tmp_path))
+    index.add(PAPERS[:2])
+    index.close()
+    log_path = tmp_path / "docs.jsonl"
+    with open(log_path, "ab") as f:
+        f.write(b'{"doc": {"paperId": "c", "tit')
+
+    index = LocalSearchIndex(str(tmp_path))
+    assert len(index) == 2
+    index.add(PAPERS[2:])
+    index.close()
+    lines = log_path.read_bytes().splitlines()
+    assert [json.loads(line)["doc"]["paperId"] for line in lines] == ["a", "b", "c"]
+    index = LocalSearchIndex(str(tmp_path))
+    assert _ids(index.search("protein")) == ["c"]
+    index.close()
+
+
+def test_vectors_behind_the_log_are_rebuilt(tmp_path):
+    index = LocalSearchIndex(str(tmp_path))
+    index.add(PAPERS[:1])
+    index.close()
+    index = LocalSearchIndex(str(tmp_path))
+    index.add(PAPERS[1:])
+    index.upsert([{"paperId": "a", "abstract": "Spectral clustering."}])
+    # an interrupted process: the log is written, the vectors never flushed
+    index._log.close()
+    vectors = np.memmap(str(tmp_path / "vectors-256.f32"), dtype=np.float32, mode="r+")
+    vectors[:] = 0
+    vectors.flush()
+    del vectors
+
+    index = LocalSearchIndex(str(tmp_path))
+    assert _ids(index.search("protein", mode="vector")) == ["c"]
+    assert _ids(index.search("spectral", mode="vector")) == ["a"]
+    index.close()